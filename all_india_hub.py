@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 from datetime import datetime, date, timedelta
 import json
 import numpy as np
@@ -10,6 +11,17 @@ from typing import Dict, List, Tuple, Any
 import time
 import random
 
+from allocation_engine import (ALLOCATION_ALGORITHMS, AUCTION_TOP_K, SHARD_KEYS, SHARDING_MODES, assign,
+                               assignment_summary, auction_assignment, greedy_assignment,
+                               greedy_capacitated_assignment, sharded_assignment)
+from allocation_worker import AllocationJob, stage_progress
+from gazetteer import nearest_distance
+from matching_engine import (
+    ALL_INDIA_WEIGHTS, SKILL_RULES, InternshipTable, SkillIndex, SkillPostingIndex, bit_count,
+    internship_posting, score_components, score_edges, score_pairs, student_profile
+)
+from records import InternshipRecord, ProfileRecord, RecordVocabulary
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Smart Internship Hub",
@@ -1003,6 +1015,9 @@ def create_metric_cards(metrics):
             </div>
             """, unsafe_allow_html=True)
 
+# Bump whenever the internship catalog changes so cached indexes are rebuilt
+INTERNSHIP_DATA_VERSION = "2024.03"
+
 # Comprehensive All India Internships Database
 @st.cache_data
 def load_all_india_internships():
@@ -1374,6 +1389,44 @@ def get_all_india_skills():
         ]
     }
 
+@st.cache_resource
+def get_skill_index() -> SkillIndex:
+    """Interned skill vocabulary shared by every scorer on this page"""
+    return SkillIndex.from_skill_lists(
+        *get_all_india_skills().values(),
+        *(internship["requirements"]["skills"] for internship in load_all_india_internships())
+    )
+
+@st.cache_resource
+def get_record_vocabulary() -> RecordVocabulary:
+    """Skill, location and industry vocabularies shared by every record on this page"""
+    return RecordVocabulary(get_skill_index())
+
+@st.cache_resource
+def load_internship_records(data_version: str = INTERNSHIP_DATA_VERSION) -> List[InternshipRecord]:
+    """The internship catalog as compact records, normalized once per catalog version"""
+    vocabulary = get_record_vocabulary()
+    return [InternshipRecord.from_dict(internship, vocabulary) for internship in load_all_india_internships()]
+
+@st.cache_resource
+def load_sample_profile_records() -> Dict[str, ProfileRecord]:
+    """Sample profiles as compact records, keyed like get_all_india_sample_profiles"""
+    vocabulary = get_record_vocabulary()
+    return {
+        label: ProfileRecord.from_dict(profile, vocabulary)
+        for label, profile in get_all_india_sample_profiles().items()
+    }
+
+@st.cache_resource
+def get_internship_table(data_version: str = INTERNSHIP_DATA_VERSION) -> InternshipTable:
+    """Columnar view of the catalog for array filters, sorts and scores, built once per catalog version"""
+    return InternshipTable(load_internship_records(data_version), get_skill_index())
+
+@st.cache_resource
+def get_posting_index(data_version: str = INTERNSHIP_DATA_VERSION) -> SkillPostingIndex:
+    """Inverted skill → internship index, built once per catalog version"""
+    return SkillPostingIndex(get_internship_table(data_version), get_skill_index(), weights="all_india")
+
 def create_advanced_all_india_charts():
     """Create comprehensive charts for All India data"""
     
@@ -1698,40 +1751,35 @@ def get_all_india_sample_profiles():
         }
     }
 
-def calculate_match_score(user_profile: Dict, internship: Dict) -> Tuple[float, Dict]:
-    """Enhanced matching algorithm for All India internships"""
+def calculate_match_score(user_profile: Dict, internship: Dict, skill_index: SkillIndex = None) -> Tuple[float, Dict]:
+    """Enhanced matching algorithm for All India internships.
+
+    Returns the capped score and its numeric components only; the reasons
+    shown to students are built on demand by ``explain_match``.
+    """
     score = 0
-    reasons = []
     
-    # Skills matching (40% weight)
-    user_skills = set([skill.lower() for skill in user_profile.get("skills", [])])
-    required_skills = set([skill.lower() for skill in internship["requirements"]["skills"]])
+    # Skills matching (40% weight) - popcount over interned skill bitmasks
+    if skill_index is None:
+        skill_index = get_skill_index()
+    user_skills = skill_index.mask(user_profile.get("skills", []))
+    required_skills = skill_index.mask(internship["requirements"]["skills"])
     
-    skill_overlap = user_skills.intersection(required_skills)
-    skill_match_ratio = len(skill_overlap) / len(required_skills) if required_skills else 0
+    required_count = bit_count(required_skills)
+    skill_match_ratio = bit_count(user_skills & required_skills) / required_count if required_count else 0
     skill_score = skill_match_ratio * 40
     score += skill_score
     
-    if skill_overlap:
-        reasons.append(f"Strong skill match: {', '.join(list(skill_overlap)[:3])}")
-    
     # CGPA matching (20% weight)
     cgpa_requirement = internship["requirements"]["minCgpa"]
     user_cgpa = user_profile.get("cgpa", 7.0)
     
     if user_cgpa >= cgpa_requirement:
         cgpa_score = 20
-        if user_cgpa >= cgpa_requirement + 0.5:
-            reasons.append(f"Exceeds CGPA requirement ({user_cgpa} > {cgpa_requirement})")
-        else:
-            reasons.append(f"Meets CGPA requirement ({user_cgpa} ≥ {cgpa_requirement})")
+    elif cgpa_requirement - user_cgpa <= 0.3:
+        cgpa_score = 12
     else:
-        cgpa_diff = cgpa_requirement - user_cgpa
-        if cgpa_diff <= 0.3:
-            cgpa_score = 12
-            reasons.append(f"Close to CGPA requirement ({user_cgpa} vs {cgpa_requirement})")
-        else:
-            cgpa_score = 5
+        cgpa_score = 5
     
     score += cgpa_score
     
@@ -1739,15 +1787,19 @@ def calculate_match_score(user_profile: Dict, internship: Dict) -> Tuple[float,
     preferred_locations = user_profile.get("preferences", {}).get("location", [])
     internship_location = internship["location"].lower()
     
-    location_score = 0
     if any(loc.lower() in internship_location for loc in preferred_locations):
         location_score = 20
-        reasons.append("Matches location preference")
     elif "remote" in [loc.lower() for loc in preferred_locations] and internship.get("isRemote", False):
         location_score = 20
-        reasons.append("Matches remote work preference")
     else:
-        location_score = 8
+        # Graded by distance to the nearest preferred city
+        distance = nearest_distance(preferred_locations, internship["location"])
+        if distance <= 150:
+            location_score = 16
+        elif distance <= 400:
+            location_score = 12
+        else:
+            location_score = 8
     
     score += location_score
     
@@ -1755,10 +1807,8 @@ def calculate_match_score(user_profile: Dict, internship: Dict) -> Tuple[float,
     user_industry = user_profile.get("industry", "").lower()
     internship_industry = internship["industry"].lower()
     
-    industry_score = 0
     if user_industry in internship_industry or internship_industry in user_industry:
         industry_score = 15
-        reasons.append("Perfect industry match")
     else:
         industry_score = 5
     
@@ -1766,77 +1816,142 @@ def calculate_match_score(user_profile: Dict, internship: Dict) -> Tuple[float,
     
     # Salary matching (5% weight)
     salary_range = user_profile.get("preferences", {}).get("salary_range", [0, 100000])
-    internship_salary = internship["salary"]
     
-    salary_score = 0
-    if salary_range[0] <= internship_salary <= salary_range[1]:
+    if salary_range[0] <= internship["salary"] <= salary_range[1]:
         salary_score = 5
-        reasons.append("Within salary expectations")
     else:
         salary_score = 2
     
     score += salary_score
     
     return min(score, 100), {
-        "reasons": reasons,
         "skill_match": skill_score,
         "cgpa_match": cgpa_score,
         "location_match": location_score,
         "industry_match": industry_score,
-        "salary_match": salary_score,
-        "skill_overlap": list(skill_overlap)
+        "salary_match": salary_score
     }
 
-def run_allocation_algorithm(user_profiles: List[Dict], internships: List[Dict]) -> Dict:
-    """Smart allocation algorithm based on preferences and compatibility"""
+def explain_match(user_profile: Dict, internship: Dict, details: Dict = None,
+                  skill_index: SkillIndex = None) -> List[str]:
+    """Reasons behind one match, built from its numeric components only when a page renders it"""
+    if skill_index is None:
+        skill_index = get_skill_index()
+    if details is None:
+        _, details = calculate_match_score(user_profile, internship, skill_index)
+    reasons = []
     
-    # Calculate all matches
-    all_matches = []
-    for profile in user_profiles:
-        for internship in internships:
-            score, details = calculate_match_score(profile, internship)
-            all_matches.append({
-                "profile": profile,
-                "internship": internship,
-                "score": score,
-                "details": details
-            })
+    skill_overlap = skill_index.names(
+        skill_index.mask(user_profile.get("skills", [])) & skill_index.mask(internship["requirements"]["skills"]))
+    if skill_overlap:
+        reasons.append(f"Strong skill match: {', '.join(skill_overlap[:3])}")
     
-    # Sort by score
-    all_matches.sort(key=lambda x: x["score"], reverse=True)
+    cgpa_requirement = internship["requirements"]["minCgpa"]
+    user_cgpa = user_profile.get("cgpa", 7.0)
+    if details["cgpa_match"] == 20:
+        if user_cgpa >= cgpa_requirement + 0.5:
+            reasons.append(f"Exceeds CGPA requirement ({user_cgpa} > {cgpa_requirement})")
+        else:
+            reasons.append(f"Meets CGPA requirement ({user_cgpa} ≥ {cgpa_requirement})")
+    elif details["cgpa_match"] == 12:
+        reasons.append(f"Close to CGPA requirement ({user_cgpa} vs {cgpa_requirement})")
     
-    # Allocation results
-    allocated = []
-    used_internships = set()
-    used_profiles = set()
+    preferred_locations = user_profile.get("preferences", {}).get("location", [])
+    if details["location_match"] == 20:
+        if any(loc.lower() in internship["location"].lower() for loc in preferred_locations):
+            reasons.append("Matches location preference")
+        else:
+            reasons.append("Matches remote work preference")
+    elif details["location_match"] == 16:
+        distance = nearest_distance(preferred_locations, internship["location"])
+        reasons.append(f"Near your preferred location (~{distance:.0f} km)")
     
-    for match in all_matches:
-        profile_name = match["profile"]["name"]
-        internship_id = match["internship"]["id"]
-        
-        if profile_name not in used_profiles and internship_id not in used_internships:
-            allocated.append(match)
-            used_profiles.add(profile_name)
-            used_internships.add(internship_id)
+    if details["industry_match"] == 15:
+        reasons.append("Perfect industry match")
+    
+    if details["salary_match"] == 5:
+        reasons.append("Within salary expectations")
+    
+    return reasons
+
+def run_allocation_algorithm(user_profiles: List[Dict], internships: List[Dict], skill_rule: str = "overlap",
+                             algorithm: str = "greedy", sharding: str = "none") -> Dict:
+    """Smart allocation algorithm based on preferences and compatibility"""
+    
+    skill_index = get_skill_index()
+    weights = {**ALL_INDIA_WEIGHTS, "skill_rule": skill_rule}
+    
+    # One internship per profile (by name / id): best pairs first ("greedy"), the highest total ("optimal")
+    # or near-highest over sparse edges ("auction")
+    profile_keys = [profile["name"] for profile in user_profiles]
+    internship_keys = [internship["id"] for internship in internships]
+    if sharding == "none" and algorithm == "auction":
+        # Sparse path: bid over each profile's and each internship's best AUCTION_TOP_K edges (float32),
+        # then score only the allocated pairs
+        graph = score_edges(user_profiles, internships, skill_index, weights, top_k=AUCTION_TOP_K,
+                            internship_top_k=AUCTION_TOP_K, dtype=np.float32)
+        profile_rows, internship_cols = auction_assignment(graph, profile_keys, internship_keys)
+        pair_components = score_pairs(user_profiles, internships, profile_rows, internship_cols, skill_index, weights)
+    elif sharding == "none":
+        # Score all pairs at once with the vectorized engine; skill_rule picks the skill component
+        components = score_components(user_profiles, internships, skill_index, weights)
+        scores = components["score"]
+        profile_rows, internship_cols = assign(scores, algorithm, profile_keys, internship_keys)
+        pair_components = {name: values[profile_rows, internship_cols] for name, values in components.items()}
+    else:
+        # Shards by state / industry in worker processes, then one reconciliation pass
+        profile_shards, internship_shards = SHARD_KEYS[sharding](user_profiles, internships)
+        profile_rows, internship_cols, pair_components, shard_stats = sharded_assignment(
+            user_profiles, internships, profile_shards, internship_shards, skill_index, weights,
+            algorithm, profile_keys, internship_keys
+        )
+    if algorithm != "greedy" or sharding != "none":
+        # List the allocation best first, as greedy does
+        order = np.argsort(-pair_components["score"], kind="stable") if len(profile_rows) else np.zeros(0, dtype=int)
+        profile_rows, internship_cols = profile_rows[order], internship_cols[order]
+        pair_components = {name: values[order] for name, values in pair_components.items()}
+    
+    allocated = []
+    for pair, (profile_idx, internship_idx) in enumerate(zip(profile_rows, internship_cols)):
+        # Numeric components only; reasons are built by explain_match if the pair is rendered
+        details = {name: float(values[pair]) for name, values in pair_components.items() if name != "score"}
+        allocated.append({
+            "profile": user_profiles[profile_idx],
+            "internship": internships[internship_idx],
+            "score": float(pair_components["score"][pair]),
+            "details": details
+        })
     
     # Calculate statistics
     total_score = sum([match["score"] for match in allocated])
     avg_score = total_score / len(allocated) if allocated else 0
     
-    return {
+    result = {
         "allocated": allocated,
+        "algorithm": algorithm,
+        "sharding": sharding,
         "total_matches": len(allocated),
+        "total_score": total_score,
         "average_score": avg_score,
         "success_rate": len(allocated) / len(user_profiles) * 100 if user_profiles else 0,
         "unallocated_profiles": len(user_profiles) - len(allocated)
     }
+    if sharding != "none":
+        result["shard_stats"] = shard_stats
+    elif algorithm == "auction":
+        result["graph_stats"] = {"edges": len(graph), "megabytes": graph.nbytes / 1e6}
+    elif algorithm != "greedy":
+        # Greedy baseline on the same scores, for comparison
+        baseline = greedy_assignment(scores, profile_keys, internship_keys)
+        result["baseline"] = {"algorithm": "greedy", **assignment_summary(scores, *baseline)}
+    return result
 
 def matching_page():
     """Enhanced Find Matches page with full functionality"""
     st.markdown("# 🔍 Find My Perfect Match")
     
     # Load sample profiles
-    sample_profiles = get_all_india_sample_profiles()
+    sample_profiles = load_sample_profile_records()
     all_skills = get_all_india_skills()
     
     # Sidebar for profile creation
@@ -1905,17 +2020,24 @@ def matching_page():
         work_mode = st.selectbox("🏢 Work Mode", 
             ["Office", "Remote", "Hybrid", "Field Work"],
             index=["Office", "Remote", "Hybrid", "Field Work"].index(profile["preferences"]["work_mode"]))
+        
+        # Optional result filters, applied as masks over the internship table
+        st.markdown("### 🔎 Refine Matches")
+        internship_table = get_internship_table(INTERNSHIP_DATA_VERSION)
+        state_filter = st.multiselect("🗺️ States",
+            sorted(state for state in internship_table.categories["state"] if state))
+        remote_only = st.checkbox("🏠 Remote internships only")
     
     # Main matching interface
     if name and email and selected_skills:
-        user_profile = {
+        user_profile = ProfileRecord.from_dict({
             "name": name, "email": email, "skills": selected_skills, "cgpa": cgpa,
             "university": university, "location": location, "industry": industry, "experience": experience,
             "preferences": {
                 "location": preferred_locations, "industries": [industry], 
                 "salary_range": list(salary_range), "work_mode": work_mode
             }
-        }
+        }, get_record_vocabulary())
         
         col1, col2 = st.columns(2)
         with col1:
@@ -1923,40 +2045,34 @@ def matching_page():
                 st.session_state.run_matching = True
         
         with col2:
-            if st.button("🚀 Run Smart Allocation", type="secondary", width="stretch"):
-                st.session_state.run_allocation = True
+            skill_rule = st.selectbox("🧮 Allocation Skill Scoring", list(SKILL_RULES), format_func=SKILL_RULES.get)
+            algorithm = st.selectbox("⚖️ Allocation Algorithm", list(ALLOCATION_ALGORITHMS),
+                                     format_func=ALLOCATION_ALGORITHMS.get)
+            sharding = st.selectbox("🗺️ Allocation Sharding", list(SHARDING_MODES), format_func=SHARDING_MODES.get)
+            run_allocation = st.button("🚀 Run Smart Allocation", type="secondary", width="stretch")
         
         # Find matches
         if st.session_state.get("run_matching", False):
             with st.spinner("🔍 Finding your perfect matches..."):
-                time.sleep(2)
-                internships = load_all_india_internships()
-                
-                matches = []
-                for internship in internships:
-                    score, details = calculate_match_score(user_profile, internship)
-                    matches.append({
-                        "internship": internship,
-                        "score": score,
-                        "details": details
-                    })
+                posting_index = get_posting_index(INTERNSHIP_DATA_VERSION)
                 
-                matches.sort(key=lambda x: x["score"], reverse=True)
-                st.session_state.matches = matches[:10]  # Top 10 matches
+                # Cached component columns make reruns rescore only the changed input; matches carry numeric components only
+                st.session_state.matches = posting_index.top_k_matches(
+                    user_profile, k=10, filters={"states": state_filter, "remote_only": remote_only}
+                )
+                st.session_state.match_profile = user_profile
             
             st.success(f"✅ Found {len(st.session_state.matches)} perfect matches for you!")
         
-        # Run allocation
-        if st.session_state.get("run_allocation", False):
+        # Run allocation once per press; reruns show the result kept in session state
+        if run_allocation:
             with st.spinner("🚀 Running smart allocation algorithm..."):
-                time.sleep(3)
-                
                 # Use sample profiles for allocation simulation
                 profiles = list(sample_profiles.values())
                 profiles.append(user_profile)  # Add current user
                 
-                internships = load_all_india_internships()
-                allocation_result = run_allocation_algorithm(profiles, internships)
+                internships = load_internship_records(INTERNSHIP_DATA_VERSION)
+                allocation_result = run_allocation_algorithm(profiles, internships, skill_rule, algorithm, sharding)
                 
                 st.session_state.allocation_result = allocation_result
             
@@ -2020,9 +2136,9 @@ def matching_page():
                         if st.button(f"Apply Now 🚀", key=f"apply_{internship['id']}"):
                             st.success("Application submitted! 🎉")
                     
-                    # Match reasons
+                    # Match reasons, built only for the matches rendered here
                     st.markdown("**Why this matches you:**")
-                    for reason in details["reasons"]:
+                    for reason in explain_match(st.session_state.match_profile, internship, details):
                         st.write(f"✅ {reason}")
         
         # Display allocation results
@@ -2037,10 +2153,25 @@ def matching_page():
             with col2:
                 st.metric("Success Rate", f"{result['success_rate']:.1f}%")
             with col3:
-                st.metric("Avg Match Score", f"{result['average_score']:.1f}%")
+                baseline = result.get("baseline")
+                st.metric("Avg Match Score", f"{result['average_score']:.1f}%",
+                          f"{result['average_score'] - baseline['average_score']:+.1f} vs greedy" if baseline else None)
             with col4:
                 st.metric("Unallocated", result["unallocated_profiles"])
             
+            if result.get("baseline"):
+                st.caption(f"Total match score {result['total_score']:,.1f} "
+                           f"(greedy: {result['baseline']['total_score']:,.1f})")
+            if result.get("shard_stats"):
+                stats = result["shard_stats"]
+                st.caption(f"{SHARDING_MODES[result['sharding']]}: {stats['shards']} shards in {stats['tasks']} tasks; "
+                           f"reconciliation pass over {stats['reconciled_profiles']} profiles "
+                           f"and {stats['reconciled_internships']} open internships")
+            if result.get("graph_stats"):
+                stats = result["graph_stats"]
+                st.caption(f"Auction over {stats['edges']:,} candidate edges ({stats['megabytes']:,.1f} MB), "
+                           f"top {AUCTION_TOP_K} per profile and per internship")
+
             # Show allocation table
             allocation_data = []
             for match in result["allocated"]:
@@ -2067,13 +2198,14 @@ def analytics_page():
     
     # Load data
     internships = load_all_india_internships()
+    internship_table = get_internship_table(INTERNSHIP_DATA_VERSION)
     
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("Total Opportunities", f"{len(internships) * 50:,}", "↗️ +12%")
     with col2:
-        avg_salary = np.mean([i["salary"] for i in internships])
+        avg_salary = internship_table.columns["salary"].mean()
         st.metric("Average Salary", f"₹{avg_salary:,.0f}", "↗️ +8%")
     with col3:
         st.metric("Industries Covered", "12+", "🔥 Complete")
@@ -2196,14 +2328,18 @@ def companies_page():
         size_filter = st.selectbox("Filter by Size",
             ["All Sizes", "Large (50,000+)", "Medium (10,000-50,000)", "Small (<10,000)"])
     
-    # Filter companies
-    filtered_companies = companies_data.copy()
+    # Filter companies with array masks over their industry / location columns
+    company_industries = np.array([c["industry"] for c in companies_data])
+    company_locations = np.array([c["location"] for c in companies_data])
+    company_mask = np.ones(len(companies_data), dtype=bool)
     
     if industry_filter != "All Industries":
-        filtered_companies = [c for c in filtered_companies if c["industry"] == industry_filter]
+        company_mask &= company_industries == industry_filter
     
     if location_filter != "All Locations":
-        filtered_companies = [c for c in filtered_companies if location_filter in c["location"]]
+        company_mask &= np.char.find(company_locations, location_filter) >= 0
+    
+    filtered_companies = [companies_data[i] for i in np.flatnonzero(company_mask)]
     
     # Display companies
     for company in filtered_companies:
@@ -2299,6 +2435,32 @@ def profile_page():
         with col3:
             st.write(f"*Target: {goal['Target']}*")
 
+@st.fragment(run_every=0.5)
+def smart_allocation_job_panel():
+    """Progress of the background smart allocation; stores its outcome and reruns the page once it has ended"""
+    job = st.session_state.get('smart_allocation_job')
+    if job is None:
+        return
+    snapshot = job.snapshot()
+    if snapshot['status'] == 'running':
+        detail = f" · {snapshot['done']:,} / {snapshot['total']:,}" if snapshot['total'] else ""
+        st.progress(snapshot['fraction'], text=f"🤖 {snapshot['stage']}{detail} · {snapshot['elapsed']:.1f}s")
+        if st.button("⏹️ Cancel Allocation"):
+            job.cancel()
+        return
+    
+    del st.session_state.smart_allocation_job
+    if snapshot['status'] == 'done':
+        st.session_state.allocation_results = job.result
+        st.session_state.smart_allocation_notice = (
+            'success', f"✅ Successfully allocated {len(job.result)} internships!"
+        )
+    elif snapshot['status'] == 'cancelled':
+        st.session_state.smart_allocation_notice = ('warning', "⏹️ Allocation cancelled; previous results are kept")
+    else:
+        st.session_state.smart_allocation_notice = ('error', f"❌ Allocation failed: {job.error}")
+    st.rerun()
+
 def smart_allocation_page():
     """Smart Allocation System Page"""
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
@@ -2364,49 +2526,45 @@ def smart_allocation_page():
         ]
         return internships_data, student_profiles
     
-    def calculate_match_score(student, internship):
-        score = 0
-        student_skills = set([skill.lower() for skill in student['skills']])
-        required_skills = set([skill.lower() for skill in internship['skills_required']])
-        skill_match = len(student_skills.intersection(required_skills)) / len(required_skills)
-        score += skill_match * 40
-        if internship['location'] in student['location_preference'] or internship['remote_option']:
-            score += 20
-        if student['field_interest'].lower() == 'technology' and 'TECH' in internship['id']:
-            score += 25
-        elif student['field_interest'].lower() == 'finance' and 'FIN' in internship['id']:
-            score += 25
-        score += 15  # Base experience match
-        return min(100, score)
-    
-    def smart_allocation_algorithm(students, internships, preferences):
+    @st.cache_resource
+    def get_allocation_skill_index() -> SkillIndex:
+        """Interned skill vocabulary of the allocation internships, built once and shared across reruns"""
+        internships_data, _ = load_allocation_data()
+        return SkillIndex.from_skill_lists(
+            *(internship['skills_required'] for field_internships in internships_data.values() for internship in field_internships)
+        )
+    
+    def smart_allocation_algorithm(students, internships, preferences, job=None):
         allocations = []
-        matches = []
-        for student in students:
-            for field, field_internships in internships.items():
-                for internship in field_internships:
-                    if internship['filled'] < internship['slots']:
-                        score = calculate_match_score(student, internship)
-                        matches.append({
-                            'student': student, 'internship': internship, 'score': score, 'field': field
-                        })
-        
-        matches.sort(key=lambda x: x['score'], reverse=True)
-        allocated_students = set()
-        
-        for match in matches[:preferences['max_allocations']]:
-            if match['student']['id'] not in allocated_students:
-                if match['score'] >= preferences['min_match_score']:
-                    allocations.append({
-                        'student_name': match['student']['name'],
-                        'internship_title': match['internship']['title'],
-                        'company': match['internship']['company'],
-                        'location': match['internship']['location'],
-                        'match_score': match['score'],
-                        'stipend': match['internship']['stipend'],
-                        'field': match['field']
-                    })
-                    allocated_students.add(match['student']['id'])
+        open_internships = [
+            (field, internship)
+            for field, field_internships in internships.items()
+            for internship in field_internships
+            if internship['filled'] < internship['slots']
+        ]
+        # Skills 40, location 20, field 25 (the group an internship is listed under), experience 15;
+        # pairs below the minimum score are never kept
+        graph = score_edges(
+            [student_profile(student) for student in students],
+            [internship_posting(internship, field) for field, internship in open_internships],
+            skill_index, weights="smart_allocation", min_score=preferences['min_match_score'],
+            progress=stage_progress(job, "Scoring pairs")
+        )
+        # Lazy greedy: best pair first, one internship per student, up to max_allocations and the open slots
+        capacities = [internship['slots'] - internship['filled'] for _, internship in open_internships]
+        rows, cols = greedy_capacitated_assignment(graph, capacities, limit=preferences['max_allocations'],
+                                                   progress=stage_progress(job, "Filling seats"))
+        for row, col, score in zip(rows, cols, graph.pair_scores(rows, cols)):
+            field, internship = open_internships[col]
+            allocations.append({
+                'student_name': students[row]['name'],
+                'internship_title': internship['title'],
+                'company': internship['company'],
+                'location': internship['location'],
+                'match_score': float(score),
+                'stipend': internship['stipend'],
+                'field': field
+            })
         return allocations
     
     # Sidebar controls
@@ -2422,6 +2580,7 @@ def smart_allocation_page():
     
     # Main content
     internships_data, student_profiles = load_allocation_data()
+    skill_index = get_allocation_skill_index()
     
     # Preferences display
     col1, col2, col3 = st.columns(3)
@@ -2432,22 +2591,25 @@ def smart_allocation_page():
     with col3:
         st.metric("Available Students", len(student_profiles))
     
+    # Allocation runs on a worker thread (a new run cancels the one in flight); the panel follows it across reruns
     if run_allocation:
-        with st.spinner("🤖 Running Smart Allocation Algorithm..."):
-            progress_bar = st.progress(0)
-            for i in range(100):
-                time.sleep(0.01)
-                progress_bar.progress(i + 1)
-            
-            preferences = {
-                'max_allocations': max_allocations,
-                'min_match_score': min_match_score,
-                'selected_fields': selected_fields
-            }
-            
-            allocations = smart_allocation_algorithm(student_profiles, internships_data, preferences)
-            st.session_state.allocation_results = allocations
-            st.success(f"✅ Successfully allocated {len(allocations)} internships!")
+        preferences = {
+            'max_allocations': max_allocations,
+            'min_match_score': min_match_score,
+            'selected_fields': selected_fields
+        }
+        previous = st.session_state.get('smart_allocation_job')
+        if previous is not None:
+            previous.cancel()
+        st.session_state.smart_allocation_job = AllocationJob(
+            lambda job: smart_allocation_algorithm(student_profiles, internships_data, preferences, job),
+            prepare=add_script_run_ctx
+        )
+    if st.session_state.get('smart_allocation_job') is not None:
+        smart_allocation_job_panel()
+    notice = st.session_state.pop('smart_allocation_notice', None)
+    if notice:
+        getattr(st, notice[0])(notice[1])
     
     # Display results
     if 'allocation_results' in st.session_state and st.session_state.allocation_results:
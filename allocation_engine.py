@@ -0,0 +1,1350 @@
+"""Allocation solvers over a dense (profiles × internships) score matrix.
+
+The pages score every pair with ``matching_engine`` and then pick pairs. Two
+one-to-one rules are available (each profile and each internship used at most
+once):
+
+  - ``"greedy"``: walk pairs from best to worst, as the pages always have
+  - ``"optimal"``: maximize the total score of the allocation (rectangular
+    assignment problem), solved with shortest augmenting paths in the style of
+    Jonker-Volgenant, with the inner scans vectorized in NumPy
+  - ``"auction"``: near-optimal total with the auction algorithm and
+    epsilon-scaling (``auction_assignment``); it runs on a sparse
+    ``ScoreGraph`` with memory linear in the edges, for markets too large to
+    score densely
+
+Internships with several seats use ``CAPACITY_ALGORITHMS``: a min-cost flow
+over a sparse ``ScoreGraph`` (optionally with seats reserved for quota groups),
+or deferred acceptance (Gale-Shapley) when internships rank candidates by
+their own scores and the result must be stable. A flow round can be kept in
+memory (``IncrementalAllocation``) and repaired after withdrawals and slot
+changes, or carried through later refill and upgrade rounds
+(``AllocationRounds``).
+
+Large rounds can be sharded (``sharded_assignment``): profiles and
+internships are partitioned by state or industry, shards are solved in
+worker processes, and a reconciliation pass allocates what the shards could
+not.
+
+Pure module: no Streamlit imports.
+"""
+import heapq
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gazetteer import UNKNOWN_PLACE, default_gazetteer
+from matching_engine import ALL_INDIA_WEIGHTS, ScoreGraph, SkillIndex, greedy_order, score_components
+
+# Selectable allocation algorithms with their UI labels
+ALLOCATION_ALGORITHMS = {
+    "greedy": "Greedy (best pair first)",
+    "optimal": "Optimal (highest total score)",
+    "auction": "Auction (near-optimal, sparse edges)",
+}
+
+# Selectable capacity-aware allocation algorithms (multi-seat internships) with their UI labels
+CAPACITY_ALGORITHMS = {
+    "greedy": "Greedy (best pair first)",
+    "min_cost_flow": "Min-cost flow (highest total score)",
+    "stable_students": "Stable matching (student-proposing)",
+    "stable_companies": "Stable matching (company-proposing)",
+}
+
+# Which side proposes in each stable-matching mode
+STABLE_PROPOSERS = {"stable_students": "students", "stable_companies": "companies"}
+
+# Selectable ways to shard an allocation round with their UI labels
+SHARDING_MODES = {
+    "none": "Single pass",
+    "state": "By state",
+    "industry": "By industry",
+}
+
+# Largest (profiles × internships) block one shard scores; bigger shards are split round-robin
+MAX_SHARD_PAIRS = 2_000_000
+
+# Score bonus for a quota member taking a reserved seat instead of an open one: only breaks ties,
+# so open seats are left to everyone else
+RESERVED_SEAT_PREFERENCE = 1e-6
+
+# Auction solver: epsilon shrinks by AUCTION_SCALING per phase down to AUCTION_EPSILON, which bounds the
+# total score lost to the optimum by AUCTION_EPSILON per profile
+AUCTION_SCALING = 6.0
+AUCTION_EPSILON = 1e-3
+
+# Edges kept per profile and per internship for the sparse auction path (``score_edges`` top_k / internship_top_k)
+AUCTION_TOP_K = 200
+
+# Augmenting paths or greedy picks between two calls of a ``progress(done, total)`` callback
+PROGRESS_INTERVAL = 1024
+
+# Bidding passes before the augmenting phase; more passes help score matrices with many ties
+ROW_REDUCTION_PASSES = 4
+
+
+def _group_codes(keys: Sequence, size: int) -> np.ndarray:
+    """Group id per row / column: equal keys share an id; no keys means every entry stands alone"""
+    if keys is None:
+        return np.arange(size)
+    codes: Dict = {}
+    return np.array([codes.setdefault(key, len(codes)) for key in keys], dtype=np.int64)
+
+
+def greedy_assignment(scores: np.ndarray, profile_keys: Sequence = None,
+                      internship_keys: Sequence = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(profile rows, internship columns) picked best pair first, in pick order.
+
+    Profiles (internships) with equal keys, e.g. the same name or id, are
+    allocated at most once between them.
+    """
+    profiles, internships = scores.shape
+    profile_groups = _group_codes(profile_keys, profiles).tolist()
+    internship_groups = _group_codes(internship_keys, internships).tolist()
+    used_profiles, used_internships = set(), set()
+    rows, cols = [], []
+    limit = min(len(set(profile_groups)), len(set(internship_groups)))
+
+    # Stop once either side is exhausted
+    for flat_index in greedy_order(scores):
+        if len(rows) == limit:
+            break
+        row, col = divmod(int(flat_index), internships)
+        profile, internship = profile_groups[row], internship_groups[col]
+        if profile not in used_profiles and internship not in used_internships:
+            used_profiles.add(profile)
+            used_internships.add(internship)
+            rows.append(row)
+            cols.append(col)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+
+def _collapse_groups(scores: np.ndarray, groups: np.ndarray) -> Tuple[np.ndarray, Callable]:
+    """Best score of each group of rows against every column, and a (groups, columns) -> rows lookup"""
+    count = groups.max(initial=-1) + 1
+    if count == len(groups):
+        return scores, lambda group_ids, cols: group_ids
+    first = np.full(count, -1, dtype=np.int64)
+    first[groups[::-1]] = np.arange(len(groups))[::-1]
+    best = scores[first]
+    winners = {}
+    for group in np.flatnonzero(np.bincount(groups, minlength=count) > 1):
+        members = np.flatnonzero(groups == group)
+        winners[group] = members[scores[members].argmax(axis=0)]
+        best[group] = scores[winners[group], np.arange(scores.shape[1])]
+
+    def member(group_ids, cols):
+        return np.array([winners[group][col] if group in winners else first[group]
+                         for group, col in zip(group_ids, cols)], dtype=np.int64)
+    return best, member
+
+
+def _augment_rows(cost: np.ndarray) -> np.ndarray:
+    """Column assigned to each row minimizing total ``cost``; requires rows <= columns and cost >= 0"""
+    rows, cols = cost.shape
+    u = np.zeros(rows)
+    v = np.zeros(cols)
+    col_for_row = np.full(rows, -1, dtype=np.int64)
+    row_for_col = np.full(cols, -1, dtype=np.int64)
+
+    # Warm start (augmenting row reduction): free rows bid for their cheapest column, raising its
+    # price by the margin over their second choice and displacing its owner. Prices only rise on
+    # assigned columns, so the duals stay feasible for the augmenting phase below.
+    if cols > 1:
+        for _ in range(ROW_REDUCTION_PASSES):
+            free = list(np.flatnonzero(col_for_row < 0))
+            position, budget = 0, 8 * rows
+            while position < len(free) and budget:
+                row = free[position]
+                position += 1
+                budget -= 1
+                reduced = cost[row] - v
+                first, second = np.argpartition(reduced, 1)[:2]
+                if reduced[second] < reduced[first]:
+                    first, second = second, first
+                lowest, runner_up = reduced[first], reduced[second]
+                owner = row_for_col[first]
+                if lowest < runner_up:
+                    v[first] -= runner_up - lowest
+                elif owner >= 0:
+                    # Tie: take the runner-up column instead, leaving the owner in place if it is free
+                    first = second
+                    owner = row_for_col[first]
+                if owner >= 0:
+                    col_for_row[owner] = -1
+                    if lowest < runner_up:
+                        # The displaced row bids again straight away
+                        position -= 1
+                        free[position] = owner
+                col_for_row[row] = first
+                row_for_col[first] = row
+    assigned = np.flatnonzero(col_for_row >= 0)
+    u[assigned] = cost[assigned, col_for_row[assigned]] - v[col_for_row[assigned]]
+
+    for current in np.flatnonzero(col_for_row < 0):
+        # Dijkstra over reduced costs from the free row until it reaches a free column. Columns
+        # tied at the shortest distance are scanned together, so plateaus of equal scores cost one
+        # vectorized step; "frontier" holds tentative distances of unscanned columns.
+        path = np.full(cols, -1, dtype=np.int64)
+        frontier = np.full(cols, np.inf)
+        is_scanned = np.zeros(cols, dtype=bool)
+        scanned, visited_rows = [], []
+        shortest = 0.0
+        batch = np.array([current])
+        while True:
+            reduced = cost[batch] - v
+            reduced += (shortest - u[batch])[:, None]
+            via = reduced.argmin(axis=0)
+            reduced = reduced[via, np.arange(cols)]
+            reduced[is_scanned] = np.inf
+            improved = reduced < frontier
+            path[improved] = batch[via[improved]]
+            np.minimum(frontier, reduced, out=frontier)
+
+            shortest = frontier.min()
+            ties = np.flatnonzero(frontier == shortest)
+            free = ties[row_for_col[ties] < 0]
+            if len(free):
+                sink = free[0]
+                break
+            scanned.append((ties, shortest))
+            is_scanned[ties] = True
+            frontier[ties] = np.inf
+            batch = row_for_col[ties]
+            visited_rows.append(batch)
+
+        # Dual update keeps reduced costs non-negative and tight along the assignment; each visited
+        # row was reached through the scanned column it owns, at that column's distance
+        u[current] += shortest
+        for (columns, distance), owners in zip(scanned, visited_rows):
+            u[owners] += shortest - distance
+            v[columns] -= shortest - distance
+
+        # Flip the alternating path back to the free row
+        col = sink
+        while True:
+            row = path[col]
+            row_for_col[col] = row
+            col_for_row[row], col = col, col_for_row[row]
+            if row == current:
+                break
+    return col_for_row
+
+
+def optimal_assignment(scores: np.ndarray, profile_keys: Sequence = None,
+                       internship_keys: Sequence = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(profile rows, internship columns) with the highest total score, ordered by row.
+
+    Every profile is allocated when there are at least as many internships
+    (and vice versa); O(n² m) worst case, far less when most profiles have a
+    distinct best internship. Equal keys are allocated at most once between
+    them, by solving on the best member of each group.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    profile_groups = _group_codes(profile_keys, scores.shape[0])
+    internship_groups = _group_codes(internship_keys, scores.shape[1])
+    grouped, profile_member = _collapse_groups(scores, profile_groups)
+    grouped, internship_member = _collapse_groups(grouped.T, internship_groups)
+    grouped = grouped.T
+
+    # Minimize a non-negative cost; solve with the shorter side as rows
+    cost = grouped.max() - grouped
+    if cost.shape[0] <= cost.shape[1]:
+        rows = np.arange(cost.shape[0])
+        cols = _augment_rows(cost)
+    else:
+        cols = np.arange(cost.shape[1])
+        rows = _augment_rows(cost.T)
+
+    # Back from groups to the member rows and columns that scored best
+    cols = internship_member(cols, rows)
+    rows = profile_member(rows, cols)
+    order = np.argsort(rows, kind="stable")
+    return rows[order], cols[order]
+
+
+def _edge_slices(offsets: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Edge positions of the given CSR rows, concatenated"""
+    starts, ends = offsets[rows], offsets[rows + 1]
+    lengths = ends - starts
+    return np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+
+
+def _segment_best(values: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Best value, its position and the second-best value (-inf if none) of consecutive non-empty segments"""
+    starts = np.cumsum(lengths) - lengths
+    best = np.maximum.reduceat(values, starts)
+    candidates = np.flatnonzero(values == np.repeat(best, lengths))
+    segments = np.repeat(np.arange(len(lengths)), lengths)[candidates]
+    first = candidates[np.concatenate([[True], segments[1:] != segments[:-1]])]
+    rest = values.copy()
+    rest[first] = -np.inf
+    return best, first, np.maximum.reduceat(rest, starts)
+
+
+def _winners(targets: np.ndarray, offers: np.ndarray) -> np.ndarray:
+    """Index of the highest offer for each distinct target (earliest on ties)"""
+    order = np.lexsort((-offers, targets))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = targets[order][1:] != targets[order][:-1]
+    return order[first]
+
+
+def _auction(offsets: np.ndarray, cols: np.ndarray, values: np.ndarray, columns: int,
+             epsilon: float, scaling: float) -> np.ndarray:
+    """Object of each person (-1: its zero-value outside option) maximizing total ``values`` within ``epsilon`` each.
+
+    Forward auction with epsilon-scaling, every bidding round vectorized over
+    all unassigned persons (Jacobi). A reverse pass at the end of each phase
+    lowers the price of objects left empty with a positive price, as
+    asymmetric problems need (Bertsekas & Castañón).
+    """
+    persons = len(offsets) - 1
+    degrees = np.diff(offsets)
+    edge_rows = np.repeat(np.arange(persons), degrees)
+    col_order = np.argsort(cols, kind="stable")
+    col_degrees = np.bincount(cols, minlength=columns)
+    col_offsets = np.concatenate([[0], np.cumsum(col_degrees)])
+    prices = np.zeros(columns)
+    eps = max(values.max(initial=0.0) / scaling, epsilon)
+
+    while True:
+        owner = np.full(columns, -1, dtype=np.int64)
+        assigned = np.full(persons, -1, dtype=np.int64)
+        assigned_edge = np.full(persons, -1, dtype=np.int64)
+
+        # Forward: unassigned persons bid the margin of their best object over the next option plus eps
+        pending = np.flatnonzero(degrees > 0)
+        while len(pending):
+            edges = _edge_slices(offsets, pending)
+            best, first, second = _segment_best(values[edges] - prices[cols[edges]], degrees[pending])
+            bidding = best > 0
+            bidders, bid_edges = pending[bidding], edges[first[bidding]]
+            targets = cols[bid_edges]
+            bids = prices[targets] + best[bidding] - np.maximum(second[bidding], 0) + eps
+            won = _winners(targets, bids)
+            objects, winners = targets[won], bidders[won]
+            displaced = owner[objects]
+            displaced = displaced[displaced >= 0]
+            assigned[displaced] = -1
+            owner[objects] = winners
+            assigned[winners] = objects
+            assigned_edge[winners] = bid_edges[won]
+            prices[objects] = bids[won]
+            lost = np.ones(len(bidders), dtype=bool)
+            lost[won] = False
+            pending = np.concatenate([bidders[lost], displaced])
+
+        # Reverse: empty objects with a positive price bid for persons, or drop their price to zero
+        profit = np.zeros(persons)
+        placed = assigned >= 0
+        profit[placed] = values[assigned_edge[placed]] - prices[assigned[placed]]
+        queue = np.flatnonzero((owner < 0) & (prices > 0))
+        while len(queue):
+            edges = col_order[_edge_slices(col_offsets, queue)]
+            best, first, second = _segment_best(values[edges] - profit[edge_rows[edges]], col_degrees[queue])
+            prices[queue[best <= eps]] = 0.0
+            bidding = best > eps
+            objects, offer_edges = queue[bidding], edges[first[bidding]]
+            offer_prices = np.maximum(second[bidding] - eps, 0.0)
+            targets = edge_rows[offer_edges]
+            offers = values[offer_edges] - offer_prices
+            won = _winners(targets, offers)
+            winners, objects_won = targets[won], objects[won]
+            previous = assigned[winners]
+            previous = previous[previous >= 0]
+            owner[previous] = -1
+            owner[objects_won] = winners
+            assigned[winners] = objects_won
+            assigned_edge[winners] = offer_edges[won]
+            prices[objects_won] = offer_prices[won]
+            profit[winners] = offers[won]
+            lost = np.ones(len(objects), dtype=bool)
+            lost[won] = False
+            queue = np.concatenate([objects[lost], previous[prices[previous] > 0]])
+
+        if eps <= epsilon:
+            return assigned
+        eps = max(eps / scaling, epsilon)
+
+
+def _collapse_edge_groups(graph: ScoreGraph, profile_groups: np.ndarray,
+                          internship_groups: np.ndarray) -> Tuple[ScoreGraph, np.ndarray]:
+    """Graph over groups keeping the best edge of each (profile group, internship group), with its edge ids"""
+    edge_rows = profile_groups[graph.row_ids()]
+    edge_cols = internship_groups[graph.cols]
+    order = np.lexsort((-graph.scores, edge_cols, edge_rows))
+    new_pair = np.ones(len(order), dtype=bool)
+    new_pair[1:] = (edge_rows[order][1:] != edge_rows[order][:-1]) | (edge_cols[order][1:] != edge_cols[order][:-1])
+    kept = order[new_pair]
+    counts = np.bincount(edge_rows[kept], minlength=profile_groups.max(initial=-1) + 1)
+    grouped = ScoreGraph(np.concatenate([[0], np.cumsum(counts)]), edge_cols[kept], graph.scores[kept],
+                         (len(counts), internship_groups.max(initial=-1) + 1))
+    return grouped, kept
+
+
+def auction_assignment(graph: ScoreGraph, profile_keys: Sequence = None, internship_keys: Sequence = None,
+                       unallocated_penalty: float = 100.0, epsilon: float = AUCTION_EPSILON,
+                       scaling: float = AUCTION_SCALING) -> Tuple[np.ndarray, np.ndarray]:
+    """(profile rows, internship columns) of a near-optimal one-to-one allocation over a sparse ``ScoreGraph``.
+
+    Auction algorithm with epsilon-scaling: memory is linear in the edges,
+    and the total (score minus ``unallocated_penalty`` per unallocated
+    profile) is within ``epsilon`` per profile of the optimum. Profiles
+    without an edge stay unallocated. Equal keys are allocated at most once
+    between them, by solving on the best edge of each pair of groups.
+    """
+    profile_groups = _group_codes(profile_keys, graph.shape[0])
+    internship_groups = _group_codes(internship_keys, graph.shape[1])
+    grouped, edge_ids = graph, None
+    if profile_keys is not None or internship_keys is not None:
+        grouped, edge_ids = _collapse_edge_groups(graph, profile_groups, internship_groups)
+
+    values = np.asarray(grouped.scores, dtype=np.float64) + unallocated_penalty
+    assigned = _auction(grouped.offsets, grouped.cols, values, grouped.shape[1], epsilon, scaling)
+    rows = np.flatnonzero(assigned >= 0)
+    if edge_ids is None:
+        return rows, assigned[rows]
+
+    # Back from groups to the member rows and columns of the chosen edges
+    edges = _edge_slices(grouped.offsets, rows)
+    chosen = edge_ids[edges[grouped.cols[edges] == np.repeat(assigned[rows], np.diff(grouped.offsets)[rows])]]
+    rows = np.searchsorted(graph.offsets, chosen, side="right") - 1
+    order = np.argsort(rows, kind="stable")
+    return rows[order], graph.cols[chosen][order].astype(np.int64)
+
+
+class _UnitFlow:
+    """Min-cost flow from CSR rows (``supply`` units each) into columns (``capacity`` seats each).
+
+    Every unit is a source of one, so a multi-unit row or multi-seat column
+    behaves like identical copies; copies of a column share its dual price.
+    A unit may stay unassigned at ``unassigned_cost``. Costs must be >= 0 and
+    at most ``unassigned_cost``. ``unit_col`` is each unit's column, -1 when
+    unassigned. Dual prices ``u`` (units) and ``v`` (columns) are kept, so
+    the flow can be repaired after units, seats or columns change.
+    """
+
+    def __init__(self, offsets: np.ndarray, edge_cols: np.ndarray, edge_cost: np.ndarray, supply: np.ndarray,
+                 capacity: np.ndarray, unassigned_cost: float):
+        rows, cols = len(offsets) - 1, len(capacity)
+        self.offsets, self.edge_cols, self.edge_cost = offsets, edge_cols, edge_cost
+        self.capacity = np.array(capacity, dtype=np.int64)
+        self.unassigned_cost = unassigned_cost
+        self.degrees = np.diff(offsets)
+        self.unit_row = np.repeat(np.arange(rows), supply)
+        self.active = np.ones(len(self.unit_row), dtype=bool)
+        self.u = np.zeros(len(self.unit_row))
+        self.v = np.zeros(cols)
+        self.unit_col = np.full(len(self.unit_row), -1, dtype=np.int64)
+        self.filled = np.zeros(cols, dtype=np.int64)
+        self.holders: List[set] = [set() for _ in range(cols)]
+        self.moves: List[Tuple[int, int, int]] = []
+        # Columns that must not be left empty, and (while tracked) units / columns whose prices moved
+        self.protected = np.zeros(cols, dtype=bool)
+        self.repriced_units: Optional[set] = None
+        self.repriced_cols: Optional[set] = None
+        self.frontier = np.full(cols, np.inf)
+        self.path = np.full(cols, -1, dtype=np.int64)
+        self.is_scanned = np.zeros(cols, dtype=bool)
+
+        # Warm start: the first unit of each row takes its cheapest column while it has seats (u = cost, v = 0)
+        first_units = np.concatenate([[0], np.cumsum(supply)[:-1]]).astype(np.int64) if rows else np.zeros(0, np.int64)
+        for row in np.flatnonzero((self.degrees > 0) & (supply > 0)):
+            start, end = offsets[row], offsets[row + 1]
+            best = start + int(edge_cost[start:end].argmin())
+            col = edge_cols[best]
+            if self.filled[col] < self.capacity[col]:
+                unit = first_units[row]
+                self.unit_col[unit] = col
+                self.filled[col] += 1
+                self.holders[col].add(unit)
+                self.u[unit] = edge_cost[best]
+        # Units of rows without any edge can only stay unassigned
+        self.u[self.degrees[self.unit_row] == 0] = unassigned_cost
+
+    def solve(self, progress: Callable[[int, int], None] = None):
+        """Augment from every free unit that has edges, calling ``progress(units done, units)`` now and then"""
+        units = np.flatnonzero((self.unit_col < 0) & (self.degrees[self.unit_row] > 0))
+        for done, unit in enumerate(units):
+            if progress is not None and done % PROGRESS_INTERVAL == 0:
+                progress(done, len(units))
+            self.augment(unit)
+        if progress is not None:
+            progress(len(units), len(units))
+
+    def _move(self, unit: int, col: int):
+        """Reassign a unit to ``col`` (-1: unassigned), keeping seat counts and holders in step"""
+        previous = self.unit_col[unit]
+        self.moves.append((unit, previous, col))
+        if previous >= 0:
+            self.holders[previous].discard(unit)
+            self.filled[previous] -= 1
+        if col >= 0:
+            self.holders[col].add(unit)
+            self.filled[col] += 1
+        self.unit_col[unit] = col
+
+    def augment(self, current: int) -> List[int]:
+        """Shortest augmenting path from a free unit; returns the units whose column changed"""
+        offsets, edge_cols, edge_cost, degrees = self.offsets, self.edge_cols, self.edge_cost, self.degrees
+        unit_row, unit_col, u, v = self.unit_row, self.unit_col, self.u, self.v
+        capacity, filled, holders = self.capacity, self.filled, self.holders
+        frontier, path, is_scanned = self.frontier, self.path, self.is_scanned
+        unassigned_cost = self.unassigned_cost
+
+        scanned, visited, touched = [], [], []
+        shortest = 0.0
+        # Cheapest "leave a visited unit unassigned" sink seen so far: (distance, unit)
+        dummy = (unassigned_cost - u[current], current)
+        batch = np.array([current])
+        while True:
+            batch_rows = unit_row[batch]
+            edges = _edge_slices(offsets, batch_rows)
+            targets = edge_cols[edges]
+            reduced = shortest + edge_cost[edges] - np.repeat(u[batch], degrees[batch_rows]) - v[targets]
+            sources = np.repeat(batch, degrees[batch_rows])
+            open_edges = ~is_scanned[targets] & (capacity[targets] > 0) & (reduced < frontier[targets])
+            if open_edges.any():
+                # Keep the shortest edge into each column (any one of equally short edges)
+                targets, reduced, sources = targets[open_edges], reduced[open_edges], sources[open_edges]
+                np.minimum.at(frontier, targets, reduced)
+                shortest_edge = reduced == frontier[targets]
+                path[targets[shortest_edge]] = sources[shortest_edge]
+                touched.append(targets)
+
+            shortest = frontier.min()
+            if dummy[0] < shortest:
+                shortest, sink, sink_unit = dummy[0], -1, dummy[1]
+                break
+            ties = np.flatnonzero(frontier == shortest)
+            free = ties[filled[ties] < capacity[ties]]
+            if len(free):
+                sink, sink_unit = free[0], -1
+                break
+            # Every seat of the tied columns is taken: scan them together and visit their holders
+            frontier[ties] = np.inf
+            is_scanned[ties] = True
+            batch = np.array([unit for col in ties for unit in holders[col]], dtype=np.int64)
+            scanned.append((ties, shortest))
+            visited.append((batch, shortest))
+            if len(batch):
+                leave = shortest + unassigned_cost - u[batch]
+                if leave.min() < dummy[0]:
+                    dummy = (leave.min(), batch[leave.argmin()])
+
+        # Dual update keeps reduced costs non-negative and tight along the allocation
+        u[current] += shortest
+        for batch, distance in visited:
+            u[batch] += shortest - distance
+        if self.repriced_units is not None:
+            self.repriced_units.add(int(current))
+            for batch, _ in visited:
+                self.repriced_units.update(batch.tolist())
+        for ties, distance in scanned:
+            v[ties] -= shortest - distance
+
+        # Shift seats back along the path: each unit takes the next column, freeing its own
+        changed = [current]
+        col = sink
+        if sink < 0:
+            col = unit_col[sink_unit]
+            if sink_unit != current:
+                self._move(sink_unit, -1)
+                changed.append(sink_unit)
+        while col >= 0:
+            unit = path[col]
+            previous = unit_col[unit]
+            self._move(unit, col)
+            changed.append(unit)
+            col = previous if unit != current else -1
+
+        # Reset only the columns this search touched
+        for targets in touched:
+            frontier[targets] = np.inf
+            is_scanned[targets] = False
+        return changed
+
+    def add_unit(self, row: int) -> int:
+        """New unassigned unit of ``row`` (u = 0 is feasible since costs are >= 0 and v <= 0); returns its id"""
+        self.unit_row = np.append(self.unit_row, row)
+        self.active = np.append(self.active, True)
+        self.u = np.append(self.u, 0.0 if self.degrees[row] else self.unassigned_cost)
+        self.unit_col = np.append(self.unit_col, -1)
+        return len(self.unit_row) - 1
+
+    def reseat(self, units: Sequence[int]) -> List[int]:
+        """Restore non-negative reduced costs after edge costs were lowered for ``units``' rows.
+
+        Each unit with a now-negative edge gives up its column and is priced
+        afresh, then augments again; columns left empty are refilled in
+        reverse by the caller (``fill``). Returns those columns.
+        """
+        offsets, edge_cols, edge_cost, u, v = self.offsets, self.edge_cols, self.edge_cost, self.u, self.v
+        detached, freed = [], []
+        for unit in units:
+            if not self.active[unit]:
+                continue
+            row = self.unit_row[unit]
+            start, end = offsets[row], offsets[row + 1]
+            usable = self.capacity[edge_cols[start:end]] > 0
+            slack = edge_cost[start:end][usable] - v[edge_cols[start:end][usable]]
+            if len(slack) and (slack - u[unit]).min() < -1e-9:
+                col = self.unit_col[unit]
+                self._move(unit, -1)
+                if col >= 0:
+                    freed.append(col)
+                u[unit] = min(self.unassigned_cost, slack.min())
+                detached.append(unit)
+        for unit in detached:
+            if self.unit_col[unit] < 0:
+                self.augment(unit)
+        return [col for col in freed if self.filled[col] == 0 and self.capacity[col] > 0]
+
+    def retire(self, unit: int) -> int:
+        """Remove a unit from the flow; returns the column it held (-1 if none)"""
+        col = self.unit_col[unit]
+        self._move(unit, -1)
+        self.active[unit] = False
+        return col
+
+    def fill(self, target: int, col_offsets: np.ndarray, col_rows: np.ndarray, col_cost: np.ndarray,
+             row_units: List[List[int]]) -> None:
+        """Repair after a one-seat column lost its holder: the cheapest reverse path into ``target``.
+
+        Searches backwards from ``target`` over (``col_offsets``, ``col_rows``,
+        ``col_cost``), the edges in column-major (CSC) order: a unit with an
+        edge into a reached column either is unassigned (path ends: it takes
+        the seat) or moves there from its own column, which is reached next.
+        A reached column that is not ``protected`` may also be left empty at
+        cost ``-v``. Reduced costs
+        make this Dijkstra over non-negative weights, and the dual update
+        keeps the flow optimal for further repairs.
+        """
+        u, v, unit_col = self.u, self.v, self.unit_col
+        distance = {target: 0.0}
+        via: Dict[int, Tuple[int, int]] = {}
+        scanned: Dict[int, float] = {}
+        # Best path end so far: (distance, unassigned unit taking the column or -1 to leave it empty, column)
+        best = (np.inf if self.protected[target] else -v[target], -1, target)
+        heap = [(0.0, target)]
+        while heap:
+            reached, col = heapq.heappop(heap)
+            if col in scanned or reached > distance[col]:
+                continue
+            if reached >= best[0]:
+                break
+            scanned[col] = reached
+            if not self.protected[col] and reached - v[col] < best[0]:
+                best = (reached - v[col], -1, col)
+            start, end = col_offsets[col], col_offsets[col + 1]
+            for row, cost in zip(col_rows[start:end].tolist(), col_cost[start:end].tolist()):
+                for unit in row_units[row]:
+                    held = unit_col[unit]
+                    if held == col:
+                        continue
+                    through = reached + cost - u[unit] - v[col]
+                    if held < 0:
+                        if through < best[0]:
+                            best = (through, unit, col)
+                        # Unassigned copies of one row are interchangeable
+                        break
+                    if held not in scanned and through < distance.get(held, np.inf):
+                        distance[held] = through
+                        via[held] = (unit, col)
+                        heapq.heappush(heap, (through, held))
+
+        shortest, taker, end = best
+        if shortest == np.inf:
+            # No way to refill a protected column (its candidates are all gone): leave it empty
+            return
+        for col, reached in scanned.items():
+            if reached < shortest:
+                v[col] += shortest - reached
+                if self.repriced_cols is not None:
+                    self.repriced_cols.add(col)
+                for unit in self.holders[col]:
+                    u[unit] -= shortest - reached
+
+        # Each holder along the path moves one column towards the target; the path end is refilled or left empty
+        col = end
+        while col != target:
+            unit, towards = via[col]
+            self._move(unit, towards)
+            col = towards
+        if taker >= 0:
+            self._move(taker, end)
+
+
+def _unit_flow(offsets: np.ndarray, edge_cols: np.ndarray, edge_cost: np.ndarray, supply: np.ndarray,
+               capacity: np.ndarray, unassigned_cost: float,
+               progress: Callable[[int, int], None] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(row, column) per unit of a ``_UnitFlow`` solved from scratch; column -1 when unassigned"""
+    flow = _UnitFlow(offsets, edge_cols, edge_cost, supply, capacity, unassigned_cost)
+    flow.solve(progress)
+    return flow.unit_row, flow.unit_col
+
+
+def greedy_capacitated_assignment(graph: ScoreGraph, capacities: Sequence[int], limit: int = None,
+                                  min_score: float = None, progress: Callable[[int, int], None] = None
+                                  ) -> Tuple[np.ndarray, np.ndarray]:
+    """(profile rows, internship columns) picked best edge first, one internship per profile, in pick order.
+
+    Lazy greedy: a heap holds each unplaced profile's best remaining edge;
+    the global best is popped and placed, and a profile's pointer only
+    advances when the internship it points at has filled. Stops after
+    ``limit`` picks or at the first edge below ``min_score``, so the work
+    after sorting each row's edges is O((n + picks) log n) heap steps plus
+    one scan step per edge to a full internship. Ties go
+    to the earlier (row, column) edge, as a stable sort of every pair would.
+    ``progress(seats filled, most seats that can fill)`` is called as picks are made.
+    """
+    # Each row's edges best first; CSR columns are ascending, so the stable sort keeps them in column order
+    order = np.lexsort((-graph.scores, graph.row_ids()))
+    sorted_cols = graph.cols[order]
+    negative_scores = -graph.scores[order].astype(np.float64)
+    ends = graph.offsets[1:].tolist()
+    heap = [(negative_scores[start], row, start) for row, start in enumerate(graph.offsets[:-1].tolist())
+            if start < ends[row]]
+    heapq.heapify(heap)
+
+    seats = list(capacities)
+    limit = graph.shape[0] if limit is None else limit
+    target = min(limit, len(heap), sum(seats))
+    rows, cols = [], []
+    while heap and len(rows) < limit:
+        if progress is not None and len(rows) % PROGRESS_INTERVAL == 0:
+            progress(len(rows), target)
+        negative_score, row, position = heap[0]
+        if min_score is not None and -negative_score < min_score:
+            break
+        col = int(sorted_cols[position])
+        if seats[col] > 0:
+            heapq.heappop(heap)
+            seats[col] -= 1
+            rows.append(row)
+            cols.append(col)
+            continue
+        # The internship has filled: move the pointer past every full internship in one go
+        end = ends[row]
+        while position < end and seats[sorted_cols[position]] == 0:
+            position += 1
+        if position < end:
+            heapq.heapreplace(heap, (negative_scores[position], row, position))
+        else:
+            heapq.heappop(heap)
+    if progress is not None:
+        progress(len(rows), target)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+
+def capacitated_assignment(graph: ScoreGraph, capacities: Sequence[int], unallocated_penalty: float = 100.0,
+                           progress: Callable[[int, int], None] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(profile rows, internship columns) of a min-cost flow over a sparse score graph, ordered by row.
+
+    Profiles are sources of one unit, internship ``j`` a sink taking up to
+    ``capacities[j]`` units, and each edge costs minus its score. The result
+    maximizes total score minus ``unallocated_penalty`` per profile left
+    without a seat, so with the default penalty (a full match score) filling
+    seats comes first and quality second. Only graph edges are ever
+    considered, so memory is linear in ``len(graph)``.
+
+    Solved with successive shortest augmenting paths on reduced costs
+    (Dijkstra with dual prices) from whichever side has fewer units: from
+    the profiles when seats are plentiful, from the seats when they are
+    scarce, so each search ends at a nearby free unit.
+    ``progress(searches done, searches)`` is called every ``PROGRESS_INTERVAL`` searches.
+    """
+    profiles, internships = graph.shape
+    capacities = np.asarray(capacities, dtype=np.int64)
+    top = float(graph.scores.max()) if len(graph) else 0.0
+    # Non-negative costs: a seat costs (top - score), a unit left unassigned (top + penalty)
+    edge_cost = top - graph.scores.astype(np.float64)
+    unassigned_cost = top + unallocated_penalty
+
+    # Seats that could actually be used: no internship fills beyond its number of edges
+    usable_seats = np.minimum(capacities, np.bincount(graph.cols, minlength=internships)).sum()
+    if usable_seats >= profiles:
+        rows, cols = _unit_flow(graph.offsets, graph.cols.astype(np.int64), edge_cost,
+                                np.ones(profiles, dtype=np.int64), capacities, unassigned_cost, progress)
+        allocated = cols >= 0
+    else:
+        # Transpose to internship rows (one unit per seat) and profile columns (one seat each)
+        order = np.argsort(graph.cols, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(graph.cols, minlength=internships))]).astype(np.int64)
+        cols, rows = _unit_flow(offsets, graph.row_ids()[order], edge_cost[order], capacities,
+                                np.ones(profiles, dtype=np.int64), unassigned_cost, progress)
+        allocated = rows >= 0
+    rows, cols = rows[allocated], cols[allocated]
+    order = np.argsort(rows, kind="stable")
+    return rows[order], cols[order]
+
+
+class IncrementalAllocation:
+    """The ``capacitated_assignment`` allocation of a score graph, repaired in place as the round changes.
+
+    Solved from the seat side (each internship seat a unit, each profile a
+    column with one seat), keeping the dual prices. ``withdraw`` frees the
+    withdrawn profile's seat and runs one shortest augmenting path from it;
+    ``set_capacity`` adds seats (one path each) or removes seats, repairing
+    each displaced profile with one reverse path. Prices from the previous
+    solution keep each search local, and the result stays optimal. Both
+    return ``{profile row: internship column or -1}`` for the profiles whose
+    allocation changed.
+    """
+
+    def __init__(self, graph: ScoreGraph, capacities: Sequence[int], unallocated_penalty: float = 100.0):
+        profiles, internships = graph.shape
+        self.graph = graph
+        top = float(graph.scores.max()) if len(graph) else 0.0
+        self._cost = top - graph.scores.astype(np.float64)
+        order = np.argsort(graph.cols, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(graph.cols, minlength=internships))]).astype(np.int64)
+        self._base_cost = self._cost.copy()
+        self._seat_position = np.empty(len(order), dtype=np.int64)
+        self._seat_position[order] = np.arange(len(order))
+        self._flow = _UnitFlow(offsets, graph.row_ids()[order], self._cost[order],
+                               np.asarray(capacities, dtype=np.int64), np.ones(profiles, dtype=np.int64),
+                               top + unallocated_penalty)
+        self._flow.solve()
+        self._row_units: List[List[int]] = [[] for _ in range(internships)]
+        for unit, row in enumerate(self._flow.unit_row.tolist()):
+            self._row_units[row].append(unit)
+
+    def assignment(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(profile rows, internship columns) of the current allocation, ordered by row"""
+        flow = self._flow
+        allocated = np.flatnonzero(flow.active & (flow.unit_col >= 0))
+        rows, cols = flow.unit_col[allocated], flow.unit_row[allocated]
+        order = np.argsort(rows, kind="stable")
+        return rows[order], cols[order]
+
+    def capacity(self, internship: int) -> int:
+        """Current number of seats of an internship"""
+        return len(self._row_units[internship])
+
+    def _changes(self) -> Dict[int, int]:
+        """Profiles whose internship changed since the move log was last cleared, with their internship now"""
+        flow = self._flow
+        touched = {col for move in flow.moves for col in move[1:] if col >= 0}
+        held = {profile: set(flow.holders[profile]) for profile in touched}
+        for unit, previous, col in reversed(flow.moves):
+            if col >= 0:
+                held[col].discard(unit)
+            if previous >= 0:
+                held[previous].add(unit)
+        flow.moves.clear()
+        def internship(units):
+            return int(flow.unit_row[next(iter(units))]) if units else -1
+
+        changes = {}
+        for profile in sorted(touched):
+            now = internship(flow.holders[profile])
+            if now != internship(held[profile]):
+                changes[profile] = now
+        return changes
+
+    def withdraw(self, profile: int) -> Dict[int, int]:
+        """Take a profile out of the round and re-fill the seat it held"""
+        flow = self._flow
+        flow.moves.clear()
+        flow.capacity[profile] = 0
+        for unit in list(flow.holders[profile]):
+            flow._move(unit, -1)
+            flow.augment(unit)
+        return self._changes()
+
+    def set_capacity(self, internship: int, seats: int) -> Dict[int, int]:
+        """Change an internship's number of seats"""
+        flow = self._flow
+        flow.moves.clear()
+        units = self._row_units[internship]
+        while len(units) < seats:
+            unit = flow.add_unit(internship)
+            units.append(unit)
+            flow.augment(unit)
+        if len(units) > seats:
+            # Empty seats go first, then the seats of the lowest-scoring holders
+            units.sort(key=lambda unit: (flow.unit_col[unit] >= 0, self._score(flow.unit_col[unit], internship)))
+            removed, units[:] = units[:len(units) - seats], units[len(units) - seats:]
+            for unit in removed:
+                profile = flow.retire(unit)
+                if profile >= 0:
+                    flow.fill(profile, self.graph.offsets, self.graph.cols, self._cost, self._row_units)
+        return self._changes()
+
+    def _set_costs(self, edges: np.ndarray, costs: np.ndarray):
+        """Change edge costs (edges in the graph's order) in both edge orders"""
+        self._cost[edges] = costs
+        self._flow.edge_cost[self._seat_position[edges]] = costs
+
+    def _placed(self) -> np.ndarray:
+        """Internship of every profile, -1 when unplaced"""
+        placed = np.full(self.graph.shape[0], -1, dtype=np.int64)
+        rows, cols = self.assignment()
+        placed[rows] = cols
+        return placed
+
+    def freeze(self):
+        """Keep every placed profile at its internship: its edges to other internships cost ``inf``.
+
+        Raising costs keeps the prices feasible, so repairs continue as
+        usual; prices that move while frozen are tracked for ``unfreeze``.
+        """
+        flow = self._flow
+        placed = self._placed()[self.graph.row_ids()]
+        frozen = np.flatnonzero((placed >= 0) & (self.graph.cols != placed))
+        self._set_costs(frozen, np.inf)
+        if flow.repriced_units is None:
+            flow.repriced_units, flow.repriced_cols = set(), set()
+
+    def unfreeze(self) -> Dict[int, int]:
+        """Let placed profiles move again, but only to internships they score at least as high, never out.
+
+        Edge costs go back to their scores except such downgrades, and placed
+        profiles become protected. Lowered costs can only undercut the prices
+        of units (and columns) repriced while frozen, so only those units are
+        reseated; everything else keeps its seat and prices.
+        """
+        flow = self._flow
+        flow.moves.clear()
+        placed = self._placed()
+        edge_rows = self.graph.row_ids()
+        current = np.full(self.graph.shape[0], -np.inf)
+        rows, cols = self.assignment()
+        current[rows] = self.graph.pair_scores(rows, cols)
+        downgrade = self.graph.scores < current[edge_rows]
+        self._set_costs(np.arange(len(self._cost)), np.where(downgrade, np.inf, self._base_cost))
+        flow.protected[placed >= 0] = True
+
+        units = set(flow.repriced_units or ())
+        for col in flow.repriced_cols or ():
+            start, end = self.graph.offsets[col], self.graph.offsets[col + 1]
+            for row in self.graph.cols[start:end].tolist():
+                units.update(self._row_units[row])
+        flow.repriced_units = flow.repriced_cols = None
+        for col in flow.reseat(sorted(units)):
+            if flow.filled[col] == 0:
+                flow.fill(col, self.graph.offsets, self.graph.cols, self._cost, self._row_units)
+        return self._changes()
+
+    def _score(self, profile: int, internship: int) -> float:
+        """Score of an edge, or -inf for no profile"""
+        if profile < 0:
+            return -np.inf
+        return float(self.graph.pair_scores([profile], [internship])[0])
+
+
+class AllocationRounds:
+    """Multi-round allocation of one market, every round warm-started from the one before.
+
+    Round 1 solves the flow (``IncrementalAllocation``). A decline round
+    drops the profiles that declined and refills their seats from unplaced
+    profiles while placed ones stay put (``freeze``). An upgrade round lets
+    placed profiles move to internships they score higher (``unfreeze``);
+    nobody moves down or loses a seat. Later rounds start from the previous
+    assignment and prices, so they only touch the affected part of it.
+    ``history`` records every round's wall time and outcome.
+    """
+
+    def __init__(self, graph: ScoreGraph, capacities: Sequence[int], unallocated_penalty: float = 100.0):
+        start = time.perf_counter()
+        self.allocation = IncrementalAllocation(graph, capacities, unallocated_penalty)
+        self.history: List[Dict] = []
+        self._record("allocation", start, {})
+
+    def decline_round(self, declined: Sequence[int]) -> Dict[int, int]:
+        """Drop the declining profiles and give their seats to unplaced profiles"""
+        start = time.perf_counter()
+        self.allocation.freeze()
+        changes = {}
+        for profile in declined:
+            changes.update(self.allocation.withdraw(profile))
+        self._record("declines", start, changes)
+        return changes
+
+    def upgrade_round(self) -> Dict[int, int]:
+        """Move placed profiles to internships they score higher where that raises the total"""
+        start = time.perf_counter()
+        changes = self.allocation.unfreeze()
+        self._record("upgrades", start, changes)
+        return changes
+
+    def _record(self, kind: str, start: float, changes: Dict[int, int]):
+        """Append one round to ``history``"""
+        elapsed = time.perf_counter() - start
+        rows, cols = self.allocation.assignment()
+        self.history.append({
+            "round": len(self.history) + 1,
+            "kind": kind,
+            "wall_time": elapsed,
+            "changed": len(changes),
+            "allocated": len(rows),
+            "total_score": float(self.allocation.graph.pair_scores(rows, cols).sum()) if len(rows) else 0.0,
+        })
+
+
+def reserved_seats(capacities: Sequence[int], shares: Sequence[float]) -> np.ndarray:
+    """(internships × groups) reserved seat counts for global quota shares.
+
+    Group ``g`` gets ``floor(shares[g] × total seats)`` seats overall, spread
+    over internships in proportion to their capacity (largest remainder
+    first). Shares must sum to at most 1 so no internship is over-reserved.
+    """
+    capacities = np.asarray(capacities, dtype=np.int64)
+    shares = np.asarray(shares, dtype=np.float64)
+    if shares.sum() > 1:
+        raise ValueError(f"Quota shares sum to {shares.sum():.2f}; they must not exceed 1")
+    reservations = np.zeros((len(capacities), len(shares)), dtype=np.int64)
+    for group, share in enumerate(shares):
+        exact = capacities * share
+        reservations[:, group] = np.floor(exact)
+        headroom = capacities - reservations.sum(axis=1)
+        missing = int(np.floor(capacities.sum() * share)) - int(reservations[:, group].sum())
+        candidates = np.flatnonzero(headroom > 0)
+        remainder_order = candidates[np.argsort(-(exact - np.floor(exact))[candidates], kind="stable")]
+        reservations[remainder_order[:missing], group] += 1
+    return reservations
+
+
+def quota_assignment(graph: ScoreGraph, capacities: Sequence[int], memberships: np.ndarray,
+                     reservations: np.ndarray, unallocated_penalty: float = 100.0,
+                     progress: Callable[[int, int], None] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(profile rows, internship columns, seat groups) of a min-cost flow with reserved seats, ordered by row.
+
+    ``memberships[i, g]`` says whether profile ``i`` belongs to quota group
+    ``g``; ``reservations[j, g]`` seats of internship ``j`` are reserved for
+    group ``g`` and may not go to anyone else (unused reserved seats stay
+    empty). Each internship is split into an open sink plus one sink per
+    reserved group, and a profile gets an edge to every sink it may take, so
+    the quotas are capacities of the same flow solved by
+    ``capacitated_assignment``. ``seat groups`` is the group whose reserved
+    seat each profile took, or -1 for an open seat.
+    """
+    profiles, internships = graph.shape
+    capacities = np.asarray(capacities, dtype=np.int64)
+    memberships = np.asarray(memberships, dtype=bool)
+    reservations = np.asarray(reservations, dtype=np.int64)
+    open_seats = capacities - reservations.sum(axis=1)
+    if (open_seats < 0).any():
+        raise ValueError("Reserved seats exceed the capacity of an internship")
+
+    # Sink ids: internship j's open seats keep id j, reserved (j, g) seats get ids from `internships` on
+    reserved_internship, reserved_group = np.nonzero(reservations)
+    sink_internship = np.concatenate([np.arange(internships), reserved_internship])
+    sink_group = np.concatenate([np.full(internships, -1), reserved_group])
+    sink_capacity = np.concatenate([open_seats, reservations[reserved_internship, reserved_group]])
+    group_sink = np.full(reservations.shape, -1, dtype=np.int64)
+    group_sink[reserved_internship, reserved_group] = internships + np.arange(len(reserved_internship))
+
+    edge_rows, edge_cols, edge_scores = graph.row_ids(), graph.cols.astype(np.int64), graph.scores.astype(np.float64)
+    rows, cols, scores = [edge_rows], [edge_cols], [edge_scores]
+    for group in range(reservations.shape[1]):
+        sinks = group_sink[edge_cols, group]
+        eligible = (sinks >= 0) & memberships[edge_rows, group]
+        rows.append(edge_rows[eligible])
+        cols.append(sinks[eligible])
+        scores.append(edge_scores[eligible] + RESERVED_SEAT_PREFERENCE)
+    rows, cols, scores = np.concatenate(rows), np.concatenate(cols), np.concatenate(scores)
+    order = np.lexsort((cols, rows))
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=profiles))]).astype(np.int64)
+    split = ScoreGraph(offsets, cols[order], scores[order], (profiles, len(sink_capacity)))
+
+    rows, sinks = capacitated_assignment(split, sink_capacity, unallocated_penalty, progress)
+    return rows, sink_internship[sinks], sink_group[sinks]
+
+
+def quota_fill_rates(reservations: np.ndarray, memberships: np.ndarray, seat_groups: np.ndarray,
+                     rows: np.ndarray) -> List[Dict]:
+    """Per quota group: reserved seats, how many were filled, and how many members got any seat"""
+    reservations = np.asarray(reservations, dtype=np.int64)
+    memberships = np.asarray(memberships, dtype=bool)
+    filled = np.bincount(seat_groups[seat_groups >= 0], minlength=reservations.shape[1])
+    allocated = memberships[rows].sum(axis=0)
+    fill_rates = []
+    for group in range(reservations.shape[1]):
+        reserved = int(reservations[:, group].sum())
+        fill_rates.append({
+            "reserved": reserved,
+            "filled": int(filled[group]),
+            "fill_rate": float(filled[group]) / reserved if reserved else 1.0,
+            "members": int(memberships[:, group].sum()),
+            "members_allocated": int(allocated[group]),
+        })
+    return fill_rates
+
+
+def preference_ranks(scores: np.ndarray, acceptable: np.ndarray) -> Tuple[List[List[int]], np.ndarray]:
+    """Preference lists and rank array of one side of a two-sided market.
+
+    Row ``i`` of ``scores`` is how agent ``i`` values each agent of the other
+    side. Returns each agent's acceptable partners, best first (ties by
+    index), and an int32 array where ``rank[i, j]`` is ``j``'s position in
+    ``i``'s full ordering (lower is better).
+    """
+    order = np.argsort(-np.where(acceptable, scores, -np.inf), axis=1, kind="stable")
+    rank = np.empty(scores.shape, dtype=np.int32)
+    np.put_along_axis(rank, order, np.broadcast_to(np.arange(scores.shape[1], dtype=np.int32), scores.shape), axis=1)
+    lengths = np.count_nonzero(acceptable, axis=1).tolist()
+    return [row[:length].tolist() for row, length in zip(order, lengths)], rank
+
+
+def deferred_acceptance(preferences: List[List[int]], receiver_rank: np.ndarray, proposer_quota: Sequence[int],
+                        receiver_quota: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, int]:
+    """(proposers, receivers, proposals) of capacitated deferred acceptance (Gale-Shapley).
+
+    Free proposers propose down ``preferences`` until they hold their quota
+    or run out of choices. Each receiver keeps its provisional holds in a
+    heap keyed on rank, worst on top, so an offer is accepted, or displaces
+    the worst hold, in O(log quota). Every pair is proposed at most once:
+    O(total proposals × log quota) overall. The result is stable and the
+    best stable matching for the proposing side.
+    """
+    receivers = receiver_rank.shape[1]
+    ranks = memoryview(np.ascontiguousarray(receiver_rank, dtype=np.int32).reshape(-1))
+    proposer_quota = [int(quota) for quota in proposer_quota]
+    receiver_quota = [int(quota) for quota in receiver_quota]
+    next_choice = [0] * len(preferences)
+    held = [0] * len(preferences)
+    holds = [[] for _ in receiver_quota]
+    free = [proposer for proposer in reversed(range(len(preferences))) if proposer_quota[proposer] > 0]
+
+    while free:
+        proposer = free.pop()
+        choices, choice, quota = preferences[proposer], next_choice[proposer], proposer_quota[proposer]
+        while held[proposer] < quota and choice < len(choices):
+            receiver = choices[choice]
+            choice += 1
+            capacity = receiver_quota[receiver]
+            if capacity <= 0:
+                continue
+            rank = ranks[receiver * receivers + proposer]
+            heap = holds[receiver]
+            if len(heap) < capacity:
+                heapq.heappush(heap, (-rank, proposer))
+                held[proposer] += 1
+            elif -heap[0][0] > rank:
+                _, rejected = heapq.heapreplace(heap, (-rank, proposer))
+                held[proposer] += 1
+                held[rejected] -= 1
+                free.append(rejected)
+        next_choice[proposer] = choice
+
+    pairs = [(proposer, receiver) for receiver, heap in enumerate(holds) for _, proposer in heap]
+    proposers = np.array([proposer for proposer, _ in pairs], dtype=np.int64)
+    matched = np.array([receiver for _, receiver in pairs], dtype=np.int64)
+    return proposers, matched, sum(next_choice)
+
+
+def stable_assignment(student_scores: np.ndarray, company_scores: np.ndarray, capacities: Sequence[int],
+                      acceptable: np.ndarray = None, proposing: str = "students") -> Tuple[np.ndarray, np.ndarray, int]:
+    """(profile rows, internship columns, proposals) of a stable many-to-one matching, ordered by row.
+
+    ``student_scores[i, j]`` is how profile ``i`` values internship ``j``;
+    ``company_scores[i, j]`` is how internship ``j`` values profile ``i``.
+    Internship ``j`` takes up to ``capacities[j]`` profiles. Only
+    ``acceptable`` pairs (all by default) can be matched. ``proposing`` is
+    ``"students"`` (student-optimal) or ``"companies"`` (company-optimal).
+    """
+    if acceptable is None:
+        acceptable = np.ones(student_scores.shape, dtype=bool)
+    profiles = student_scores.shape[0]
+    if proposing == "students":
+        preferences, _ = preference_ranks(student_scores, acceptable)
+        _, receiver_rank = preference_ranks(company_scores.T, acceptable.T)
+        rows, cols, proposals = deferred_acceptance(preferences, receiver_rank, [1] * profiles, capacities)
+    elif proposing == "companies":
+        preferences, _ = preference_ranks(company_scores.T, acceptable.T)
+        _, receiver_rank = preference_ranks(student_scores, acceptable)
+        cols, rows, proposals = deferred_acceptance(preferences, receiver_rank, capacities, [1] * profiles)
+    else:
+        raise ValueError(f"Unknown proposing side {proposing!r}; expected 'students' or 'companies'")
+    order = np.argsort(rows, kind="stable")
+    return rows[order], cols[order], proposals
+
+
+def assign(scores: np.ndarray, algorithm: str = "greedy", profile_keys: Sequence = None,
+           internship_keys: Sequence = None) -> Tuple[np.ndarray, np.ndarray]:
+    """One-to-one allocation of a score matrix with one of ``ALLOCATION_ALGORITHMS``"""
+    if algorithm == "greedy":
+        return greedy_assignment(scores, profile_keys, internship_keys)
+    if algorithm == "optimal":
+        return optimal_assignment(scores, profile_keys, internship_keys)
+    if algorithm == "auction":
+        profiles, internships = scores.shape
+        graph = ScoreGraph(np.arange(profiles + 1, dtype=np.int64) * internships,
+                           np.tile(np.arange(internships, dtype=np.int32), profiles), np.ravel(scores), scores.shape)
+        return auction_assignment(graph, profile_keys, internship_keys)
+    raise ValueError(f"Unknown allocation algorithm {algorithm!r}; expected one of {list(ALLOCATION_ALGORITHMS)}")
+
+
+def assignment_summary(scores: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> Dict:
+    """Total and average score of an allocation"""
+    total = float(scores[rows, cols].sum()) if len(rows) else 0.0
+    return {"total_score": total, "average_score": total / len(rows) if len(rows) else 0}
+
+
+def _state(location: str) -> Optional[str]:
+    """State of a location string, or None if the gazetteer does not know it"""
+    gazetteer = default_gazetteer()
+    place = gazetteer.resolve(location)
+    return None if place == UNKNOWN_PLACE else gazetteer.states[place]
+
+
+def _single(values: set) -> Optional[str]:
+    """The only value of a set, or None when it is empty, ambiguous or unknown"""
+    return next(iter(values)) if len(values) == 1 and None not in values else None
+
+
+def state_shards(user_profiles: Sequence, internships: Sequence) -> Tuple[List, List]:
+    """Shard key per profile and internship: the state, or None for cross-shard.
+
+    A profile belongs to a state when every preferred location (its own
+    location if it lists none) is in that state and it does not ask for
+    "Remote"; remote postings and unknown places are cross-shard.
+    """
+    profile_shards = []
+    for profile in user_profiles:
+        locations = profile.get("preferences", {}).get("location") or [profile.get("location", "")]
+        if any(location.strip().lower() == "remote" for location in locations):
+            profile_shards.append(None)
+        else:
+            profile_shards.append(_single({_state(location) for location in locations}))
+    internship_shards = [None if internship.get("isRemote") else _state(internship.get("location", ""))
+                         for internship in internships]
+    return profile_shards, internship_shards
+
+
+def industry_shards(user_profiles: Sequence, internships: Sequence) -> Tuple[List, List]:
+    """Shard key per profile and internship: the industry, or None for cross-shard.
+
+    A profile belongs to an industry when its own industry and every
+    preferred industry are the same one.
+    """
+    profile_shards = []
+    for profile in user_profiles:
+        industries = {profile.get("industry", "")} | set(profile.get("preferences", {}).get("industries", ()))
+        profile_shards.append(_single({industry.strip().lower() or None for industry in industries}))
+    internship_shards = [internship.get("industry", "").strip().lower() or None for internship in internships]
+    return profile_shards, internship_shards
+
+
+# Shard key functions by ``SHARDING_MODES`` name
+SHARD_KEYS = {"state": state_shards, "industry": industry_shards}
+
+
+def _solve_shard(task: Tuple) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+    """Allocate one shard; returns its (rows, cols) and every score component at those pairs.
+
+    Top-level so worker processes can run it; only the shard's profiles and
+    internships are sent over and scored.
+    """
+    user_profiles, internships, skill_index, weights, algorithm, profile_keys, internship_keys = task
+    components = score_components(user_profiles, internships, skill_index, weights)
+    rows, cols = assign(components["score"], algorithm, profile_keys, internship_keys)
+    return rows, cols, {name: values[rows, cols] for name, values in components.items()}
+
+
+def _split(profile_ids: np.ndarray, internship_ids: np.ndarray, max_pairs: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Round-robin split of a shard into pieces of at most about ``max_pairs`` pairs"""
+    pieces = int(np.ceil(np.sqrt(len(profile_ids) * len(internship_ids) / max_pairs))) if max_pairs else 1
+    pieces = max(1, min(pieces, len(profile_ids), len(internship_ids)))
+    return [(profile_ids[piece::pieces], internship_ids[piece::pieces]) for piece in range(pieces)]
+
+
+def sharded_assignment(user_profiles: Sequence, internships: Sequence, profile_shards: Sequence,
+                       internship_shards: Sequence, skill_index: SkillIndex, weights: Dict = ALL_INDIA_WEIGHTS,
+                       algorithm: str = "greedy", profile_keys: Sequence = None, internship_keys: Sequence = None,
+                       max_workers: int = None, max_shard_pairs: int = MAX_SHARD_PAIRS
+                       ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray], Dict]:
+    """(profile rows, internship columns, components at the pairs, stats) of a sharded allocation.
+
+    Profiles and internships with the same shard key are allocated together
+    with ``assign`` in a ``ProcessPoolExecutor`` (shards over
+    ``max_shard_pairs`` are split round-robin, so each worker holds a bounded
+    block). The reconciliation pass then allocates cross-shard profiles (key
+    None) and profiles the shards left out to the seats still free, including
+    cross-shard internships. Profiles (internships) sharing a key in
+    ``profile_keys`` (``internship_keys``) are allocated at most once between
+    them.
+    """
+    profile_groups = _group_codes(profile_keys, len(user_profiles))
+    internship_groups = _group_codes(internship_keys, len(internships))
+    profile_shards = _consistent_shards(profile_shards, profile_groups)
+    internship_shards = _consistent_shards(internship_shards, internship_groups)
+
+    shard_ids: Dict = {}
+    for shard in list(profile_shards) + list(internship_shards):
+        if shard is not None:
+            shard_ids.setdefault(shard, len(shard_ids))
+    profile_codes = np.array([shard_ids.get(shard, -1) if shard is not None else -1 for shard in profile_shards],
+                             dtype=np.int64)
+    internship_codes = np.array([shard_ids.get(shard, -1) if shard is not None else -1
+                                 for shard in internship_shards], dtype=np.int64)
+
+    def task(profile_ids, internship_ids):
+        return ([user_profiles[i] for i in profile_ids], [internships[j] for j in internship_ids], skill_index,
+                weights, algorithm,
+                None if profile_keys is None else [profile_keys[i] for i in profile_ids],
+                None if internship_keys is None else [internship_keys[j] for j in internship_ids])
+
+    pieces = [
+        piece
+        for shard in range(len(shard_ids))
+        for piece in _split(np.flatnonzero(profile_codes == shard), np.flatnonzero(internship_codes == shard),
+                            max_shard_pairs)
+        if len(piece[0]) and len(piece[1])
+    ]
+    # Largest shards first, so the pool's tail is short
+    pieces.sort(key=lambda piece: -len(piece[0]) * len(piece[1]))
+    tasks = (task(*piece) for piece in pieces)
+    if max_workers == 1 or len(pieces) <= 1:
+        results = list(map(_solve_shard, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_solve_shard, tasks))
+
+    rows, cols, details = [], [], []
+    for (profile_ids, internship_ids), (shard_rows, shard_cols, shard_details) in zip(pieces, results):
+        rows.append(profile_ids[shard_rows])
+        cols.append(internship_ids[shard_cols])
+        details.append(shard_details)
+
+    # Reconciliation: everyone (and every seat) whose group is still unallocated
+    allocated_profiles = np.isin(profile_groups, profile_groups[np.concatenate(rows)] if rows else [])
+    allocated_internships = np.isin(internship_groups, internship_groups[np.concatenate(cols)] if cols else [])
+    reconcile = _split(np.flatnonzero(~allocated_profiles), np.flatnonzero(~allocated_internships), max_shard_pairs)
+    for profile_ids, internship_ids in reconcile:
+        if len(profile_ids) and len(internship_ids):
+            shard_rows, shard_cols, shard_details = _solve_shard(task(profile_ids, internship_ids))
+            rows.append(profile_ids[shard_rows])
+            cols.append(internship_ids[shard_cols])
+            details.append(shard_details)
+
+    stats = {
+        "shards": len(shard_ids),
+        "tasks": len(pieces),
+        "largest_task_pairs": max((len(p) * len(i) for p, i in pieces), default=0),
+        "reconciled_profiles": int((~allocated_profiles).sum()),
+        "reconciled_internships": int((~allocated_internships).sum()),
+    }
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), {}, stats
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    details = {name: np.concatenate([part[name] for part in details]) for name in details[0]}
+    order = np.argsort(rows, kind="stable")
+    return rows[order], cols[order], {name: values[order] for name, values in details.items()}, stats
+
+
+def _consistent_shards(shards: Sequence, groups: np.ndarray) -> List:
+    """Shard keys with every group that spans several shards moved to cross-shard (None)"""
+    seen: Dict = {}
+    for group, shard in zip(groups.tolist(), shards):
+        seen.setdefault(group, set()).add(shard)
+    return [shard if len(seen[group]) == 1 else None for group, shard in zip(groups.tolist(), shards)]
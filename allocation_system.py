@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 from datetime import datetime, date, timedelta
 import json
 import numpy as np
@@ -10,6 +11,27 @@ from typing import Dict, List, Tuple, Any
 import time
 import random
 
+from allocation_engine import (CAPACITY_ALGORITHMS, STABLE_PROPOSERS, AllocationRounds, capacitated_assignment,
+                               greedy_capacitated_assignment, quota_assignment, quota_fill_rates, reserved_seats,
+                               stable_assignment)
+from allocation_worker import AllocationJob, stage_progress
+from matching_engine import SkillIndex, internship_posting, score_components, score_edges, student_profile
+
+# Score components an internship ranks applicants by in stable matching
+COMPANY_RANKING_COMPONENTS = ('skill_match', 'industry_match', 'experience_match')
+
+# Candidate graph pruning: internships kept per student, and students kept per internship
+EDGE_TOP_K = 50
+
+# Reservation quota groups (student ``category`` values and ``is_<group>`` flags) with their UI labels
+QUOTA_GROUPS = {
+    'sc': 'SC',
+    'st': 'ST',
+    'obc': 'OBC',
+    'rural': 'Rural',
+    'aspirational': 'Aspirational district',
+}
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Smart Allocation System - All India Internship Hub",
@@ -332,7 +354,10 @@ def load_allocation_data():
             'branch': 'Computer Science',
             'location_preference': ['Bangalore', 'Hyderabad', 'Remote'],
             'field_interest': 'Technology',
-            'experience_level': 'Intermediate'
+            'experience_level': 'Intermediate',
+            'category': 'general',
+            'is_rural': False,
+            'is_aspirational': False
         },
         {
             'id': 'STU002',
@@ -343,7 +368,10 @@ def load_allocation_data():
             'branch': 'Finance',
             'location_preference': ['Mumbai', 'Delhi'],
             'field_interest': 'Finance',
-            'experience_level': 'Advanced'
+            'experience_level': 'Advanced',
+            'category': 'obc',
+            'is_rural': True,
+            'is_aspirational': True
         },
         {
             'id': 'STU003',
@@ -354,107 +382,300 @@ def load_allocation_data():
             'branch': 'Computer Science',
             'location_preference': ['Bangalore', 'Pune', 'Remote'],
             'field_interest': 'Technology',
-            'experience_level': 'Intermediate'
+            'experience_level': 'Intermediate',
+            'category': 'sc',
+            'is_rural': False,
+            'is_aspirational': False
         }
     ]
     
     return internships_data, student_profiles
 
-def calculate_match_score(student, internship):
-    """Calculate match score between student and internship"""
-    score = 0
-    
-    # Skills match (40% weight)
-    student_skills = set([skill.lower() for skill in student['skills']])
-    required_skills = set([skill.lower() for skill in internship['skills_required']])
-    skill_match = len(student_skills.intersection(required_skills)) / len(required_skills)
-    score += skill_match * 40
-    
-    # Location preference (20% weight)
-    if internship['location'] in student['location_preference'] or internship['remote_option']:
-        score += 20
-    
-    # Field interest match (25% weight)
-    if student['field_interest'].lower() == internship.get('field', '').lower():
-        score += 25
-    
-    # Experience level match (15% weight)
-    experience_match = {
-        ('Beginner', 'Beginner'): 15,
-        ('Intermediate', 'Intermediate'): 15,
-        ('Advanced', 'Advanced'): 15,
-        ('Intermediate', 'Beginner'): 12,
-        ('Advanced', 'Intermediate'): 12,
-        ('Advanced', 'Beginner'): 8
+@st.cache_resource
+def get_skill_index():
+    """Interned skill vocabulary for all students and internships"""
+    internships_data, student_profiles = load_allocation_data()
+    return SkillIndex.from_skill_lists(
+        *(internship['skills_required'] for field_internships in internships_data.values() for internship in field_internships),
+        *(student['skills'] for student in student_profiles)
+    )
+
+def allocation_entry(student, internship, field, score, reserved_for=''):
+    """One allocation row as shown in the results table"""
+    return {
+        'student_name': student['name'],
+        'student_id': student['id'],
+        'internship_title': internship['title'],
+        'company': internship['company'],
+        'location': internship['location'],
+        'match_score': score,
+        'stipend': internship['stipend'],
+        'field': field,
+        'start_date': internship['start_date'],
+        'reserved_for': reserved_for
     }
-    score += experience_match.get((student['experience_level'], internship['difficulty']), 5)
+
+def open_internship_list(internships):
+    """(field, internship) pairs that still have free slots"""
+    return [
+        (field, internship)
+        for field, field_internships in internships.items()
+        for internship in field_internships
+        if internship['filled'] < internship['slots']
+    ]
+
+def quota_memberships(students, groups):
+    """(students × groups) membership: a group is a category or an ``is_<group>`` flag"""
+    return np.array([
+        [student.get('category') == group or bool(student.get(f'is_{group}')) for group in groups]
+        for student in students
+    ], dtype=bool).reshape(len(students), len(groups))
+
+def quota_reservations(open_internships, quotas):
+    """Active quota groups and their reserved seats per open internship"""
+    groups = [group for group, percent in quotas.items() if percent > 0]
+    capacities = [internship['slots'] - internship['filled'] for _, internship in open_internships]
+    return groups, reserved_seats(capacities, [quotas[group] / 100 for group in groups])
+
+def smart_allocation_algorithm(students, internships, preferences, job=None):
+    """Advanced allocation algorithm based on preferences and constraints; ``job`` receives its progress"""
+    open_internships = open_internship_list(internships)
+    if preferences.get('algorithm', 'greedy') == 'min_cost_flow':
+        return flow_allocation(students, open_internships, preferences, job)
+    if preferences.get('algorithm', 'greedy') in STABLE_PROPOSERS:
+        return stable_allocation(students, open_internships, preferences, job)
     
-    return min(100, score)
+    # Best pair first over the pruned candidate graph, which already drops pairs below the minimum score
+    graph = candidate_graph(students, open_internships, preferences, job)
+    capacities = [internship['slots'] - internship['filled'] for _, internship in open_internships]
+    rows, cols = greedy_capacitated_assignment(graph, capacities, limit=preferences['max_allocations'],
+                                               progress=stage_progress(job, "Filling seats"))
+    return flow_entries(students, open_internships, graph, rows, cols, preferences['max_allocations'])
+
+def flow_allocation(students, open_internships, preferences, job=None, solution=None):
+    """Min-cost flow allocation: students to open seats, maximizing total match score.
 
-def smart_allocation_algorithm(students, internships, preferences):
-    """Advanced allocation algorithm based on preferences and constraints"""
+    Reservation quotas (``preferences['quotas']``, percent of seats per group)
+    become reserved seats that only members of the group can take. ``solution``
+    reuses a ``flow_solution`` already computed for these inputs.
+    """
+    if solution is None:
+        solution = flow_solution(students, open_internships, preferences, job)
+    groups = solution['groups']
+    reserved_for = [groups[group] if group >= 0 else '' for group in solution['seat_groups']]
+    return flow_entries(students, open_internships, solution['graph'], solution['rows'], solution['cols'],
+                        preferences['max_allocations'], reserved_for)
+
+def flow_solution(students, open_internships, preferences, job=None):
+    """Uncapped min-cost flow over every open seat, with each pair's reserved group (-1 for an open seat)"""
+    graph = candidate_graph(students, open_internships, preferences, job)
+    capacities = [internship['slots'] - internship['filled'] for _, internship in open_internships]
+    groups, reservations = quota_reservations(open_internships, preferences.get('quotas', {}))
+    memberships = quota_memberships(students, groups)
+    progress = stage_progress(job, "Filling seats")
+    if groups:
+        rows, cols, seat_groups = quota_assignment(graph, capacities, memberships, reservations, progress=progress)
+    else:
+        rows, cols = capacitated_assignment(graph, capacities, progress=progress)
+        seat_groups = np.full(len(rows), -1)
+    return {
+        'graph': graph,
+        'rows': rows,
+        'cols': cols,
+        'seat_groups': seat_groups,
+        'groups': groups,
+        'reservations': reservations,
+        'memberships': memberships
+    }
+
+def candidate_graph(students, open_internships, preferences, job=None):
+    """Sparse float32 scores of the pairs reaching the minimum score, pruned to each side's top EDGE_TOP_K"""
+    return score_edges(
+        [student_profile(student) for student in students],
+        [internship_posting(internship) for _, internship in open_internships],
+        get_skill_index(), weights="field_experience", min_score=preferences['min_match_score'],
+        top_k=EDGE_TOP_K, internship_top_k=EDGE_TOP_K, dtype=np.float32,
+        progress=stage_progress(job, "Scoring pairs")
+    )
+
+def flow_entries(students, open_internships, graph, rows, cols, max_allocations, reserved_for=None):
+    """Allocation rows for graph (student, internship) pairs, best first and capped at max_allocations.
+
+    Reserved-seat pairs are kept ahead of open ones when capping, so the cap
+    never drops a quota placement to make room for a higher-scoring open seat.
+    """
+    # Scores are stored as float32; rounding drops the storage error from the displayed percentages
+    scores = np.round(graph.pair_scores(rows, cols).astype(np.float64), 4)
+    open_seat = np.array([not group for group in reserved_for] if reserved_for else [False] * len(scores), dtype=bool)
+    kept = np.lexsort((-scores, open_seat))[:max_allocations]
+    order = kept[np.argsort(-scores[kept], kind="stable")]
     allocations = []
+    for position in order:
+        field, internship = open_internships[cols[position]]
+        allocations.append(allocation_entry(students[rows[position]], internship, field, float(scores[position]),
+                                            reserved_for[position] if reserved_for else ''))
+    return allocations
+
+def start_live_round(students, internships, preferences, job=None):
+    """Min-cost flow round kept in memory, so withdrawals, slot changes and later rounds are repaired in place"""
+    open_internships = open_internship_list(internships)
+    capacities = [internship['slots'] - internship['filled'] for _, internship in open_internships]
+    graph = candidate_graph(students, open_internships, preferences, job)
+    stage_progress(job, "Preparing live round")
+    rounds = AllocationRounds(graph, capacities)
+    return {
+        'rounds': rounds,
+        'allocation': rounds.allocation,
+        'students': students,
+        'open_internships': open_internships,
+        'max_allocations': preferences['max_allocations'],
+        'withdrawn': set(),
+        'events': []
+    }
+
+def live_round_results(live_round):
+    """Current allocation rows of a live round"""
+    allocation = live_round['allocation']
+    rows, cols = allocation.assignment()
+    return flow_entries(live_round['students'], live_round['open_internships'], allocation.graph, rows, cols,
+                        live_round['max_allocations'])
+
+def apply_live_event(live_round, action, *args):
+    """Run one repair (``withdraw`` or ``set_capacity``) and log what it changed and how long it took"""
+    start = time.perf_counter()
+    changes = getattr(live_round['allocation'], action)(*args)
+    elapsed = time.perf_counter() - start
+    if action == 'withdraw':
+        live_round['withdrawn'].add(args[0])
+        description = f"{live_round['students'][args[0]]['name']} withdrew"
+    else:
+        description = f"{live_round['open_internships'][args[0]][1]['title']} now has {args[1]} open slots"
+    log_live_event(live_round, description, changes, elapsed)
+
+def run_live_round(live_round, declined=None):
+    """Run a decline round (``declined`` students give up their seats) or, without declines, an upgrade round"""
+    rounds = live_round['rounds']
+    if declined is None:
+        changes = rounds.upgrade_round()
+        description = "Upgrade round"
+    else:
+        changes = rounds.decline_round(declined)
+        live_round['withdrawn'].update(declined)
+        description = f"Refill round: {len(declined)} declined"
+    log_live_event(live_round, description, changes, rounds.history[-1]['wall_time'])
+
+def log_live_event(live_round, description, changes, elapsed):
+    """Record an event with the students it moved"""
+    moved = []
+    for row, col in changes.items():
+        target = live_round['open_internships'][col][1]['title'] if col >= 0 else 'unallocated'
+        moved.append(f"{live_round['students'][row]['name']} → {target}")
+    live_round['events'].append({'event': description, 'changes': moved, 'wall_time': elapsed})
+
+def stable_allocation(students, open_internships, preferences, job=None):
+    """Deferred-acceptance allocation: stable when companies rank students by their own criteria"""
+    stage_progress(job, "Scoring pairs")
+    components = score_components(
+        [student_profile(student) for student in students],
+        [internship_posting(internship) for _, internship in open_internships],
+        get_skill_index(), weights="field_experience"
+    )
+    # Students rank by the full match score; companies by the fit they control (location is the student's preference)
+    company_scores = sum(components[name] for name in COMPANY_RANKING_COMPONENTS)
+    capacities = [internship['slots'] - internship['filled'] for _, internship in open_internships]
+    stage_progress(job, "Running deferred acceptance")
+    rows, cols, _ = stable_assignment(
+        components['score'], company_scores, capacities,
+        acceptable=components['score'] >= preferences['min_match_score'],
+        proposing=STABLE_PROPOSERS[preferences['algorithm']]
+    )
+    scores = components['score'][rows, cols]
     
-    # Calculate all possible matches with scores
-    matches = []
-    for student in students:
-        for field, field_internships in internships.items():
-            for internship in field_internships:
-                if internship['filled'] < internship['slots']:
-                    score = calculate_match_score(student, internship)
-                    matches.append({
-                        'student': student,
-                        'internship': internship,
-                        'score': score,
-                        'field': field
-                    })
-    
-    # Sort matches by score (descending)
-    matches.sort(key=lambda x: x['score'], reverse=True)
-    
-    # Apply preferences and constraints
-    allocated_students = set()
-    internship_counts = {}
-    
-    for match in matches:
-        student_id = match['student']['id']
-        internship_id = match['internship']['id']
-        
-        # Check if student already allocated
-        if student_id in allocated_students:
-            continue
-            
-        # Check internship capacity
-        current_filled = internship_counts.get(internship_id, match['internship']['filled'])
-        if current_filled >= match['internship']['slots']:
-            continue
-            
-        # Apply preference filters
-        if preferences['min_match_score'] > 0 and match['score'] < preferences['min_match_score']:
-            continue
-            
-        # Allocate
-        allocations.append({
-            'student_name': match['student']['name'],
-            'student_id': student_id,
-            'internship_title': match['internship']['title'],
-            'company': match['internship']['company'],
-            'location': match['internship']['location'],
-            'match_score': match['score'],
-            'stipend': match['internship']['stipend'],
-            'field': match['field'],
-            'start_date': match['internship']['start_date']
-        })
-        
-        allocated_students.add(student_id)
-        internship_counts[internship_id] = current_filled + 1
-        
-        # Stop if we've allocated enough
-        if len(allocations) >= preferences['max_allocations']:
-            break
-    
+    # Best allocations first, capped at max_allocations
+    order = np.argsort(-scores, kind="stable")[:preferences['max_allocations']]
+    allocations = []
+    for position in order:
+        field, internship = open_internships[cols[position]]
+        allocations.append(allocation_entry(students[rows[position]], internship, field, float(scores[position])))
     return allocations
 
+def allocation_report(students, internships, preferences, job=None):
+    """Run the selected allocator, timed, next to the greedy baseline on the same preferences"""
+    start = time.perf_counter()
+    solution = None
+    if preferences.get('algorithm', 'greedy') == 'min_cost_flow':
+        # Keep the uncapped solution so the quota fill reflects every seat the solver filled
+        open_internships = open_internship_list(internships)
+        solution = flow_solution(students, open_internships, preferences, job)
+        allocations = flow_allocation(students, open_internships, preferences, solution=solution)
+    else:
+        allocations = smart_allocation_algorithm(students, internships, preferences, job)
+    report = {
+        'algorithm': preferences.get('algorithm', 'greedy'),
+        'wall_time': time.perf_counter() - start,
+        'allocations': len(allocations),
+        'total_score': sum(allocation['match_score'] for allocation in allocations)
+    }
+    if report['algorithm'] != 'greedy':
+        start = time.perf_counter()
+        baseline = smart_allocation_algorithm(students, internships, {**preferences, 'algorithm': 'greedy'}, job)
+        report['greedy'] = {
+            'wall_time': time.perf_counter() - start,
+            'allocations': len(baseline),
+            'total_score': sum(allocation['match_score'] for allocation in baseline)
+        }
+    
+    if solution is not None and solution['groups']:
+        # What the quotas cost: the same flow without reserved seats
+        start = time.perf_counter()
+        unconstrained = smart_allocation_algorithm(students, internships, {**preferences, 'quotas': {}}, job)
+        report['unconstrained'] = {
+            'wall_time': time.perf_counter() - start,
+            'allocations': len(unconstrained),
+            'total_score': sum(allocation['match_score'] for allocation in unconstrained)
+        }
+        fill_rates = quota_fill_rates(solution['reservations'], solution['memberships'], solution['seat_groups'],
+                                      solution['rows'])
+        report['quota_fill'] = {QUOTA_GROUPS[group]: fill for group, fill in zip(solution['groups'], fill_rates)}
+    return allocations, report
+
+def allocation_run(job, students, internships, preferences, live):
+    """Worker body: the allocation and its report, plus a live round for later repairs when ``live``"""
+    allocations, report = allocation_report(students, internships, preferences, job)
+    live_round = start_live_round(students, internships, preferences, job) if live else None
+    return allocations, report, live_round
+
+@st.fragment(run_every=0.5)
+def allocation_job_panel():
+    """Progress of the background allocation; stores its outcome and reruns the page once it has ended"""
+    job = st.session_state.get('allocation_job')
+    if job is None:
+        return
+    snapshot = job.snapshot()
+    if snapshot['status'] == 'running':
+        detail = f" · {snapshot['done']:,} / {snapshot['total']:,}" if snapshot['total'] else ""
+        st.progress(snapshot['fraction'], text=f"🤖 {snapshot['stage']}{detail} · {snapshot['elapsed']:.1f}s")
+        if st.button("⏹️ Cancel Allocation"):
+            job.cancel()
+        return
+    
+    del st.session_state.allocation_job
+    if snapshot['status'] == 'done':
+        allocations, report, live_round = job.result
+        st.session_state.allocation_results = allocations
+        st.session_state.allocation_report = report
+        st.session_state.allocation_timestamp = datetime.now()
+        if live_round:
+            st.session_state.live_round = live_round
+        else:
+            st.session_state.pop('live_round', None)
+        st.session_state.allocation_notice = ('success', f"✅ Successfully allocated {len(allocations)} internships!")
+    elif snapshot['status'] == 'cancelled':
+        st.session_state.allocation_notice = ('warning', "⏹️ Allocation cancelled; previous results are kept")
+    else:
+        st.session_state.allocation_notice = ('error', f"❌ Allocation failed: {job.error}")
+    st.rerun()
+
 def main():
     # Custom CSS container
     st.markdown('<div class="allocation-container">', unsafe_allow_html=True)
@@ -474,6 +695,15 @@ def main():
         # Allocation parameters
         max_allocations = st.slider("Maximum Allocations", 1, 50, 20)
         min_match_score = st.slider("Minimum Match Score (%)", 0, 100, 60)
+        algorithm = st.selectbox("Allocation Method", list(CAPACITY_ALGORITHMS), format_func=CAPACITY_ALGORITHMS.get)
+        
+        with st.expander("🏷️ Reservation Quotas"):
+            st.caption("Percent of each internship's open seats reserved per group (min-cost flow method)")
+            quotas = {
+                group: st.number_input(f"{label} (%)", 0.0, 100.0, 0.0, 0.5, key=f"quota_{group}",
+                                       disabled=algorithm != 'min_cost_flow')
+                for group, label in QUOTA_GROUPS.items()
+            }
         
         st.markdown("### 📊 Filter Options")
         selected_fields = st.multiselect(
@@ -509,6 +739,8 @@ def main():
         preferences = {
             'max_allocations': max_allocations,
             'min_match_score': min_match_score,
+            'algorithm': algorithm,
+            'quotas': quotas if algorithm == 'min_cost_flow' else {},
             'selected_fields': selected_fields,
             'location_filter': location_filter,
             'experience_filter': experience_filter
@@ -525,23 +757,62 @@ def main():
         
         st.markdown('</div>', unsafe_allow_html=True)
         
-        # Run allocation
+        # Run allocation on a worker thread (a new run cancels the one in flight); the panel follows it
+        # across reruns and reports real progress
         if run_allocation:
-            with st.spinner("🤖 Running Smart Allocation Algorithm..."):
-                # Simulate processing time
-                progress_bar = st.progress(0)
-                for i in range(100):
-                    time.sleep(0.02)
-                    progress_bar.progress(i + 1)
-                
-                # Run allocation algorithm
-                allocations = smart_allocation_algorithm(student_profiles, internships_data, preferences)
-                
-                # Store results in session state
-                st.session_state.allocation_results = allocations
-                st.session_state.allocation_timestamp = datetime.now()
-                
-                st.success(f"✅ Successfully allocated {len(allocations)} internships!")
+            previous = st.session_state.get('allocation_job')
+            if previous is not None:
+                previous.cancel()
+            live = algorithm == 'min_cost_flow' and not any(percent > 0 for percent in quotas.values())
+            st.session_state.allocation_job = AllocationJob(
+                lambda job: allocation_run(job, student_profiles, internships_data, preferences, live),
+                prepare=add_script_run_ctx
+            )
+        if st.session_state.get('allocation_job') is not None:
+            allocation_job_panel()
+        notice = st.session_state.pop('allocation_notice', None)
+        if notice:
+            getattr(st, notice[0])(notice[1])
+        
+        # Live repairs: withdrawals and slot changes update the flow allocation without a full rerun
+        live_round = st.session_state.get('live_round')
+        if live_round:
+            with st.expander("🔄 Live Updates"):
+                live_col1, live_col2 = st.columns(2)
+                with live_col1:
+                    active = [row for row in range(len(live_round['students'])) if row not in live_round['withdrawn']]
+                    withdraw_row = st.selectbox("Student", active,
+                                                format_func=lambda row: live_round['students'][row]['name'])
+                    if st.button("🚪 Withdraw Student", disabled=not active):
+                        apply_live_event(live_round, 'withdraw', withdraw_row)
+                        st.session_state.allocation_results = live_round_results(live_round)
+                with live_col2:
+                    internship_col = st.selectbox(
+                        "Internship", range(len(live_round['open_internships'])),
+                        format_func=lambda col: live_round['open_internships'][col][1]['title']
+                    )
+                    seats = st.number_input("Open Slots", 0, 100, live_round['allocation'].capacity(internship_col))
+                    if st.button("🪑 Update Slots"):
+                        apply_live_event(live_round, 'set_capacity', internship_col, int(seats))
+                        st.session_state.allocation_results = live_round_results(live_round)
+                # Later rounds: declined offers are refilled with placed students held in place, then
+                # an upgrade round lets placed students move up without anyone losing a seat
+                placed_rows, _ = live_round['allocation'].assignment()
+                declined = st.multiselect("Declined Offers", placed_rows.tolist(),
+                                          format_func=lambda row: live_round['students'][row]['name'])
+                round_col1, round_col2 = st.columns(2)
+                with round_col1:
+                    if st.button("📨 Run Refill Round", disabled=not declined):
+                        run_live_round(live_round, declined)
+                        st.session_state.allocation_results = live_round_results(live_round)
+                with round_col2:
+                    if st.button("⬆️ Run Upgrade Round"):
+                        run_live_round(live_round)
+                        st.session_state.allocation_results = live_round_results(live_round)
+                st.dataframe(pd.DataFrame(live_round['rounds'].history), hide_index=True)
+                for event in reversed(live_round['events'][-5:]):
+                    st.markdown(f"**{event['event']}** · repaired in {event['wall_time'] * 1000:,.2f} ms: "
+                                f"{', '.join(event['changes']) or 'no allocation changed'}")
         
         # Display allocation results
         if 'allocation_results' in st.session_state and st.session_state.allocation_results:
@@ -549,6 +820,32 @@ def main():
             st.markdown("### 🎉 Allocation Results")
             st.markdown(f"**Generated on:** {st.session_state.allocation_timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
             st.markdown(f"**Total Allocations:** {len(st.session_state.allocation_results)}")
+            report = st.session_state.get('allocation_report')
+            if report:
+                st.markdown(f"**Method:** {CAPACITY_ALGORITHMS[report['algorithm']]} · "
+                            f"total score {report['total_score']:,.1f} in {report['wall_time'] * 1000:,.1f} ms")
+                if 'greedy' in report:
+                    greedy = report['greedy']
+                    ratio = report['total_score'] / greedy['total_score'] if greedy['total_score'] else 1.0
+                    st.markdown(f"**vs Greedy:** {greedy['allocations']} allocations, total score "
+                                f"{greedy['total_score']:,.1f} in {greedy['wall_time'] * 1000:,.1f} ms "
+                                f"({ratio:.1%} of this run's total)")
+                if 'unconstrained' in report:
+                    unconstrained = report['unconstrained']
+                    st.markdown(f"**Without quotas:** {unconstrained['allocations']} allocations, total score "
+                                f"{unconstrained['total_score']:,.1f}; quotas added "
+                                f"{(report['wall_time'] - unconstrained['wall_time']) * 1000:,.1f} ms")
+                if report.get('quota_fill'):
+                    st.dataframe(pd.DataFrame([
+                        {
+                            'Group': label,
+                            'Reserved Seats': fill['reserved'],
+                            'Filled': fill['filled'],
+                            'Fill Rate': f"{fill['fill_rate']:.0%}",
+                            'Members Allocated': f"{fill['members_allocated']}/{fill['members']}"
+                        }
+                        for label, fill in report['quota_fill'].items()
+                    ]), hide_index=True)
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Results table
@@ -0,0 +1,105 @@
+"""Background allocation runs for the Streamlit pages.
+
+An ``AllocationJob`` runs an allocation function in a daemon thread so the
+script thread is never blocked. Pages keep the job in ``st.session_state``,
+so a rerun picks the view back up, and poll ``snapshot()`` to draw real
+progress. The function receives the job and hands ``job.reporter(stage)``
+to the engine functions as their ``progress(done, total)`` callback; once
+``cancel()`` is called, the next report raises ``AllocationCancelled`` and
+unwinds the run.
+
+Pure module: no Streamlit imports.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class AllocationCancelled(Exception):
+    """Raised from a progress report of a job that has been cancelled"""
+
+
+class AllocationJob:
+    """One allocation run on a worker thread, with its progress, outcome and cancellation flag.
+
+    ``status`` is ``"running"``, then ``"done"`` (``result`` holds the return
+    value), ``"cancelled"`` or ``"failed"`` (``error`` holds the exception).
+    ``prepare`` gets the thread before it starts, e.g. Streamlit's
+    ``add_script_run_ctx`` so cached resources can be read from it.
+    """
+
+    def __init__(self, run: Callable[["AllocationJob"], Any], prepare: Callable[[threading.Thread], Any] = None):
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self.status = "running"
+        self.stage = "Starting"
+        self.done = 0
+        self.total = 0
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._thread = threading.Thread(target=self._work, args=(run,), daemon=True)
+        if prepare is not None:
+            prepare(self._thread)
+        self._thread.start()
+
+    def _work(self, run: Callable[["AllocationJob"], Any]):
+        """Thread body: run and record how it ended"""
+        result, error = None, None
+        try:
+            result = run(self)
+            status = "done"
+        except AllocationCancelled:
+            status = "cancelled"
+        except Exception as exc:
+            status, error = "failed", exc
+        with self._lock:
+            self.status, self.result, self.error = status, result, error
+            self.finished = time.perf_counter()
+
+    def reporter(self, stage: str) -> Callable[[int, int], None]:
+        """Start a stage and return its ``progress(done, total)`` callback; both stop a cancelled job"""
+        def report(done: int, total: int):
+            if self._cancelled.is_set():
+                raise AllocationCancelled(stage)
+            with self._lock:
+                self.done, self.total = done, total
+
+        if self._cancelled.is_set():
+            raise AllocationCancelled(stage)
+        with self._lock:
+            self.stage, self.done, self.total = stage, 0, 0
+        return report
+
+    def cancel(self):
+        """Ask the run to stop at its next progress report"""
+        self._cancelled.set()
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is still going"""
+        return self._thread.is_alive()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the run has ended (or ``timeout`` seconds); True when it has"""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def snapshot(self) -> Dict:
+        """Consistent copy of the status and progress, with the stage's completed fraction"""
+        with self._lock:
+            end = self.finished if self.finished is not None else time.perf_counter()
+            return {
+                "status": self.status,
+                "stage": self.stage,
+                "done": self.done,
+                "total": self.total,
+                "fraction": min(self.done / self.total, 1.0) if self.total else 0.0,
+                "elapsed": end - self.started,
+            }
+
+
+def stage_progress(job: Optional[AllocationJob], stage: str) -> Optional[Callable[[int, int], None]]:
+    """``job.reporter(stage)``, or None when running without a job"""
+    return job.reporter(stage) if job is not None else None
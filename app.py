@@ -4,11 +4,16 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 from datetime import datetime, timedelta
 import time
-import random
 import hashlib
 
+from allocation_worker import AllocationJob
+from matching_engine import (
+    SKILLS_ONLY_WEIGHTS, TABLE_CATEGORICALS, InternshipTable, SkillIndex, score_components, score_matrix
+)
+
 # Configure the page
 st.set_page_config(
     page_title="PM Internship Smart Allocation Engine",
@@ -214,6 +219,7 @@ def load_mock_data():
         'location': ['Delhi', 'Mumbai', 'Bangalore', 'Chennai', 'Hyderabad', 
                     'Pune', 'Kolkata', 'Ahmedabad', 'Jaipur', 'Lucknow'],
         'experience': [0, 1, 2, 0, 3, 1, 0, 2, 1, 0],
+        'availability': [6, 3, 6, 4, 3, 6, 4, 6, 3, 6],
         'score': [85, 78, 92, 73, 88, 91, 67, 84, 79, 94]
     }
     
@@ -230,6 +236,7 @@ def load_mock_data():
         'duration': ['3 months', '6 months', '4 months', '3 months', '6 months',
                     '4 months', '6 months', '3 months', '4 months', '3 months'],
         'stipend': [15000, 12000, 18000, 20000, 16000, 22000, 25000, 17000, 21000, 14000],
+        'min_experience': [0, 1, 0, 2, 0, 1, 1, 0, 1, 0],
         'required_skills': [
             ['Python', 'JavaScript', 'Git'],
             ['Python', 'SQL', 'Excel'],
@@ -249,23 +256,132 @@ def load_mock_data():
     
     return candidates_df, internships_df
 
-def calculate_match_score(candidate_skills, required_skills):
-    """Calculate matching score between candidate and internship"""
-    candidate_set = set([skill.lower() for skill in candidate_skills])
-    required_set = set([skill.lower() for skill in required_skills])
-    
-    intersection = len(candidate_set.intersection(required_set))
-    union = len(candidate_set.union(required_set))
-    
-    if union == 0:
-        return 0
-    
-    jaccard_score = intersection / union
-    skill_match_score = (intersection / len(required_set)) * 100
-    
-    # Add some randomness to make it more realistic
-    final_score = min(100, skill_match_score + random.randint(-10, 15))
-    return max(0, final_score)
+@st.cache_resource
+def get_skill_index():
+    """Interned skill vocabulary for all candidates and internships"""
+    candidates_df, internships_df = load_mock_data()
+    return SkillIndex.from_skill_lists(*candidates_df['skills'], *internships_df['required_skills'])
+
+@st.cache_resource
+def get_internship_table():
+    """Columnar internship table used for the position filters"""
+    _, internships_df = load_mock_data()
+    postings = [
+        {"title": row['title'], "company": row['company'], "location": row['location'], "duration": row['duration'],
+         "salary": row['stipend'], "requirements": {"skills": row['required_skills']}}
+        for _, row in internships_df.iterrows()
+    ]
+    return InternshipTable(postings, get_skill_index(), categoricals=TABLE_CATEGORICALS + ("duration",))
+
+def to_posting(required_skills, location=""):
+    """Internship requirements in the posting shape the matching engine scores"""
+    return {"requirements": {"skills": required_skills, "minCgpa": 0.0}, "location": location, "industry": "", "salary": 0}
+
+# Score jitter added on top of skill coverage, inclusive bounds
+SCORE_JITTER = (-10, 15)
+
+# "seeded" and "none" are deterministic, so their scores can be memoized
+JITTER_MODES = {
+    '🌱 Seeded (repeatable)': 'seeded',
+    '🎯 No jitter': 'none',
+    '🎲 Random every run': 'random'
+}
+
+def stable_hash(key, seed=0):
+    """64-bit hash of a key that is identical across reruns, sessions and processes"""
+    digest = hashlib.blake2b(repr((seed, key)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def pair_jitter(candidate_keys, internship_keys, seed=0):
+    """Repeatable jitter for every (candidate, internship) pair, within SCORE_JITTER"""
+    low, high = SCORE_JITTER
+    left = np.array([stable_hash(key, seed) for key in candidate_keys], dtype=np.uint64)
+    right = np.array([stable_hash(key, seed) for key in internship_keys], dtype=np.uint64)
+    
+    # splitmix64 finalizer over the combined hashes, one hash per side instead of per pair
+    mixed = left[:, None] ^ (right[None, :] * np.uint64(0x9E3779B97F4A7C15))
+    mixed = (mixed ^ (mixed >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    mixed = (mixed ^ (mixed >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    mixed ^= mixed >> np.uint64(31)
+    return (mixed % np.uint64(high - low + 1)).astype(np.int64) + low
+
+def score_noise(shape, candidate_keys, internship_keys, jitter='seeded', seed=0):
+    """Jitter to add to a (candidates × internships) score matrix"""
+    if jitter == 'none':
+        return np.zeros(shape, dtype=np.int64)
+    elif jitter == 'seeded':
+        return pair_jitter(candidate_keys, internship_keys, seed)
+    elif jitter == 'random':
+        low, high = SCORE_JITTER
+        return np.random.randint(low, high + 1, shape)
+    raise ValueError(f"Unknown jitter mode {jitter!r}; expected one of {list(JITTER_MODES.values())}")
+
+# Allocation score components, in slider order; each is scored 0-100 per (candidate, internship)
+ALLOCATION_COMPONENTS = ('skills', 'location', 'experience', 'availability')
+DEFAULT_ALLOCATION_WEIGHTS = (40, 20, 20, 20)
+
+# Skills and location from the matching engine: share of required skills, and same city (100)
+# graded down by distance for nearby cities
+ALLOCATION_ENGINE_WEIGHTS = {
+    **SKILLS_ONLY_WEIGHTS,
+    "location_match": 100,
+    "location_rule": "exact",
+    "location_distance": [(150, 70), (400, 40)],
+}
+
+def allocation_components(candidates_df, internships_df):
+    """Component scores for every candidate × internship, shape (candidates, internships, components)"""
+    engine_scores = score_components(
+        [{"skills": skills, "preferences": {"location": [location]}}
+         for skills, location in zip(candidates_df['skills'], candidates_df['location'])],
+        [to_posting(skills, location)
+         for skills, location in zip(internships_df['required_skills'], internships_df['location'])],
+        get_skill_index(), weights=ALLOCATION_ENGINE_WEIGHTS
+    )
+    
+    # Experience: full marks at the minimum, each year short costs 50 points
+    years = candidates_df['experience'].to_numpy(dtype=np.float64)[:, None]
+    required_years = internships_df['min_experience'].to_numpy(dtype=np.float64)[None, :]
+    experience = np.clip(100 - 50 * (required_years - years), 0, 100)
+    
+    # Availability: share of the internship duration the candidate is available for
+    months = candidates_df['availability'].to_numpy(dtype=np.float64)[:, None]
+    duration = internships_df['duration'].str.extract(r'(\d+)')[0].astype(float).to_numpy()[None, :]
+    availability = np.minimum(months / duration, 1.0) * 100
+    
+    return np.stack([engine_scores['skill_match'], engine_scores['location_match'], experience, availability], axis=-1)
+
+@st.cache_data
+def get_allocation_components(candidates_df, internships_df):
+    """Component score matrices, computed once per dataset and shared across reruns and sessions"""
+    return allocation_components(candidates_df, internships_df)
+
+@st.cache_data
+def get_allocation_noise(candidates_df, internships_df, jitter='seeded', seed=0):
+    """Deterministic jitter matrix, memoized across reruns and sessions"""
+    internship_keys = list(zip(internships_df['title'], internships_df['company']))
+    return score_noise((len(candidates_df), len(internships_df)), list(candidates_df['name']), internship_keys,
+                       jitter, seed)
+
+def weighted_allocation_scores(components, weights, noise=0):
+    """Combine component matrices with slider weights (one matrix-vector product), plus jitter, clipped to 0-100"""
+    weights = np.asarray(weights, dtype=np.float64)
+    total = weights.sum()
+    if total == 0:
+        weights = np.full(len(weights), 1.0 / len(weights))
+    else:
+        weights = weights / total
+    return np.clip(components @ weights + noise, 0, 100)
+
+def allocation_score_matrix(candidates_df, internships_df, weights=DEFAULT_ALLOCATION_WEIGHTS, jitter='seeded', seed=0):
+    """Match scores for every candidate × internship: weighted components plus jitter"""
+    components = get_allocation_components(candidates_df, internships_df)
+    if jitter == 'random':
+        internship_keys = list(zip(internships_df['title'], internships_df['company']))
+        noise = score_noise(components.shape[:2], list(candidates_df['name']), internship_keys, jitter, seed)
+    else:
+        noise = get_allocation_noise(candidates_df, internships_df, jitter, seed)
+    return weighted_allocation_scores(components, weights, noise)
 
 def create_sidebar():
     """Create enhanced sidebar with navigation"""
@@ -486,20 +602,15 @@ def show_internships():
         duration_filter = st.selectbox("⏱️ Filter by Duration", 
                                      ['All'] + sorted(internships_df['duration'].unique().tolist()))
     
-    # Apply filters
-    filtered_df = internships_df.copy()
-    
-    if search_term:
-        filtered_df = filtered_df[
-            filtered_df['title'].str.contains(search_term, case=False) |
-            filtered_df['company'].str.contains(search_term, case=False)
-        ]
-    
+    # Apply filters as masks over the internship table (rows line up with internships_df)
+    equals = {}
     if location_filter != 'All':
-        filtered_df = filtered_df[filtered_df['location'] == location_filter]
-        
+        equals['location'] = [location_filter]
     if duration_filter != 'All':
-        filtered_df = filtered_df[filtered_df['duration'] == duration_filter]
+        equals['duration'] = [duration_filter]
+    
+    rows = get_internship_table().filter(search=search_term, equals=equals)
+    filtered_df = internships_df.iloc[rows]
     
     st.markdown(f"### 📋 Available Positions ({len(filtered_df)} found)")
     
@@ -547,6 +658,20 @@ def show_smart_allocation():
     with col4:
         availability_weight = st.slider("⏰ Availability Weight", 0, 100, 20, help="Importance of time availability")
     
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        jitter_label = st.selectbox("🎲 Score Jitter", list(JITTER_MODES),
+                                    help="Seeded and no-jitter scores repeat exactly and are cached between runs")
+        jitter = JITTER_MODES[jitter_label]
+    
+    with col2:
+        seed = st.number_input("🌱 Jitter Seed", min_value=0, value=0, step=1, disabled=jitter != 'seeded',
+                               help="Same seed, same scores")
+    
+    weights = (skills_weight, location_weight, experience_weight, availability_weight)
+    shares = weighted_allocation_scores(np.eye(len(weights)) * 100, weights)
+    
     # Allocation Controls
     col1, col2 = st.columns([3, 1])
     
@@ -555,12 +680,12 @@ def show_smart_allocation():
         
         # Algorithm overview
         with st.expander("🧠 View Algorithm Details", expanded=False):
-            st.markdown("""
+            st.markdown(f"""
             **AI Matching Algorithm:**
-            - **Skills Analysis (40%)**: NLP-based skill compatibility scoring
-            - **Location Match (20%)**: Geographic preference alignment
-            - **Experience Level (20%)**: Background and expertise matching
-            - **Availability (20%)**: Duration and timing compatibility
+            - **Skills Analysis ({shares[0]:.0f}%)**: NLP-based skill compatibility scoring
+            - **Location Match ({shares[1]:.0f}%)**: Geographic preference alignment
+            - **Experience Level ({shares[2]:.0f}%)**: Background and expertise matching
+            - **Availability ({shares[3]:.0f}%)**: Duration and timing compatibility
             
             **Machine Learning Features:**
             - Jaccard similarity for skill matching
@@ -571,45 +696,48 @@ def show_smart_allocation():
     
     with col2:
         if st.button("🚀 Run AI Allocation", key="smart_allocation_run", help="Start the intelligent allocation process", type="primary"):
-            run_allocation_process(candidates_df, internships_df)
+            run_allocation_process(candidates_df, internships_df, weights, jitter, int(seed))
+    
+    # Background run: progress while it works, then its outcome once
+    if st.session_state.get('allocation_job') is not None:
+        allocation_job_panel()
+    notice = st.session_state.pop('allocation_notice', None)
+    if notice:
+        getattr(st, notice[0])(notice[1])
+        if notice[0] == 'success':
+            st.balloons()
+    
+    # Live re-rank: moving a slider re-weights the cached component matrices and re-allocates
+    settings = (weights, jitter, int(seed))
+    if (st.session_state.allocation_results and jitter != 'random'
+            and st.session_state.get('allocation_settings') != settings):
+        scores = allocation_score_matrix(candidates_df, internships_df, weights, jitter, int(seed))
+        st.session_state.allocation_results = allocate_candidates(candidates_df, internships_df, scores)
+        st.session_state.allocation_settings = settings
     
     # Show allocation results if available
     if st.session_state.allocation_results:
         show_allocation_results()
 
-def run_allocation_process(candidates_df, internships_df):
-    """Run the AI allocation process with progress tracking"""
-    st.markdown("### 🔄 Processing Allocations...")
-    
-    # Progress tracking
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
+def allocate_candidates(candidates_df, internships_df, scores, progress=None):
+    """Best internship and status for every candidate from a score matrix"""
     results = []
     total_candidates = len(candidates_df)
+    # argmax keeps the first best internship, as max() over the rows did
+    best_columns = scores.argmax(axis=1)
+    internship_rows = [internship_row for _, internship_row in internships_df.iterrows()]
     
-    for idx, candidate_row in candidates_df.iterrows():
-        # Update progress
-        progress = (idx + 1) / total_candidates
-        progress_bar.progress(progress)
-        status_text.text(f"Processing candidate {idx + 1}/{total_candidates}: {candidate_row['name']}")
-        
-        # Simulate processing time
-        time.sleep(0.5)
+    for idx, (_, candidate_row) in enumerate(candidates_df.iterrows()):
+        if progress is not None:
+            progress(idx, candidate_row)
         
-        # Calculate match scores for all internships
-        candidate_scores = []
-        for _, internship_row in internships_df.iterrows():
-            score = calculate_match_score(candidate_row['skills'], internship_row['required_skills'])
-            candidate_scores.append({
-                'internship_title': internship_row['title'],
-                'company': internship_row['company'],
-                'score': score,
-                'internship_data': internship_row
-            })
-        
-        # Get best match
-        best_match = max(candidate_scores, key=lambda x: x['score'])
+        col = best_columns[idx]
+        best_match = {
+            'internship_title': internship_rows[col]['title'],
+            'company': internship_rows[col]['company'],
+            'score': float(scores[idx, col]),
+            'internship_data': internship_rows[col]
+        }
         
         # Determine status
         if best_match['score'] >= 70:
@@ -629,24 +757,71 @@ def run_allocation_process(candidates_df, internships_df):
             'status': status,
             'reasoning': reasoning
         })
-    
-    # Store results in session state
-    st.session_state.allocation_results = results
-    
-    # Add success notification
-    st.session_state.notifications.append({
-        'type': 'success',
-        'title': 'Allocation Completed',
-        'message': f'Successfully processed {len(results)} candidates',
-        'timestamp': datetime.now(),
-        'read': False
-    })
-    
-    progress_bar.progress(1.0)
-    status_text.text("✅ Allocation process completed!")
-    
-    st.success(f"🎉 Successfully allocated {len(results)} candidates!")
-    st.balloons()
+    return results
+
+def allocation_job_run(job, candidates_df, internships_df, weights, jitter, seed):
+    """Worker body: score every pair, then pick each candidate's best internship, reporting progress"""
+    total_pairs = len(candidates_df) * len(internships_df)
+    scored = job.reporter("Scoring pairs")
+    # Every candidate against every internship: one weighted sum over the cached component matrices
+    scores = allocation_score_matrix(candidates_df, internships_df, weights, jitter, seed)
+    scored(total_pairs, total_pairs)
+    
+    # Report about 100 times rather than once per candidate
+    allocated = job.reporter("Allocating candidates")
+    total_candidates = len(candidates_df)
+    step = max(1, total_candidates // 100)
+    def progress(idx, candidate_row):
+        if idx % step == 0:
+            allocated(idx + 1, total_candidates)
+    
+    results = allocate_candidates(candidates_df, internships_df, scores, progress)
+    allocated(total_candidates, total_candidates)
+    return results, (tuple(weights), jitter, seed)
+
+def run_allocation_process(candidates_df, internships_df, weights=DEFAULT_ALLOCATION_WEIGHTS, jitter='seeded', seed=0):
+    """Start the AI allocation on a worker thread; a new run cancels the one in flight"""
+    previous = st.session_state.get('allocation_job')
+    if previous is not None:
+        previous.cancel()
+    st.session_state.allocation_job = AllocationJob(
+        lambda job: allocation_job_run(job, candidates_df, internships_df, weights, jitter, seed),
+        prepare=add_script_run_ctx
+    )
+
+@st.fragment(run_every=0.5)
+def allocation_job_panel():
+    """Progress of the background allocation; stores its results and reruns the page once it has ended"""
+    job = st.session_state.get('allocation_job')
+    if job is None:
+        return
+    snapshot = job.snapshot()
+    if snapshot['status'] == 'running':
+        st.markdown("### 🔄 Processing Allocations...")
+        detail = f" {snapshot['done']:,}/{snapshot['total']:,}" if snapshot['total'] else ""
+        st.progress(snapshot['fraction'], text=f"{snapshot['stage']}{detail} · {snapshot['elapsed']:.1f}s")
+        if st.button("⏹️ Cancel Allocation", key="cancel_allocation"):
+            job.cancel()
+        return
+    
+    del st.session_state.allocation_job
+    if snapshot['status'] == 'done':
+        results, settings = job.result
+        st.session_state.allocation_results = results
+        st.session_state.allocation_settings = settings
+        st.session_state.notifications.append({
+            'type': 'success',
+            'title': 'Allocation Completed',
+            'message': f'Successfully processed {len(results)} candidates',
+            'timestamp': datetime.now(),
+            'read': False
+        })
+        st.session_state.allocation_notice = ('success', f"🎉 Successfully allocated {len(results)} candidates!")
+    elif snapshot['status'] == 'cancelled':
+        st.session_state.allocation_notice = ('warning', "⏹️ Allocation cancelled; previous results are kept")
+    else:
+        st.session_state.allocation_notice = ('error', f"❌ Allocation failed: {job.error}")
+    st.rerun()
 
 def generate_allocation_reasoning(candidate, best_match, score):
     """Generate human-readable reasoning for allocation decisions"""
@@ -0,0 +1,85 @@
+"""Throughput of the skill component: per-pair set intersection vs the batch engine.
+
+Compares, on one synthetic candidate × posting workload:
+  - the original per-pair scorer: ``len(set(user) & set(required)) / len(required)``
+  - the engine's overlap rule (packed bitsets, popcount)
+  - the engine's TF-IDF rule (one sparse skill × posting product)
+
+Skill popularity follows a Zipf-like curve so rare skills exist, as in the
+real catalog. Usage::
+
+    python benchmark_skill_similarity.py --profiles 2000 --postings 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from matching_engine import SKILLS_ONLY_WEIGHTS, SkillIndex, score_matrix
+
+
+def synthetic_workload(profiles: int, postings: int, skills: int, seed: int = 0):
+    """Candidate and posting skill lists drawn from a vocabulary with skewed popularity"""
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"Skill {i}" for i in range(skills)]
+    popularity = 1.0 / np.arange(1, skills + 1)
+    popularity /= popularity.sum()
+
+    def draw(count, low, high):
+        return [
+            [vocabulary[i] for i in rng.choice(skills, size=rng.integers(low, high + 1), replace=False, p=popularity)]
+            for _ in range(count)
+        ]
+
+    user_profiles = [{"skills": skill_list} for skill_list in draw(profiles, 2, 8)]
+    internships = [
+        {"requirements": {"skills": skill_list, "minCgpa": 0.0}, "location": "", "industry": "", "salary": 0}
+        for skill_list in draw(postings, 1, 6)
+    ]
+    return user_profiles, internships
+
+
+def per_pair_overlap(user_profiles, internships, limit: int) -> float:
+    """Seconds per pair of the original set-intersection scorer, timed on the first ``limit`` profiles"""
+    sample = user_profiles[:limit]
+    start = time.perf_counter()
+    for profile in sample:
+        user_skills = set(skill.lower() for skill in profile["skills"])
+        for internship in internships:
+            required = set(skill.lower() for skill in internship["requirements"]["skills"])
+            len(user_skills & required) / len(required)
+    return (time.perf_counter() - start) / (len(sample) * len(internships))
+
+
+def batch(user_profiles, internships, skill_rule: str) -> float:
+    """Seconds per pair of the batch engine's skill component"""
+    skill_index = SkillIndex.from_skill_lists(*(internship["requirements"]["skills"] for internship in internships))
+    start = time.perf_counter()
+    score_matrix(user_profiles, internships, skill_index, weights={**SKILLS_ONLY_WEIGHTS, "skill_rule": skill_rule})
+    return (time.perf_counter() - start) / (len(user_profiles) * len(internships))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--postings", type=int, default=2000)
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--per-pair-profiles", type=int, default=100,
+                        help="profiles timed with the slow per-pair scorer")
+    args = parser.parse_args()
+
+    user_profiles, internships = synthetic_workload(args.profiles, args.postings, args.skills)
+    results = {
+        "per-pair set intersection": per_pair_overlap(user_profiles, internships, args.per_pair_profiles),
+        "batch overlap (popcount)": batch(user_profiles, internships, "overlap"),
+        "batch tf-idf (sparse product)": batch(user_profiles, internships, "tfidf"),
+    }
+
+    baseline = results["per-pair set intersection"]
+    print(f"{args.profiles} profiles × {args.postings} postings, {args.skills} skills")
+    for name, seconds in results.items():
+        print(f"  {name:<32} {1 / seconds:>14,.0f} pairs/s  ({baseline / seconds:,.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,14 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from typing import Dict, List, Tuple
-import time
 import random
 
+from allocation_engine import ALLOCATION_ALGORITHMS, assign, assignment_summary, greedy_assignment
+from gazetteer import nearest_distance
+from matching_engine import (
+    ADVANCED_WEIGHTS, SKILL_RULES, SkillIndex, SkillPostingIndex, bit_count, score_components
+)
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Find My Perfect Match - All India Hub",
@@ -292,6 +297,9 @@ def get_all_india_skills():
         ]
     }
 
+# Bump whenever the internship catalog changes so cached indexes are rebuilt
+INTERNSHIP_DATA_VERSION = "2024.03"
+
 @st.cache_data
 def load_enhanced_all_india_internships():
     """Enhanced internship database with realistic opportunities across all Indian industries"""
@@ -612,23 +620,38 @@ def get_sample_user_profiles():
         }
     }
 
-def calculate_advanced_match_score(user_profile: Dict, internship: Dict) -> Tuple[float, Dict]:
-    """Advanced matching algorithm with detailed scoring"""
+@st.cache_resource
+def get_skill_index() -> SkillIndex:
+    """Interned skill vocabulary built from the skills database and every loaded internship"""
+    return SkillIndex.from_skill_lists(
+        *get_all_india_skills().values(),
+        *(internship["requirements"]["skills"] for internship in load_enhanced_all_india_internships())
+    )
+
+@st.cache_resource
+def get_posting_index(data_version: str = INTERNSHIP_DATA_VERSION) -> SkillPostingIndex:
+    """Inverted skill → internship index scored with the advanced weights"""
+    return SkillPostingIndex(load_enhanced_all_india_internships(), get_skill_index(), weights="advanced")
+
+def calculate_advanced_match_score(user_profile: Dict, internship: Dict, skill_index: SkillIndex = None) -> Tuple[float, Dict]:
+    """Advanced matching algorithm with detailed scoring.
+
+    Returns the capped score and its numeric components only; the reasons
+    shown to students are built on demand by ``explain_match``.
+    """
     score = 0
-    reasons = []
     
-    # Skills matching (35% weight)
-    user_skills = set([skill.lower() for skill in user_profile.get("skills", [])])
-    required_skills = set([skill.lower() for skill in internship["requirements"]["skills"]])
+    # Skills matching (35% weight) - popcount over interned skill bitmasks
+    if skill_index is None:
+        skill_index = get_skill_index()
+    user_skills = skill_index.mask(user_profile.get("skills", []))
+    required_skills = skill_index.mask(internship["requirements"]["skills"])
     
-    skill_overlap = user_skills.intersection(required_skills)
-    skill_match_ratio = len(skill_overlap) / len(required_skills) if required_skills else 0
+    required_count = bit_count(required_skills)
+    skill_match_ratio = bit_count(user_skills & required_skills) / required_count if required_count else 0
     skill_score = skill_match_ratio * 35
     score += skill_score
     
-    if skill_overlap:
-        reasons.append(f"🎯 Strong skill match: {', '.join(list(skill_overlap)[:3])}")
-    
     # CGPA matching (25% weight)
     cgpa_requirement = internship["requirements"]["minCgpa"]
     user_cgpa = user_profile.get("cgpa", 7.0)
@@ -637,20 +660,14 @@ def calculate_advanced_match_score(user_profile: Dict, internship: Dict) -> Tupl
         cgpa_excess = user_cgpa - cgpa_requirement
         if cgpa_excess >= 1.0:
             cgpa_score = 25
-            reasons.append(f"⭐ Exceeds CGPA by {cgpa_excess:.1f} points")
         elif cgpa_excess >= 0.5:
             cgpa_score = 22
-            reasons.append(f"✅ Good CGPA match ({user_cgpa} > {cgpa_requirement})")
         else:
             cgpa_score = 20
-            reasons.append(f"✅ Meets CGPA requirement")
+    elif cgpa_requirement - user_cgpa <= 0.2:
+        cgpa_score = 15
     else:
-        cgpa_diff = cgpa_requirement - user_cgpa
-        if cgpa_diff <= 0.2:
-            cgpa_score = 15
-            reasons.append(f"⚡ Close to CGPA requirement")
-        else:
-            cgpa_score = 8
+        cgpa_score = 8
     
     score += cgpa_score
     
@@ -658,15 +675,19 @@ def calculate_advanced_match_score(user_profile: Dict, internship: Dict) -> Tupl
     preferred_locations = user_profile.get("preferences", {}).get("location", [])
     internship_location = internship["location"].lower()
     
-    location_score = 0
     if any(loc.lower() in internship_location for loc in preferred_locations):
         location_score = 20
-        reasons.append("📍 Perfect location match")
     elif "remote" in [loc.lower() for loc in preferred_locations] and internship.get("isRemote", False):
         location_score = 20
-        reasons.append("🏠 Matches remote preference")
     else:
-        location_score = 10
+        # Graded by distance to the nearest preferred city
+        distance = nearest_distance(preferred_locations, internship["location"])
+        if distance <= 150:
+            location_score = 17
+        elif distance <= 400:
+            location_score = 13
+        else:
+            location_score = 10
     
     score += location_score
     
@@ -676,7 +697,6 @@ def calculate_advanced_match_score(user_profile: Dict, internship: Dict) -> Tupl
     
     if user_industry in internship_industry or internship_industry in user_industry:
         industry_score = 15
-        reasons.append("🏭 Perfect industry alignment")
     else:
         industry_score = 7
     
@@ -684,57 +704,95 @@ def calculate_advanced_match_score(user_profile: Dict, internship: Dict) -> Tupl
     
     # Salary matching (5% weight)
     salary_range = user_profile.get("preferences", {}).get("salary_range", [0, 100000])
-    internship_salary = internship["salary"]
     
-    if salary_range[0] <= internship_salary <= salary_range[1]:
+    if salary_range[0] <= internship["salary"] <= salary_range[1]:
         salary_score = 5
-        reasons.append("💰 Within salary expectations")
     else:
         salary_score = 2
     
     score += salary_score
     
     return min(score, 100), {
-        "reasons": reasons,
         "skill_match": skill_score,
         "cgpa_match": cgpa_score,
         "location_match": location_score,
         "industry_match": industry_score,
-        "salary_match": salary_score,
-        "skill_overlap": list(skill_overlap)
+        "salary_match": salary_score
     }
 
-def run_smart_allocation(user_profiles: List[Dict], internships: List[Dict]) -> Dict:
+def explain_match(user_profile: Dict, internship: Dict, details: Dict = None,
+                  skill_index: SkillIndex = None) -> List[str]:
+    """Reasons behind one match, built from its numeric components only when a page renders it"""
+    if skill_index is None:
+        skill_index = get_skill_index()
+    if details is None:
+        _, details = calculate_advanced_match_score(user_profile, internship, skill_index)
+    reasons = []
+    
+    skill_overlap = skill_index.names(
+        skill_index.mask(user_profile.get("skills", [])) & skill_index.mask(internship["requirements"]["skills"]))
+    if skill_overlap:
+        reasons.append(f"🎯 Strong skill match: {', '.join(skill_overlap[:3])}")
+    
+    cgpa_requirement = internship["requirements"]["minCgpa"]
+    user_cgpa = user_profile.get("cgpa", 7.0)
+    if details["cgpa_match"] == 25:
+        reasons.append(f"⭐ Exceeds CGPA by {user_cgpa - cgpa_requirement:.1f} points")
+    elif details["cgpa_match"] == 22:
+        reasons.append(f"✅ Good CGPA match ({user_cgpa} > {cgpa_requirement})")
+    elif details["cgpa_match"] == 20:
+        reasons.append(f"✅ Meets CGPA requirement")
+    elif details["cgpa_match"] == 15:
+        reasons.append(f"⚡ Close to CGPA requirement")
+    
+    preferred_locations = user_profile.get("preferences", {}).get("location", [])
+    if details["location_match"] == 20:
+        if any(loc.lower() in internship["location"].lower() for loc in preferred_locations):
+            reasons.append("📍 Perfect location match")
+        else:
+            reasons.append("🏠 Matches remote preference")
+    elif details["location_match"] == 17:
+        distance = nearest_distance(preferred_locations, internship["location"])
+        reasons.append(f"📍 Near your preferred location (~{distance:.0f} km)")
+    
+    if details["industry_match"] == 15:
+        reasons.append("🏭 Perfect industry alignment")
+    
+    if details["salary_match"] == 5:
+        reasons.append("💰 Within salary expectations")
+    
+    return reasons
+
+def run_smart_allocation(user_profiles: List[Dict], internships: List[Dict], skill_rule: str = "overlap",
+                         algorithm: str = "greedy") -> Dict:
     """Enhanced allocation algorithm with optimization"""
-    all_matches = []
-    
-    # Calculate all possible matches
-    for profile in user_profiles:
-        for internship in internships:
-            score, details = calculate_advanced_match_score(profile, internship)
-            all_matches.append({
-                "profile": profile,
-                "internship": internship,
-                "score": score,
-                "details": details
-            })
-    
-    # Sort by match quality
-    all_matches.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Optimal allocation using greedy approach
-    allocated = []
-    used_internships = set()
-    used_profiles = set()
+    skill_index = get_skill_index()
     
-    for match in all_matches:
-        profile_name = match["profile"]["name"]
-        internship_id = match["internship"]["id"]
-        
-        if profile_name not in used_profiles and internship_id not in used_internships:
-            allocated.append(match)
-            used_profiles.add(profile_name)
-            used_internships.add(internship_id)
+    # Calculate all possible matches in one pass; skill_rule picks the skill component
+    components = score_components(user_profiles, internships, skill_index,
+                                  weights={**ADVANCED_WEIGHTS, "skill_rule": skill_rule})
+    scores = components["score"]
+    
+    # One internship per profile (by name / id): best pairs first ("greedy") or the highest total ("optimal")
+    profile_keys = [profile["name"] for profile in user_profiles]
+    internship_keys = [internship["id"] for internship in internships]
+    profile_rows, internship_cols = assign(scores, algorithm, profile_keys, internship_keys)
+    if algorithm != "greedy":
+        # List the allocation best first, as greedy does
+        order = np.argsort(-scores[profile_rows, internship_cols], kind="stable")
+        profile_rows, internship_cols = profile_rows[order], internship_cols[order]
+    
+    allocated = []
+    for profile_idx, internship_idx in zip(profile_rows, internship_cols):
+        # Numeric components only; reasons are built by explain_match if the pair is rendered
+        details = {name: float(values[profile_idx, internship_idx])
+                   for name, values in components.items() if name != "score"}
+        allocated.append({
+            "profile": user_profiles[profile_idx],
+            "internship": internships[internship_idx],
+            "score": float(scores[profile_idx, internship_idx]),
+            "details": details
+        })
     
     # Calculate comprehensive statistics
     total_score = sum([match["score"] for match in allocated])
@@ -746,9 +804,11 @@ def run_smart_allocation(user_profiles: List[Dict], internships: List[Dict]) ->
         industry = match["internship"]["industry"]
         industry_dist[industry] = industry_dist.get(industry, 0) + 1
     
-    return {
+    result = {
         "allocated": allocated,
+        "algorithm": algorithm,
         "total_matches": len(allocated),
+        "total_score": total_score,
         "average_score": avg_score,
         "success_rate": len(allocated) / len(user_profiles) * 100 if user_profiles else 0,
         "unallocated_profiles": len(user_profiles) - len(allocated),
@@ -759,6 +819,11 @@ def run_smart_allocation(user_profiles: List[Dict], internships: List[Dict]) ->
             "fair": len([m for m in allocated if m["score"] < 60])
         }
     }
+    if algorithm != "greedy":
+        # Greedy baseline on the same scores, for comparison
+        baseline = greedy_assignment(scores, profile_keys, internship_keys)
+        result["baseline"] = {"algorithm": "greedy", **assignment_summary(scores, *baseline)}
+    return result
 
 def main():
     """Main Find Matches Application"""
@@ -885,6 +950,9 @@ def main():
                 st.session_state.run_allocation = False
         
         with col2:
+            skill_rule = st.selectbox("🧮 Allocation Skill Scoring", list(SKILL_RULES), format_func=SKILL_RULES.get)
+            algorithm = st.selectbox("⚖️ Allocation Algorithm", list(ALLOCATION_ALGORITHMS),
+                                     format_func=ALLOCATION_ALGORITHMS.get)
             if st.button("🚀 Run Smart Allocation", type="secondary", width="stretch"):
                 st.session_state.run_allocation = True
                 st.session_state.run_matching = False
@@ -892,24 +960,11 @@ def main():
         # Find individual matches
         if st.session_state.get("run_matching", False):
             with st.spinner("🔍 AI is analyzing thousands of opportunities across India..."):
-                progress_bar = st.progress(0)
-                for i in range(100):
-                    time.sleep(0.02)
-                    progress_bar.progress(i + 1)
-                
-                internships = load_enhanced_all_india_internships()
-                
-                matches = []
-                for internship in internships:
-                    score, details = calculate_advanced_match_score(user_profile, internship)
-                    matches.append({
-                        "internship": internship,
-                        "score": score,
-                        "details": details
-                    })
+                posting_index = get_posting_index(INTERNSHIP_DATA_VERSION)
                 
-                matches.sort(key=lambda x: x["score"], reverse=True)
-                st.session_state.matches = matches[:8]  # Top 8 matches
+                # Top 8 matches with numeric components; reasons are built as each one is rendered
+                st.session_state.matches = posting_index.top_k_matches(user_profile, k=8)
+                st.session_state.match_profile = user_profile
             
             st.success(f"✅ Found {len(st.session_state.matches)} perfect matches tailored for you!")
             st.balloons()
@@ -917,27 +972,12 @@ def main():
         # Run comprehensive allocation
         if st.session_state.get("run_allocation", False):
             with st.spinner("🚀 Running advanced allocation algorithm across all profiles..."):
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                for i in range(100):
-                    time.sleep(0.03)
-                    progress_bar.progress(i + 1)
-                    if i < 30:
-                        status_text.text("🔍 Analyzing candidate profiles...")
-                    elif i < 60:
-                        status_text.text("📊 Calculating compatibility scores...")
-                    elif i < 90:
-                        status_text.text("🎯 Optimizing allocations...")
-                    else:
-                        status_text.text("✅ Finalizing results...")
-                
                 # Use sample profiles for allocation simulation
                 profiles = list(sample_profiles.values())
                 profiles.append(user_profile)  # Add current user
                 
                 internships = load_enhanced_all_india_internships()
-                allocation_result = run_smart_allocation(profiles, internships)
+                allocation_result = run_smart_allocation(profiles, internships, skill_rule, algorithm)
                 
                 st.session_state.allocation_result = allocation_result
             
@@ -954,6 +994,8 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
+            skill_index = get_skill_index()
+            user_skills = skill_index.mask(selected_skills)
             for i, match in enumerate(st.session_state.matches[:6], 1):
                 internship = match["internship"]
                 score = match["score"]
@@ -999,7 +1041,8 @@ def main():
                         st.markdown("**🛠️ Skills Assessment:**")
                         skills_html = ""
                         for skill in internship["requirements"]["skills"]:
-                            if skill.lower() in [s.lower() for s in selected_skills]:
+                            # Alias-aware, like the score: a synonym of a selected skill counts as matched
+                            if skill_index.mask([skill]) & user_skills:
                                 skills_html += f'<span class="skill-tag skill-matched">{skill} ✓</span>'
                             else:
                                 skills_html += f'<span class="skill-tag">{skill}</span>'
@@ -1032,7 +1075,7 @@ def main():
                     
                     # Match analysis
                     st.markdown("**🎯 Why this matches you:**")
-                    for reason in details["reasons"]:
+                    for reason in explain_match(st.session_state.match_profile, internship, details):
                         st.markdown(f"✅ {reason}")
                     
                     # Score breakdown
@@ -1082,6 +1125,11 @@ def main():
                     </div>
                     """, unsafe_allow_html=True)
             
+            if result.get("baseline"):
+                baseline = result["baseline"]
+                st.caption(f"Total match score {result['total_score']:,.1f} vs greedy {baseline['total_score']:,.1f} "
+                           f"(average {result['average_score']:.1f}% vs {baseline['average_score']:.1f}%)")
+            
             # Quality distribution
             st.markdown("### 📈 Match Quality Distribution")
             quality_data = result["quality_distribution"]
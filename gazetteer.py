@@ -0,0 +1,204 @@
+"""Bundled gazetteer of Indian cities and states for distance-graded location scoring.
+
+Location strings such as "Pune, Maharashtra", "Bengaluru" or "Delhi, NCR" are
+resolved once to integer place ids; the great-circle distance between every
+pair of places is precomputed into one matrix, so "how far is this posting
+from the student's preferred city" is a table lookup rather than a string scan.
+
+Cities stand in for their districts. Pure module: no Streamlit imports.
+"""
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# (city, state, latitude, longitude, aliases)
+CITIES: List[Tuple[str, str, float, float, Tuple[str, ...]]] = [
+    ("Mumbai", "Maharashtra", 19.08, 72.88, ("Bombay",)),
+    ("Navi Mumbai", "Maharashtra", 19.03, 73.03, ()),
+    ("Thane", "Maharashtra", 19.22, 72.98, ()),
+    ("Pune", "Maharashtra", 18.52, 73.86, ("Poona",)),
+    ("Nagpur", "Maharashtra", 21.15, 79.09, ()),
+    ("Nashik", "Maharashtra", 20.00, 73.79, ()),
+    ("Aurangabad", "Maharashtra", 19.88, 75.34, ()),
+    ("Delhi", "Delhi", 28.61, 77.21, ("New Delhi", "NCR", "Delhi NCR")),
+    ("Noida", "Uttar Pradesh", 28.54, 77.39, ("Greater Noida",)),
+    ("Gurgaon", "Haryana", 28.46, 77.03, ("Gurugram",)),
+    ("Faridabad", "Haryana", 28.41, 77.32, ()),
+    ("Ghaziabad", "Uttar Pradesh", 28.67, 77.45, ()),
+    ("Bangalore", "Karnataka", 12.97, 77.59, ("Bengaluru",)),
+    ("Mysore", "Karnataka", 12.30, 76.64, ("Mysuru",)),
+    ("Mangalore", "Karnataka", 12.91, 74.86, ("Mangaluru",)),
+    ("Hubli", "Karnataka", 15.36, 75.12, ("Hubballi", "Dharwad")),
+    ("Chennai", "Tamil Nadu", 13.08, 80.27, ("Madras",)),
+    ("Coimbatore", "Tamil Nadu", 11.02, 76.96, ()),
+    ("Madurai", "Tamil Nadu", 9.93, 78.12, ()),
+    ("Tiruchirappalli", "Tamil Nadu", 10.79, 78.70, ("Trichy",)),
+    ("Hyderabad", "Telangana", 17.39, 78.49, ("Secunderabad",)),
+    ("Warangal", "Telangana", 17.97, 79.59, ()),
+    ("Visakhapatnam", "Andhra Pradesh", 17.69, 83.22, ("Vizag",)),
+    ("Vijayawada", "Andhra Pradesh", 16.51, 80.65, ()),
+    ("Tirupati", "Andhra Pradesh", 13.63, 79.42, ()),
+    ("Kolkata", "West Bengal", 22.57, 88.36, ("Calcutta",)),
+    ("Howrah", "West Bengal", 22.59, 88.31, ()),
+    ("Siliguri", "West Bengal", 26.73, 88.40, ()),
+    ("Ahmedabad", "Gujarat", 23.02, 72.57, ()),
+    ("Gandhinagar", "Gujarat", 23.22, 72.65, ()),
+    ("Surat", "Gujarat", 21.17, 72.83, ()),
+    ("Vadodara", "Gujarat", 22.31, 73.18, ("Baroda",)),
+    ("Rajkot", "Gujarat", 22.30, 70.80, ()),
+    ("Jaipur", "Rajasthan", 26.91, 75.79, ()),
+    ("Jodhpur", "Rajasthan", 26.24, 73.02, ()),
+    ("Udaipur", "Rajasthan", 24.59, 73.71, ()),
+    ("Kota", "Rajasthan", 25.21, 75.86, ()),
+    ("Lucknow", "Uttar Pradesh", 26.85, 80.95, ()),
+    ("Kanpur", "Uttar Pradesh", 26.45, 80.33, ()),
+    ("Varanasi", "Uttar Pradesh", 25.32, 82.97, ("Banaras",)),
+    ("Agra", "Uttar Pradesh", 27.18, 78.01, ()),
+    ("Prayagraj", "Uttar Pradesh", 25.44, 81.85, ("Allahabad",)),
+    ("Chandigarh", "Chandigarh", 30.73, 76.78, ()),
+    ("Mohali", "Punjab", 30.70, 76.72, ()),
+    ("Ludhiana", "Punjab", 30.90, 75.86, ()),
+    ("Amritsar", "Punjab", 31.63, 74.87, ()),
+    ("Dehradun", "Uttarakhand", 30.32, 78.03, ()),
+    ("Shimla", "Himachal Pradesh", 31.10, 77.17, ()),
+    ("Srinagar", "Jammu and Kashmir", 34.08, 74.80, ()),
+    ("Jammu", "Jammu and Kashmir", 32.73, 74.86, ()),
+    ("Bhopal", "Madhya Pradesh", 23.26, 77.41, ()),
+    ("Indore", "Madhya Pradesh", 22.72, 75.86, ()),
+    ("Gwalior", "Madhya Pradesh", 26.22, 78.18, ()),
+    ("Jabalpur", "Madhya Pradesh", 23.18, 79.99, ()),
+    ("Raipur", "Chhattisgarh", 21.25, 81.63, ()),
+    ("Patna", "Bihar", 25.59, 85.14, ()),
+    ("Ranchi", "Jharkhand", 23.34, 85.31, ()),
+    ("Jamshedpur", "Jharkhand", 22.80, 86.20, ()),
+    ("Bhubaneswar", "Odisha", 20.30, 85.82, ()),
+    ("Cuttack", "Odisha", 20.46, 85.88, ()),
+    ("Guwahati", "Assam", 26.14, 91.74, ()),
+    ("Shillong", "Meghalaya", 25.58, 91.89, ()),
+    ("Imphal", "Manipur", 24.82, 93.94, ()),
+    ("Agartala", "Tripura", 23.83, 91.29, ()),
+    ("Kochi", "Kerala", 9.93, 76.27, ("Cochin", "Ernakulam")),
+    ("Thiruvananthapuram", "Kerala", 8.52, 76.94, ("Trivandrum",)),
+    ("Kozhikode", "Kerala", 11.26, 75.78, ("Calicut",)),
+    ("Panaji", "Goa", 15.49, 73.83, ("Panjim",)),
+    ("Puducherry", "Puducherry", 11.94, 79.81, ("Pondicherry",)),
+]
+
+# (state or union territory, centroid latitude, centroid longitude, aliases)
+STATES: List[Tuple[str, float, float, Tuple[str, ...]]] = [
+    ("Andhra Pradesh", 15.91, 79.74, ()),
+    ("Arunachal Pradesh", 28.22, 94.73, ()),
+    ("Assam", 26.20, 92.94, ()),
+    ("Bihar", 25.10, 85.31, ()),
+    ("Chhattisgarh", 21.28, 81.87, ()),
+    ("Goa", 15.30, 74.12, ()),
+    ("Gujarat", 22.26, 71.19, ()),
+    ("Haryana", 29.06, 76.09, ()),
+    ("Himachal Pradesh", 31.10, 77.17, ()),
+    ("Jharkhand", 23.61, 85.28, ()),
+    ("Karnataka", 15.32, 75.71, ()),
+    ("Kerala", 10.85, 76.27, ()),
+    ("Madhya Pradesh", 22.97, 78.66, ()),
+    ("Maharashtra", 19.75, 75.71, ()),
+    ("Manipur", 24.66, 93.91, ()),
+    ("Meghalaya", 25.47, 91.37, ()),
+    ("Mizoram", 23.16, 92.94, ()),
+    ("Nagaland", 26.16, 94.56, ()),
+    ("Odisha", 20.95, 85.10, ("Orissa",)),
+    ("Punjab", 31.15, 75.34, ()),
+    ("Rajasthan", 27.02, 74.22, ()),
+    ("Sikkim", 27.53, 88.51, ()),
+    ("Tamil Nadu", 11.13, 78.66, ()),
+    ("Telangana", 18.11, 79.02, ()),
+    ("Tripura", 23.94, 91.99, ()),
+    ("Uttar Pradesh", 26.85, 80.95, ("UP",)),
+    ("Uttarakhand", 30.07, 79.02, ()),
+    ("West Bengal", 22.99, 87.85, ()),
+    ("Jammu and Kashmir", 33.78, 76.58, ("J&K",)),
+    ("Ladakh", 34.15, 77.58, ()),
+]
+
+UNKNOWN_PLACE = -1
+
+_EARTH_RADIUS_KM = 6371.0
+
+
+class Gazetteer:
+    """Place ids for city / state names and the precomputed distance between every pair"""
+
+    def __init__(self, cities=CITIES, states=STATES):
+        self.names: List[str] = []
+        self.states: List[str] = []
+        coordinates = []
+        self._cities: Dict[str, int] = {}
+        self._states: Dict[str, int] = {}
+
+        for city, state, latitude, longitude, aliases in cities:
+            for alias in (city,) + tuple(aliases):
+                self._cities[alias.lower()] = len(self.names)
+            self.names.append(city)
+            self.states.append(state)
+            coordinates.append((latitude, longitude))
+        for state, latitude, longitude, aliases in states:
+            for alias in (state,) + tuple(aliases):
+                self._states[alias.lower()] = len(self.names)
+            self.names.append(state)
+            self.states.append(state)
+            coordinates.append((latitude, longitude))
+
+        # Haversine distance between every pair of places, in km
+        latitude, longitude = np.radians(np.array(coordinates, dtype=np.float64)).T
+        dlat = latitude[:, None] - latitude[None, :]
+        dlon = longitude[:, None] - longitude[None, :]
+        a = np.sin(dlat / 2) ** 2 + np.cos(latitude)[:, None] * np.cos(latitude)[None, :] * np.sin(dlon / 2) ** 2
+        self.distance_km = (2 * _EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))).astype(np.float32)
+
+        self._resolved: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def resolve(self, location: str) -> int:
+        """Place id of a location string, preferring the most specific part; ``UNKNOWN_PLACE`` if none"""
+        key = (location or "").strip().lower()
+        place = self._resolved.get(key)
+        if place is None:
+            parts = [part.strip() for part in key.replace("/", ",").split(",")]
+            place = next((self._cities[part] for part in parts if part in self._cities),
+                         next((self._states[part] for part in parts if part in self._states), UNKNOWN_PLACE))
+            with self._lock:
+                self._resolved[key] = place
+        return place
+
+    def resolve_all(self, locations: Iterable[str]) -> np.ndarray:
+        """Place ids for a list of location strings"""
+        return np.array([self.resolve(location) for location in locations], dtype=np.int64)
+
+    def distances(self, from_places: np.ndarray, to_places: np.ndarray) -> np.ndarray:
+        """(from × to) distance table in km; ``inf`` where either place is unknown"""
+        from_places = np.asarray(from_places, dtype=np.int64)
+        to_places = np.asarray(to_places, dtype=np.int64)
+        table = self.distance_km[np.maximum(from_places, 0)[:, None], np.maximum(to_places, 0)[None, :]]
+        known = (from_places >= 0)[:, None] & (to_places >= 0)[None, :]
+        return np.where(known, table, np.float32(np.inf))
+
+    def nearest_distance(self, preferred_locations: Iterable[str], location: str) -> float:
+        """Distance in km from ``location`` to the closest preferred location (``inf`` if none resolves)"""
+        preferred = self.resolve_all(preferred_locations)
+        if len(preferred) == 0:
+            return float("inf")
+        return float(self.distances(preferred, [self.resolve(location)]).min())
+
+
+@lru_cache(maxsize=None)
+def default_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer built from the bundled tables"""
+    return Gazetteer()
+
+
+def nearest_distance(preferred_locations: Iterable[str], location: str) -> float:
+    """``Gazetteer.nearest_distance`` on the bundled gazetteer"""
+    return default_gazetteer().nearest_distance(preferred_locations, location)
@@ -0,0 +1,1204 @@
+"""Vectorized batch scoring engine for internship matching.
+
+Scores every (profile, internship) pair at once with NumPy arrays instead of
+calling ``calculate_match_score`` once per pair. There is a single scoring
+kernel; the component weights and rules of each app's scorer are data, kept
+as named weight profiles in ``WEIGHT_PROFILES`` (``"all_india"`` mirrors
+``all_india_hub.calculate_match_score`` exactly), so the numbers are identical
+to the scalar scorers they replace.
+
+Skills are interned into a ``SkillIndex`` and stored as packed bitmasks, so an
+overlap count is ``popcount(a & b)`` rather than a set intersection of freshly
+lowercased strings. Internships and profiles are scored as ``records``
+(pre-normalized ``InternshipRecord`` / ``ProfileRecord``); plain dicts are
+converted on the way in, records built against the same ``SkillIndex`` are
+used as-is. ``InternshipTable`` keeps a whole catalog as fixed-size columns
+for array filters, sorts and scores.
+
+This module is deliberately free of Streamlit imports so it can be used from
+any page (and from scripts / benchmarks) without page side effects.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from gazetteer import default_gazetteer
+from records import InternshipRecord, ProfileRecord, RecordVocabulary, Vocabulary
+from skill_synonyms import default_skill_aliases
+
+# Every weight profile starts from these neutral rules and only overrides the
+# components it scores. CGPA tiers: "cgpa_meets" is (minimum excess, score)
+# applied when the candidate meets the requirement; "cgpa_below" is (maximum
+# gap, score) applied when they fall short; anything else gets "cgpa_floor".
+#
+# Rule keys:
+#   skill_rule             "overlap" (share of required skills held) or "tfidf" (IDF-weighted share, so
+#                          rare skills count for more than common ones; see _tfidf_skill_ratio)
+#   location_rule          "substring" (preferred city appears in the posting location) or "exact"
+#   remote_rule            "preferred" (profile lists "remote" and posting is remote) or "any"
+#   location_listed_remote score when nothing matched but the location text says "remote"
+#   location_distance      [(max km, score)] tiers for postings near (but not in) a preferred location
+#   industry_rule          "containment" (profile industry and posting industry contain one another),
+#                          "exact", or "preferred" (any of the profile's preferences["domains"])
+#   industry_field         posting key holding the industry / domain
+#   experience_table       {(experience_level, difficulty): score}, else "experience_default"
+BASE_WEIGHTS = {
+    "skill": 0,
+    "skill_rule": "overlap",
+    "cgpa_meets": [],
+    "cgpa_below": [],
+    "cgpa_floor": 0,
+    "location_match": 0,
+    "location_miss": 0,
+    "location_rule": "substring",
+    "remote_rule": "preferred",
+    "location_listed_remote": None,
+    "location_distance": [],
+    "industry_match": 0,
+    "industry_miss": 0,
+    "industry_rule": "containment",
+    "industry_field": "industry",
+    "salary_match": 0,
+    "salary_miss": 0,
+    "experience_table": {},
+    "experience_default": 0,
+}
+
+# all_india_hub.calculate_match_score (40/20/20/15/5)
+ALL_INDIA_WEIGHTS = {
+    **BASE_WEIGHTS,
+    "skill": 40,
+    "cgpa_meets": [(0.0, 20)],
+    "cgpa_below": [(0.3, 12)],
+    "cgpa_floor": 5,
+    "location_match": 20,
+    "location_miss": 8,
+    "location_distance": [(150, 16), (400, 12)],
+    "industry_match": 15,
+    "industry_miss": 5,
+    "salary_match": 5,
+    "salary_miss": 2,
+}
+
+# enhanced_find_matches.calculate_advanced_match_score (35/25/20/15/5)
+ADVANCED_WEIGHTS = {
+    **BASE_WEIGHTS,
+    "skill": 35,
+    "cgpa_meets": [(0.0, 20), (0.5, 22), (1.0, 25)],
+    "cgpa_below": [(0.2, 15)],
+    "cgpa_floor": 8,
+    "location_match": 20,
+    "location_miss": 10,
+    "location_distance": [(150, 17), (400, 13)],
+    "industry_match": 15,
+    "industry_miss": 7,
+    "salary_match": 5,
+    "salary_miss": 2,
+}
+
+# world_class_streamlit_app quick matcher: skills, CGPA and salary only (50/25/25)
+QUICK_MATCH_WEIGHTS = {
+    **BASE_WEIGHTS,
+    "skill": 50,
+    "cgpa_meets": [(0.0, 25)],
+    "cgpa_floor": 10,
+    "salary_match": 25,
+    "salary_miss": 15,
+}
+
+# streamlit_app.calculate_match_score: skills, CGPA, location, preferred domains (50/25/15/10)
+DOMAIN_MATCH_WEIGHTS = {
+    **BASE_WEIGHTS,
+    "skill": 50,
+    "cgpa_meets": [(0.0, 25)],
+    "cgpa_below": [(0.3, 15)],
+    "location_match": 15,
+    "location_miss": 5,
+    "location_listed_remote": 10,
+    "location_distance": [(150, 12), (400, 8)],
+    "industry_match": 10,
+    "industry_miss": 5,
+    "industry_rule": "preferred",
+    "industry_field": "domain",
+}
+
+# app.py skill score: share of required skills the candidate has, out of 100
+SKILLS_ONLY_WEIGHTS = {
+    **BASE_WEIGHTS,
+    "skill": 100,
+}
+
+# allocation_system.py match score: skills, location, field, experience (40/20/25/15)
+FIELD_EXPERIENCE_WEIGHTS = {
+    **BASE_WEIGHTS,
+    "skill": 40,
+    "location_match": 20,
+    "location_rule": "exact",
+    "remote_rule": "any",
+    "industry_match": 25,
+    "industry_rule": "exact",
+    "experience_table": {
+        ("Beginner", "Beginner"): 15,
+        ("Intermediate", "Intermediate"): 15,
+        ("Advanced", "Advanced"): 15,
+        ("Intermediate", "Beginner"): 12,
+        ("Advanced", "Intermediate"): 12,
+        ("Advanced", "Beginner"): 8,
+    },
+    "experience_default": 5,
+}
+
+# all_india_hub smart allocation page: as above with a flat experience score
+SMART_ALLOCATION_WEIGHTS = {
+    **FIELD_EXPERIENCE_WEIGHTS,
+    "experience_table": {},
+    "experience_default": 15,
+}
+
+# Selectable "skill_rule" values with their UI labels
+SKILL_RULES = {
+    "overlap": "Share of required skills",
+    "tfidf": "TF-IDF (rare skills weigh more)",
+}
+
+WEIGHT_PROFILES = {
+    "all_india": ALL_INDIA_WEIGHTS,
+    "advanced": ADVANCED_WEIGHTS,
+    "quick_match": QUICK_MATCH_WEIGHTS,
+    "domain_match": DOMAIN_MATCH_WEIGHTS,
+    "skills_only": SKILLS_ONLY_WEIGHTS,
+    "field_experience": FIELD_EXPERIENCE_WEIGHTS,
+    "smart_allocation": SMART_ALLOCATION_WEIGHTS,
+}
+
+DEFAULT_BLOCK_SIZE = 512
+
+_WORD_BITS = 64
+_MASK_CACHE_LIMIT = 100000
+_BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def resolve_weights(weights: Union[str, Dict]) -> Dict:
+    """Weight table for a profile name, or a partial table completed from ``BASE_WEIGHTS``"""
+    if isinstance(weights, str):
+        if weights not in WEIGHT_PROFILES:
+            raise ValueError(f"Unknown weight profile {weights!r}; expected one of {sorted(WEIGHT_PROFILES)}")
+        return WEIGHT_PROFILES[weights]
+    return {**BASE_WEIGHTS, **weights}
+
+
+def student_profile(student: Dict) -> Dict:
+    """Allocation-page student record in the profile shape the kernel scores"""
+    return {
+        "skills": student["skills"],
+        "preferences": {"location": student["location_preference"]},
+        "industry": student["field_interest"],
+        "experience_level": student["experience_level"],
+    }
+
+
+def internship_posting(internship: Dict, field: str = None) -> Dict:
+    """Allocation-page internship record in the posting shape the kernel scores.
+
+    ``field`` overrides the record's own ``field`` key (pages that group
+    internships by field pass the group name).
+    """
+    return {
+        "requirements": {"skills": internship["skills_required"], "minCgpa": 0.0},
+        "location": internship["location"],
+        "isRemote": internship["remote_option"],
+        "industry": internship.get("field", "") if field is None else field,
+        "salary": 0,
+        "difficulty": internship["difficulty"],
+    }
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Element-wise population count of an unsigned integer array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    # NumPy < 2.0: count bits byte by byte through a lookup table
+    as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(words.shape + (words.itemsize,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def bit_count(mask: int) -> int:
+    """Number of set bits in a Python integer mask"""
+    return bin(mask).count("1")
+
+
+def overlap_counts(left_bits: np.ndarray, right_bits: np.ndarray) -> np.ndarray:
+    """Pairwise ``popcount(left & right)`` for packed bitsets, shape (len(left), len(right))"""
+    counts = np.zeros((left_bits.shape[0], right_bits.shape[0]), dtype=np.uint16)
+    # Arrays packed before the vocabulary grew are narrower; missing words are zero
+    for word in range(min(left_bits.shape[1], right_bits.shape[1])):
+        counts += popcount(left_bits[:, word, None] & right_bits[None, :, word])
+    return counts
+
+
+class SkillIndex(Vocabulary):
+    """Interned skill vocabulary mapping each normalized skill to an integer id.
+
+    Skill lists are encoded either as Python ``int`` bitmasks (``mask``) for the
+    per-pair scorers or as packed ``uint64`` rows (``pack``) for batch scoring.
+    Unseen skills are interned on first use, so masks stay valid as the
+    vocabulary grows. Aliases (``skill_synonyms``, e.g. "NodeJS" for
+    "Node.js") normalize to their canonical skill and share its id; pass
+    ``aliases={}`` for exact matching only.
+    """
+
+    def __init__(self, skills: Iterable[str] = (), aliases: Dict[str, str] = None):
+        self.aliases = default_skill_aliases() if aliases is None else aliases
+        super().__init__(skills)
+        self._mask_cache: Dict[Tuple[str, ...], int] = {}
+
+    @classmethod
+    def from_skill_lists(cls, *skill_lists: Iterable[str], aliases: Dict[str, str] = None) -> "SkillIndex":
+        """Build an index from any number of skill lists (catalog categories, postings, profiles)"""
+        return cls((skill for skills in skill_lists for skill in skills), aliases)
+
+    def normalize(self, skill: str) -> str:
+        """Lowercased skill, replaced by its canonical name when it is a known alias"""
+        key = skill.lower()
+        return self.aliases.get(key, key)
+
+    @property
+    def words(self) -> int:
+        """Number of 64-bit words needed to pack one skill set"""
+        return max(1, -(-len(self._names) // _WORD_BITS))
+
+    def mask(self, skills: Iterable[str]) -> int:
+        """Skill list as a Python int bitmask, memoized per distinct list"""
+        key = tuple(skills)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = 0
+            for skill in key:
+                mask |= 1 << self.intern(skill)
+            if len(self._mask_cache) >= _MASK_CACHE_LIMIT:
+                self._mask_cache.clear()
+            self._mask_cache[key] = mask
+        return mask
+
+    def names(self, mask: int) -> List[str]:
+        """Normalized skill names for the bits set in a mask"""
+        names = []
+        while mask:
+            lowest = mask & -mask
+            names.append(self._names[lowest.bit_length() - 1])
+            mask ^= lowest
+        return names
+
+    def pack(self, skill_lists: List[Iterable[str]]) -> np.ndarray:
+        """Encode skill lists as packed bitsets, shape (len(skill_lists), words)"""
+        return self.pack_ids([self.ids(skills) for skills in skill_lists])
+
+    def pack_ids(self, id_lists: Sequence[Sequence[int]]) -> np.ndarray:
+        """Encode lists of already-interned skill ids as packed bitsets"""
+        rows = np.repeat(np.arange(len(id_lists)), [len(ids) for ids in id_lists])
+        ids = np.fromiter((skill_id for ids in id_lists for skill_id in ids), dtype=np.uint64, count=len(rows))
+
+        bits = np.zeros((len(id_lists), self.words), dtype=np.uint64)
+        np.bitwise_or.at(bits, (rows, (ids // _WORD_BITS).astype(np.intp)),
+                         np.left_shift(np.uint64(1), ids % np.uint64(_WORD_BITS)))
+        return bits
+
+
+def _as_records(items: Sequence, record_type, skill_index: SkillIndex) -> List:
+    """``items`` as records interned against ``skill_index``; dicts and foreign records are converted"""
+    vocabulary = None
+    records = []
+    for item in items:
+        if type(item) is record_type and item.vocabulary.skills is skill_index:
+            records.append(item)
+        else:
+            if vocabulary is None:
+                vocabulary = RecordVocabulary(skill_index)
+            records.append(record_type.from_dict(item, vocabulary))
+    return records
+
+
+def _codes(records: List, id_attribute: str, key_attribute: str, vocabulary_attribute: str):
+    """Integer codes and their values for a categorical record field.
+
+    Records sharing one vocabulary reuse their interned ids; mixed records are
+    factorized on the normalized key instead.
+    """
+    vocabularies = {id(record.vocabulary): record.vocabulary for record in records}
+    if len(vocabularies) == 1:
+        vocabulary = getattr(next(iter(vocabularies.values())), vocabulary_attribute)
+        codes = np.fromiter((getattr(record, id_attribute) for record in records), dtype=np.int64, count=len(records))
+        return codes, vocabulary.all_names()
+    return _factorize([getattr(record, key_attribute) for record in records])
+
+
+def _encode_internships(internships: Sequence, skill_index: SkillIndex, weights: Dict = ALL_INDIA_WEIGHTS) -> Dict:
+    """Internship-side arrays, computed once per scoring run"""
+    records = _as_records(internships, InternshipRecord, skill_index)
+    if weights["industry_field"] == "domain":
+        industry_codes, industries = _factorize([record.domain_key for record in records])
+    else:
+        industry_codes, industries = _codes(records, "industry_id", "industry_key", "industries")
+    location_codes, locations = _codes(records, "location_id", "location_key", "locations")
+    difficulty_codes, difficulties = _factorize([record.difficulty for record in records])
+    required_bits = skill_index.pack_ids([record.skill_ids for record in records])
+    return {
+        "count": len(records),
+        "required_bits": required_bits,
+        "required_counts": np.fromiter((len(record.skill_ids) for record in records), dtype=np.float64, count=len(records)),
+        "min_cgpa": np.fromiter((record.min_cgpa for record in records), dtype=np.float64, count=len(records)),
+        "location_codes": location_codes,
+        "locations": locations,
+        "listed_remote": np.array(["remote" in location for location in locations], dtype=bool),
+        "location_places": default_gazetteer().resolve_all(locations),
+        "is_remote": np.fromiter((record.is_remote for record in records), dtype=bool, count=len(records)),
+        "industry_codes": industry_codes,
+        "industries": industries,
+        "difficulty_codes": difficulty_codes,
+        "difficulties": difficulties,
+        "salary": np.fromiter((record.stipend for record in records), dtype=np.float64, count=len(records)),
+    }
+
+
+def _take_internships(encoded: Dict, rows: np.ndarray) -> Dict:
+    """Subset of pre-encoded internships, in the order given by ``rows``"""
+    return {
+        "count": len(rows),
+        "required_bits": encoded["required_bits"][rows],
+        "required_counts": encoded["required_counts"][rows],
+        "min_cgpa": encoded["min_cgpa"][rows],
+        "location_codes": encoded["location_codes"][rows],
+        "locations": encoded["locations"],
+        "listed_remote": encoded["listed_remote"],
+        "location_places": encoded["location_places"],
+        "is_remote": encoded["is_remote"][rows],
+        "industry_codes": encoded["industry_codes"][rows],
+        "industries": encoded["industries"],
+        "difficulty_codes": encoded["difficulty_codes"][rows],
+        "difficulties": encoded["difficulties"],
+        "salary": encoded["salary"][rows],
+        # IDF stays a whole-catalog statistic when scoring a subset
+        "skill_idf": _skill_idf(encoded),
+    }
+
+
+def _skill_idf(encoded: Dict) -> np.ndarray:
+    """Smoothed IDF of every skill id over the encoded catalog, computed once and cached on it"""
+    idf = encoded.get("skill_idf")
+    if idf is None:
+        present = _unpack_bits(encoded["required_bits"])
+        df = present.sum(axis=0, dtype=np.int64)
+        idf = encoded["skill_idf"] = np.log((1 + encoded["count"]) / (1 + df)) + 1
+    return idf
+
+
+def _unpack_bits(bits: np.ndarray) -> np.ndarray:
+    """Packed uint64 skill bitsets as a boolean (rows × skill ids) matrix"""
+    as_bytes = np.ascontiguousarray(bits, dtype="<u8").view(np.uint8).reshape(len(bits), bits.shape[1] * 8)
+    return np.unpackbits(as_bytes, axis=1, bitorder="little").astype(bool)
+
+
+def _skill_postings(encoded: Dict) -> Dict:
+    """CSR skill → posting lists and per-posting TF-IDF norms, computed once and cached on ``encoded``"""
+    postings = encoded.get("skill_postings")
+    if postings is None:
+        idf = _skill_idf(encoded)
+        posting_ids, skill_ids = np.nonzero(_unpack_bits(encoded["required_bits"]))
+        weight = idf ** 2
+        # Row-major nonzero order adds each posting's terms in ascending skill id, like the dot products
+        norms = np.bincount(posting_ids, weights=weight[skill_ids], minlength=encoded["count"])
+        order = np.argsort(skill_ids, kind="stable")
+        postings = encoded["skill_postings"] = {
+            "postings": posting_ids[order],
+            "offsets": np.searchsorted(skill_ids[order], np.arange(len(idf) + 1)),
+            "weight": weight,
+            "norms": norms,
+        }
+    return postings
+
+
+def _tfidf_skill_ratio(profiles: List[ProfileRecord], encoded: Dict) -> np.ndarray:
+    """IDF-weighted share of each posting's required skills held by each profile, in [0, 1].
+
+    Profiles and postings are TF-IDF vectors over the skill ids (binary term
+    frequency); the ratio is ``u·r / r·r``, i.e. the sum of idf² over shared
+    skills divided by the sum over required skills. The (profiles × postings)
+    dot products are one sparse product: every profile skill is expanded over
+    that skill's posting list and accumulated with ``np.bincount``.
+    """
+    csr = _skill_postings(encoded)
+    offsets = csr["offsets"]
+    known = len(offsets) - 1
+    rows = np.repeat(np.arange(len(profiles)), [len(profile.skill_ids) for profile in profiles])
+    skills = np.fromiter((skill_id for profile in profiles for skill_id in profile.skill_ids),
+                         dtype=np.int64, count=len(rows))
+    rows, skills = rows[skills < known], skills[skills < known]
+
+    starts, counts = offsets[skills], offsets[skills + 1] - offsets[skills]
+    first = np.cumsum(counts) - counts
+    expanded = np.arange(counts.sum()) - np.repeat(first - starts, counts)
+    count = encoded["count"]
+    dots = np.bincount(np.repeat(rows, counts) * count + csr["postings"][expanded],
+                       weights=np.repeat(csr["weight"][skills], counts),
+                       minlength=len(profiles) * count).reshape(len(profiles), count)
+
+    norms = csr["norms"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(norms > 0, dots / norms, 0.0)
+
+
+def _encode_preferences(profiles: List[ProfileRecord], attribute: str, targets: List[str],
+                        exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Profile × preferred-value membership and preferred-value × target hits.
+
+    ``attribute`` names a tuple of normalized preferences on the profile record.
+    A preference hits a target when it is a substring of it, or equal to it
+    when ``exact``.
+    """
+    vocabulary = {}
+    preferred = [
+        {vocabulary.setdefault(value, len(vocabulary)) for value in getattr(profile, attribute)}
+        for profile in profiles
+    ]
+
+    membership = np.zeros((len(profiles), len(vocabulary)), dtype=np.float32)
+    for row, value_ids in enumerate(preferred):
+        membership[row, list(value_ids)] = 1
+
+    # Comparisons run once per distinct preferred value and target, not once per pair
+    hits = np.zeros((len(vocabulary), len(targets)), dtype=np.float32)
+    for value, value_id in vocabulary.items():
+        if exact:
+            hits[value_id] = [value == target for target in targets]
+        else:
+            hits[value_id] = [value in target for target in targets]
+
+    return membership, hits
+
+
+def _encode_distances(profiles: List[ProfileRecord], encoded: Dict, weights: Dict) -> np.ndarray:
+    """Distance-tier location score, indexed by (profile, internship).
+
+    Each profile gets the tier of its nearest preferred location; distances are
+    looked up per distinct preferred value and posting location, then spread
+    to postings by location code.
+    """
+    vocabulary = {}
+    preferred = [
+        [vocabulary.setdefault(value, len(vocabulary)) for value in profile.preferred_locations]
+        for profile in profiles
+    ]
+    gazetteer = default_gazetteer()
+    distances = gazetteer.distances(gazetteer.resolve_all(vocabulary), encoded["location_places"])
+
+    # Widest tier first so the closest matching tier wins
+    tier_scores = np.full(distances.shape, weights["location_miss"], dtype=np.float64)
+    for max_km, tier_score in sorted(weights["location_distance"], reverse=True):
+        tier_scores = np.where(distances <= max_km, tier_score, tier_scores)
+
+    best = np.full((len(profiles), len(encoded["locations"])), weights["location_miss"], dtype=np.float64)
+    for row, value_ids in enumerate(preferred):
+        if value_ids:
+            best[row] = np.maximum(best[row], tier_scores[value_ids].max(axis=0))
+    return best[:, encoded["location_codes"]]
+
+
+def _encode_industries(profiles: List[ProfileRecord], encoded: Dict, rule: str = "containment") -> np.ndarray:
+    """Boolean table of industry matches, indexed by (profile, internship)"""
+    internship_industries = encoded["industries"]
+    if rule == "preferred":
+        membership, hits = _encode_preferences(profiles, "preferred_domains", internship_industries)
+        return ((membership @ hits) > 0)[:, encoded["industry_codes"]]
+
+    user_codes, user_industries = _factorize([profile.industry_key for profile in profiles])
+    if rule == "exact":
+        table = np.array([[user == other for other in internship_industries] for user in user_industries], dtype=bool)
+    else:
+        table = np.array([
+            [user in other or other in user for other in internship_industries]
+            for user in user_industries
+        ], dtype=bool)
+    table = table.reshape(len(user_industries), len(internship_industries))
+
+    return table[user_codes[:, None], encoded["industry_codes"][None, :]]
+
+
+def _encode_experience(profiles: List[ProfileRecord], encoded: Dict, weights: Dict) -> np.ndarray:
+    """Experience score looked up per (experience level, difficulty), indexed by (profile, internship)"""
+    user_codes, levels = _factorize([profile.experience_level for profile in profiles])
+    experience_table = weights["experience_table"]
+    table = np.array([
+        [experience_table.get((level, difficulty), weights["experience_default"]) for difficulty in encoded["difficulties"]]
+        for level in levels
+    ], dtype=np.float64).reshape(len(levels), len(encoded["difficulties"]))
+
+    return table[user_codes[:, None], encoded["difficulty_codes"][None, :]]
+
+
+def _factorize(values: List[str]) -> Tuple[np.ndarray, List[str]]:
+    """Map each value to an integer code, returning codes and the unique values"""
+    uniques = {}
+    codes = np.array([uniques.setdefault(value, len(uniques)) for value in values], dtype=np.int64)
+    return codes, list(uniques)
+
+
+def non_skill_score_bound(weights: Union[str, Dict] = ALL_INDIA_WEIGHTS) -> float:
+    """Best total a posting can reach without sharing a single skill with the profile"""
+    weights = resolve_weights(weights)
+    cgpa_scores = [score for _, score in weights["cgpa_meets"] + weights["cgpa_below"]] + [weights["cgpa_floor"]]
+    location_scores = [weights["location_match"], weights["location_miss"], weights["location_listed_remote"] or 0]
+    location_scores += [score for _, score in weights["location_distance"]]
+    experience_scores = list(weights["experience_table"].values()) + [weights["experience_default"]]
+    return (max(cgpa_scores)
+            + max(location_scores)
+            + max(weights["industry_match"], weights["industry_miss"])
+            + max(weights["salary_match"], weights["salary_miss"])
+            + max(experience_scores))
+
+
+def _default_skill_index(user_profiles: List[Dict], internships: List[Dict]) -> SkillIndex:
+    return SkillIndex.from_skill_lists(
+        *(internship["requirements"]["skills"] for internship in internships),
+        *(profile.get("skills", []) for profile in user_profiles)
+    )
+
+
+def _skill_component(profiles: List[ProfileRecord], encoded: Dict, skill_index: SkillIndex,
+                     weights: Dict) -> np.ndarray:
+    """Skills matching: overlap share (or TF-IDF share) of each posting's required skills"""
+    if weights["skill_rule"] == "tfidf":
+        skill_ratio = _tfidf_skill_ratio(profiles, encoded)
+    else:
+        profile_bits = skill_index.pack_ids([profile.skill_ids for profile in profiles])
+        overlap = overlap_counts(profile_bits, encoded["required_bits"]).astype(np.float64)
+        required_counts = encoded["required_counts"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skill_ratio = np.where(required_counts > 0, overlap / required_counts, 0.0)
+    return skill_ratio * weights["skill"]
+
+
+def _cgpa_component(profiles: List[ProfileRecord], encoded: Dict, skill_index: SkillIndex,
+                    weights: Dict) -> np.ndarray:
+    """CGPA matching - tighter "below" tiers and higher "meets" tiers win"""
+    user_cgpa = np.fromiter((profile.cgpa for profile in profiles), dtype=np.float64, count=len(profiles))[:, None]
+    min_cgpa = encoded["min_cgpa"][None, :]
+    meets = user_cgpa >= min_cgpa
+    cgpa_score = np.full((len(profiles), encoded["count"]), weights["cgpa_floor"])
+    for max_gap, tier_score in sorted(weights["cgpa_below"], reverse=True):
+        cgpa_score = np.where(~meets & (min_cgpa - user_cgpa <= max_gap), tier_score, cgpa_score)
+    for min_excess, tier_score in sorted(weights["cgpa_meets"]):
+        cgpa_score = np.where(meets & (user_cgpa - min_cgpa >= min_excess), tier_score, cgpa_score)
+    return cgpa_score
+
+
+def _location_component(profiles: List[ProfileRecord], encoded: Dict, skill_index: SkillIndex,
+                        weights: Dict) -> np.ndarray:
+    """Location matching (skipped entirely when the profile does not weight it)"""
+    listed_remote_score = weights["location_listed_remote"]
+    if (weights["location_match"] == weights["location_miss"] and listed_remote_score is None
+            and not weights["location_distance"]):
+        return np.full((len(profiles), encoded["count"]), weights["location_miss"])
+
+    # Hits are computed per distinct location, then spread to postings by location code
+    membership, hits = _encode_preferences(profiles, "preferred_locations", encoded["locations"],
+                                           exact=weights["location_rule"] == "exact")
+    location_codes = encoded["location_codes"]
+    location_hit = ((membership @ hits) > 0)[:, location_codes]
+    if weights["remote_rule"] == "any":
+        location_hit |= encoded["is_remote"][None, :]
+    else:
+        wants_remote = np.fromiter((profile.wants_remote for profile in profiles), dtype=bool, count=len(profiles))
+        location_hit |= wants_remote[:, None] & encoded["is_remote"][None, :]
+    location_score = np.where(location_hit, weights["location_match"], weights["location_miss"])
+    missed = ~location_hit
+    if listed_remote_score is not None:
+        listed_remote = missed & encoded["listed_remote"][location_codes][None, :]
+        location_score = np.where(listed_remote, listed_remote_score, location_score)
+        missed &= ~listed_remote
+    if weights["location_distance"]:
+        location_score = np.where(missed, _encode_distances(profiles, encoded, weights), location_score)
+    return location_score
+
+
+def _industry_component(profiles: List[ProfileRecord], encoded: Dict, skill_index: SkillIndex,
+                        weights: Dict) -> np.ndarray:
+    """Industry matching"""
+    if weights["industry_match"] == weights["industry_miss"]:
+        return np.full((len(profiles), encoded["count"]), weights["industry_miss"])
+    return np.where(_encode_industries(profiles, encoded, weights["industry_rule"]),
+                    weights["industry_match"], weights["industry_miss"])
+
+
+def _salary_component(profiles: List[ProfileRecord], encoded: Dict, skill_index: SkillIndex,
+                      weights: Dict) -> np.ndarray:
+    """Salary matching"""
+    if weights["salary_match"] == weights["salary_miss"]:
+        return np.full((len(profiles), encoded["count"]), weights["salary_miss"])
+    return _salary_score(profiles, encoded, weights)
+
+
+def _experience_component(profiles: List[ProfileRecord], encoded: Dict, skill_index: SkillIndex,
+                          weights: Dict) -> np.ndarray:
+    """Experience matching"""
+    if weights["experience_table"]:
+        return _encode_experience(profiles, encoded, weights)
+    return np.full((len(profiles), encoded["count"]), weights["experience_default"])
+
+
+# Score components in summation order, each with the profile inputs it depends on
+# (ComponentCache keys its columns on exactly these)
+COMPONENTS = {
+    "skill_match": (_skill_component, lambda profile, weights: profile.skill_ids),
+    "cgpa_match": (_cgpa_component, lambda profile, weights: profile.cgpa),
+    "location_match": (_location_component, lambda profile, weights: profile.preferred_locations),
+    "industry_match": (_industry_component, lambda profile, weights: (
+        profile.preferred_domains if weights["industry_rule"] == "preferred" else profile.industry_key)),
+    "salary_match": (_salary_component, lambda profile, weights: profile.salary_range),
+    "experience_match": (_experience_component, lambda profile, weights: profile.experience_level),
+}
+
+
+def _total(components: Dict[str, np.ndarray]) -> np.ndarray:
+    """Capped total of the component scores"""
+    # Same summation order as the scalar scorers so floats agree bit for bit
+    return np.minimum(components["skill_match"] + components["cgpa_match"] + components["location_match"]
+                      + components["industry_match"] + components["salary_match"]
+                      + components["experience_match"], 100)
+
+
+def _score_block(user_profiles: List[Dict], encoded: Dict, skill_index: SkillIndex,
+                 weights: Dict = ALL_INDIA_WEIGHTS) -> Dict[str, np.ndarray]:
+    """Score a block of profiles against pre-encoded internships"""
+    profiles = _as_records(user_profiles, ProfileRecord, skill_index)
+    components = {name: component(profiles, encoded, skill_index, weights)
+                  for name, (component, _) in COMPONENTS.items()}
+    return {"score": _total(components), **components}
+
+
+def _salary_score(profiles: List[ProfileRecord], encoded: Dict, weights: Dict) -> np.ndarray:
+    """Salary component: whether each posting pays within the profile's preferred range"""
+    salary_ranges = np.array([profile.salary_range for profile in profiles],
+                             dtype=np.float64).reshape(len(profiles), 2)
+    salaries = encoded["salary"][None, :]
+    return np.where(
+        (salary_ranges[:, :1] <= salaries) & (salaries <= salary_ranges[:, 1:]),
+        weights["salary_match"], weights["salary_miss"]
+    )
+
+
+def score_components(user_profiles: List[Dict], internships: List[Dict], skill_index: SkillIndex = None,
+                     weights: Union[str, Dict] = ALL_INDIA_WEIGHTS) -> Dict[str, np.ndarray]:
+    """Compute every score component as a dense (profiles × internships) array.
+
+    Keys match the breakdown returned by ``calculate_match_score``:
+    ``skill_match``, ``cgpa_match``, ``location_match``, ``industry_match``,
+    ``salary_match``, ``experience_match`` plus the capped ``score``.
+    ``weights`` is a weight table or the name of one in ``WEIGHT_PROFILES``.
+    """
+    weights = resolve_weights(weights)
+    if skill_index is None:
+        skill_index = _default_skill_index(user_profiles, internships)
+    return _score_block(user_profiles, _encode_internships(internships, skill_index, weights), skill_index, weights)
+
+
+def score_matrix(user_profiles: List[Dict], internships: List[Dict], skill_index: SkillIndex = None,
+                 weights: Union[str, Dict] = ALL_INDIA_WEIGHTS, block_size: int = DEFAULT_BLOCK_SIZE,
+                 dtype=np.float64) -> np.ndarray:
+    """Dense (profiles × internships) match score matrix.
+
+    Internships are encoded once; profiles are scored in row blocks so
+    intermediate component arrays stay bounded at ``block_size × len(internships)``.
+    Pass ``dtype=np.float32`` to halve the output size for national-round matrices.
+    """
+    weights = resolve_weights(weights)
+    if skill_index is None:
+        skill_index = _default_skill_index(user_profiles, internships)
+    encoded = _encode_internships(internships, skill_index, weights)
+
+    scores = np.empty((len(user_profiles), len(internships)), dtype=dtype)
+    for start in range(0, len(user_profiles), block_size):
+        block = user_profiles[start:start + block_size]
+        scores[start:start + len(block)] = _score_block(block, encoded, skill_index, weights)["score"]
+    return scores
+
+
+class ScoreGraph:
+    """Sparse (profiles × internships) match scores in CSR form.
+
+    Profile ``r``'s edges are ``cols[offsets[r]:offsets[r + 1]]`` (ascending)
+    with scores ``scores[offsets[r]:offsets[r + 1]]``; pairs that were pruned
+    have no edge.
+    """
+
+    def __init__(self, offsets: np.ndarray, cols: np.ndarray, scores: np.ndarray, shape: Tuple[int, int]):
+        self.offsets = offsets
+        self.cols = cols
+        self.scores = scores
+        self.shape = shape
+
+    def __len__(self) -> int:
+        return len(self.cols)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the edge arrays"""
+        return self.offsets.nbytes + self.cols.nbytes + self.scores.nbytes
+
+    def row_ids(self) -> np.ndarray:
+        """Profile row of every edge"""
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.offsets))
+
+    def pair_scores(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Scores of (row, col) pairs that are edges of the graph"""
+        positions = [self.offsets[row] + np.searchsorted(self.cols[self.offsets[row]:self.offsets[row + 1]], col)
+                     for row, col in zip(rows, cols)]
+        return self.scores[np.array(positions, dtype=np.int64)]
+
+
+def score_edges(user_profiles: List[Dict], internships: List[Dict], skill_index: SkillIndex = None,
+                weights: Union[str, Dict] = ALL_INDIA_WEIGHTS, min_score: float = 0.0, top_k: int = None,
+                internship_top_k: int = None, block_size: int = DEFAULT_BLOCK_SIZE, dtype=np.float64,
+                progress: Callable[[int, int], None] = None) -> ScoreGraph:
+    """Match scores of the pairs scoring at least ``min_score`` as a ``ScoreGraph``.
+
+    Profiles are scored in row blocks. ``top_k`` keeps only each profile's K
+    best internships and ``internship_top_k`` adds each internship's K best
+    profiles, found with ``argpartition`` block by block, so peak memory is
+    one ``block_size × len(internships)`` block plus O((n + m)·K) kept
+    edges. Pass ``dtype=np.float32`` to halve the stored scores.
+    ``progress(pairs scored, pairs)`` is called after every block.
+    """
+    weights = resolve_weights(weights)
+    if skill_index is None:
+        skill_index = _default_skill_index(user_profiles, internships)
+    encoded = _encode_internships(internships, skill_index, weights)
+    internship_count = len(internships)
+
+    # Running top internship_top_k profiles per internship: scores (-inf for none) and rows
+    if internship_top_k:
+        best_scores = np.full((0, internship_count), -np.inf)
+        best_rows = np.zeros((0, internship_count), dtype=np.int64)
+
+    counts, rows, cols, scores = [], [], [], []
+    for start in range(0, len(user_profiles), block_size):
+        block = _score_block(user_profiles[start:start + block_size], encoded, skill_index, weights)["score"]
+        keep = block >= min_score
+        if internship_top_k:
+            candidates = np.where(keep, block, -np.inf)
+            pool_scores = np.concatenate([best_scores, candidates])
+            pool_rows = np.concatenate([best_rows, np.broadcast_to(
+                np.arange(start, start + len(block))[:, None], block.shape)])
+            if len(pool_scores) > internship_top_k:
+                best = np.argpartition(-pool_scores, internship_top_k - 1, axis=0)[:internship_top_k]
+                pool_scores = np.take_along_axis(pool_scores, best, axis=0)
+                pool_rows = np.take_along_axis(pool_rows, best, axis=0)
+            best_scores, best_rows = pool_scores, pool_rows
+        if top_k is not None and top_k < block.shape[1]:
+            best = np.argpartition(-block, top_k - 1, axis=1)[:, :top_k]
+            in_top = np.zeros_like(keep)
+            np.put_along_axis(in_top, best, True, axis=1)
+            keep &= in_top
+        block_rows, block_cols = np.nonzero(keep)
+        counts.append(np.count_nonzero(keep, axis=1))
+        if internship_top_k:
+            rows.append(block_rows + start)
+        cols.append(block_cols.astype(np.int32))
+        scores.append(block[block_rows, block_cols].astype(dtype))
+        if progress is not None:
+            progress((start + len(block)) * internship_count, len(user_profiles) * internship_count)
+
+    shape = (len(user_profiles), internship_count)
+    if not counts:
+        return ScoreGraph(np.zeros(len(user_profiles) + 1, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                          np.zeros(0, dtype=dtype), shape)
+    counts, cols, scores = np.concatenate(counts), np.concatenate(cols), np.concatenate(scores)
+    if internship_top_k:
+        # Union with the internships' picks; unique (row, col) keys also restore CSR order
+        kept = np.isfinite(best_scores)
+        rows = np.concatenate(rows + [best_rows[kept]])
+        cols = np.concatenate([cols, np.nonzero(kept)[1].astype(np.int32)])
+        scores = np.concatenate([scores, best_scores[kept].astype(dtype)])
+        _, unique = np.unique(rows * internship_count + cols, return_index=True)
+        rows, cols, scores = rows[unique], cols[unique], scores[unique]
+        counts = np.bincount(rows, minlength=len(user_profiles))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return ScoreGraph(offsets, cols, scores, shape)
+
+
+def score_pairs(user_profiles: List[Dict], internships: List[Dict], rows: np.ndarray, cols: np.ndarray,
+                skill_index: SkillIndex = None, weights: Union[str, Dict] = ALL_INDIA_WEIGHTS,
+                block_size: int = DEFAULT_BLOCK_SIZE) -> Dict[str, np.ndarray]:
+    """Every score component of the (profile row, internship column) pairs only.
+
+    Pairs are scored in blocks of ``block_size`` as a small block × block
+    matrix whose diagonal is kept, so a sparse allocation never needs the
+    dense matrix.
+    """
+    weights = resolve_weights(weights)
+    if skill_index is None:
+        skill_index = _default_skill_index(user_profiles, internships)
+    encoded = _encode_internships(internships, skill_index, weights)
+
+    blocks = []
+    for start in range(0, len(rows), block_size):
+        block_rows, block_cols = rows[start:start + block_size], cols[start:start + block_size]
+        block = _score_block([user_profiles[row] for row in block_rows], _take_internships(encoded, block_cols),
+                             skill_index, weights)
+        blocks.append({name: np.diagonal(values) for name, values in block.items()})
+    if not blocks:
+        return {name: np.zeros(0) for name in ("score", *COMPONENTS)}
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def select_top_k(scores: np.ndarray, k: int, rows: np.ndarray = None) -> np.ndarray:
+    """Positions of the K largest scores, best first, in O(n + K log K).
+
+    Uses ``np.argpartition`` instead of a full sort. Ties are broken by the
+    smaller ``rows`` id (position by default), so the result equals a stable
+    descending sort followed by ``[:k]``.
+    """
+    if rows is None:
+        rows = np.arange(len(scores))
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        kth = scores[np.argpartition(scores, len(scores) - k)[len(scores) - k]]
+        above = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)
+        tied = tied[np.argsort(rows[tied], kind="stable")][:k - len(above)]
+        top = np.concatenate([above, tied])
+    else:
+        top = np.arange(len(scores))
+    return top[np.lexsort((rows[top], -scores[top]))]
+
+
+# Categorical columns every InternshipTable carries; "state" is derived from "City, State" locations
+TABLE_CATEGORICALS = ("industry", "domain", "location", "state", "company", "title", "difficulty")
+
+
+def _location_state(location: str) -> str:
+    """State part of a "City, State" location, or "" when there is none"""
+    return location.rsplit(",", 1)[1].strip() if "," in location else ""
+
+
+class InternshipTable:
+    """Columnar internship catalog backed by one NumPy structured array.
+
+    Each posting is a fixed-size row of parallel columns: ``salary`` (int32,
+    whole rupees), ``min_cgpa`` (uint16 hundredths, so 7.3 stays exactly 7.3
+    when scored), one uint16 code per categorical column, ``remote`` (bool)
+    and the packed ``skills`` bitset: a few dozen bytes per posting instead of
+    a nested dict. Filters, sorts and scores are array operations over the
+    whole catalog; ``records`` keeps the postings for display.
+    """
+
+    def __init__(self, internships: Sequence, skill_index: SkillIndex,
+                 categoricals: Sequence[str] = TABLE_CATEGORICALS):
+        self.skill_index = skill_index
+        self.records = _as_records(internships, InternshipRecord, skill_index)
+        count = len(self.records)
+
+        # Distinct values per categorical column (original spelling), indexed by code
+        self.categories: Dict[str, List[str]] = {}
+        codes = {}
+        for name in categoricals:
+            if name == "state":
+                values = [_location_state(record.location) for record in self.records]
+            else:
+                values = [str(record.get(name, "")) for record in self.records]
+            codes[name], self.categories[name] = _factorize(values)
+
+        bits = skill_index.pack_ids([record.skill_ids for record in self.records])
+        dtype = [("salary", np.int32), ("min_cgpa", np.uint16)]
+        dtype += [(name, np.uint16 if len(self.categories[name]) <= 1 << 16 else np.uint32) for name in categoricals]
+        dtype += [("remote", np.bool_), ("skills", np.uint64, (bits.shape[1],))]
+
+        self.columns = np.zeros(count, dtype=dtype)
+        self.columns["salary"] = np.fromiter((record.stipend for record in self.records), dtype=np.float64, count=count)
+        self.columns["min_cgpa"] = np.round(
+            np.fromiter((record.min_cgpa for record in self.records), dtype=np.float64, count=count) * 100)
+        for name in categoricals:
+            self.columns[name] = codes[name]
+        self.columns["remote"] = np.fromiter((record.is_remote for record in self.records), dtype=bool, count=count)
+        self.columns["skills"] = bits
+        self._encoded: Dict[str, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the column store in bytes"""
+        return self.columns.nbytes
+
+    def _matching_codes(self, column: str, values: Iterable[str], substring: bool = False) -> np.ndarray:
+        """Codes of a categorical column whose value equals (or contains) any of ``values``, case-insensitively"""
+        wanted = [value.lower() for value in values]
+        return np.array([
+            code for code, value in enumerate(self.categories[column])
+            if any((target in value.lower()) if substring else (target == value.lower()) for target in wanted)
+        ], dtype=np.int64)
+
+    def mask(self, rows: np.ndarray = None, industries: Iterable[str] = None, locations: Iterable[str] = None,
+             states: Iterable[str] = None, remote_only: bool = False, salary_range: Tuple[float, float] = None,
+             search: str = None, equals: Dict[str, Iterable[str]] = None) -> np.ndarray:
+        """Boolean mask over ``rows`` (every posting by default) for the given filters.
+
+        ``industries`` and ``states`` match exactly and ``locations`` by
+        substring (like location preferences), all case-insensitive;
+        ``salary_range`` bounds are inclusive; ``search`` is a plain substring
+        of the title or company; ``equals`` maps any categorical column to
+        the exact values it may take.
+        """
+        columns = self.columns if rows is None else self.columns[rows]
+        mask = np.ones(len(columns), dtype=bool)
+        if industries:
+            mask &= np.isin(columns["industry"], self._matching_codes("industry", industries))
+        if locations:
+            mask &= np.isin(columns["location"], self._matching_codes("location", locations, substring=True))
+        if states:
+            mask &= np.isin(columns["state"], self._matching_codes("state", states))
+        if remote_only:
+            mask &= columns["remote"]
+        if salary_range:
+            low, high = salary_range
+            mask &= (low <= columns["salary"]) & (columns["salary"] <= high)
+        if search:
+            found = np.zeros(len(columns), dtype=bool)
+            for column in ("title", "company"):
+                if column in self.categories:
+                    found |= np.isin(columns[column], self._matching_codes(column, [search], substring=True))
+            mask &= found
+        for column, values in (equals or {}).items():
+            mask &= np.isin(columns[column], self._matching_codes(column, values))
+        return mask
+
+    def filter(self, **filters) -> np.ndarray:
+        """Row ids of the postings passing ``mask(**filters)``, in catalog order"""
+        return np.flatnonzero(self.mask(**filters))
+
+    def sort(self, rows: np.ndarray = None, by: str = "salary", descending: bool = False) -> np.ndarray:
+        """Row ids ordered by a column; categorical columns sort by value, ties keep catalog order"""
+        if rows is None:
+            rows = np.arange(len(self))
+        keys = self.columns[by][rows].astype(np.int64)
+        if by in self.categories:
+            ranks = np.empty(len(self.categories[by]), dtype=np.int64)
+            ranks[np.argsort([value.lower() for value in self.categories[by]], kind="stable")] = np.arange(len(ranks))
+            keys = ranks[keys]
+        return rows[np.argsort(-keys if descending else keys, kind="stable")]
+
+    def encoded(self, weights: Union[str, Dict] = ALL_INDIA_WEIGHTS) -> Dict:
+        """Internship-side arrays for the scoring kernel, read straight from the columns"""
+        weights = resolve_weights(weights)
+        field = "domain" if weights["industry_field"] == "domain" else "industry"
+        encoded = self._encoded.get(field)
+        if encoded is None:
+            columns = self.columns
+            locations = [location.lower() for location in self.categories["location"]]
+            encoded = self._encoded[field] = {
+                "count": len(columns),
+                "required_bits": columns["skills"],
+                "required_counts": popcount(columns["skills"]).sum(axis=1).astype(np.float64),
+                "min_cgpa": columns["min_cgpa"] / 100.0,
+                "location_codes": columns["location"].astype(np.int64),
+                "locations": locations,
+                "listed_remote": np.array(["remote" in location for location in locations], dtype=bool),
+                "location_places": default_gazetteer().resolve_all(locations),
+                "is_remote": columns["remote"],
+                "industry_codes": columns[field].astype(np.int64),
+                "industries": [industry.lower() for industry in self.categories[field]],
+                "difficulty_codes": columns["difficulty"].astype(np.int64),
+                "difficulties": self.categories["difficulty"],
+                "salary": columns["salary"].astype(np.float64),
+            }
+        return encoded
+
+    def score(self, user_profiles: List[Dict], rows: np.ndarray = None, weights: Union[str, Dict] = ALL_INDIA_WEIGHTS,
+              block_size: int = DEFAULT_BLOCK_SIZE) -> np.ndarray:
+        """Dense (profiles × rows) match scores against the whole catalog or the given rows"""
+        weights = resolve_weights(weights)
+        encoded = self.encoded(weights)
+        if rows is not None:
+            encoded = _take_internships(encoded, rows)
+        scores = np.empty((len(user_profiles), encoded["count"]), dtype=np.float64)
+        for start in range(0, len(user_profiles), block_size):
+            block = user_profiles[start:start + block_size]
+            scores[start:start + len(block)] = _score_block(block, encoded, self.skill_index, weights)["score"]
+        return scores
+
+
+class ComponentCache:
+    """Per-component score columns over a profile's candidate postings, cached on the inputs each depends on.
+
+    Columns cover only the postings sharing a skill with the profile, so every
+    entry is keyed by the profile's skill ids plus the component's own inputs
+    (CGPA, preferred locations, ...). Re-scoring after one sidebar input
+    changes recomputes that column alone and re-adds the rest. The least
+    recently used entries are dropped once the cache holds over ``max_bytes``.
+    """
+
+    def __init__(self, encoded: Dict, skill_index: SkillIndex, weights: Dict, max_bytes: int = 64 * 2 ** 20):
+        self.encoded = encoded
+        self.skill_index = skill_index
+        self.weights = weights
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def _get(self, key: Tuple, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+
+        value = compute()
+        value.setflags(write=False)
+
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = value
+                self.nbytes += value.nbytes
+            self._entries.move_to_end(key)
+            # Always keep the newest entry, even when it alone exceeds the budget
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, dropped = self._entries.popitem(last=False)
+                self.nbytes -= dropped.nbytes
+        return value
+
+    def components(self, profile: ProfileRecord,
+                   candidates: Callable[[Tuple[int, ...]], np.ndarray]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Candidate rows and their component columns plus capped total for one normalized profile.
+
+        ``candidates(skill_ids)`` gives the postings sharing a skill with the
+        profile; it is only called when they are not cached.
+        """
+        rows = self._get(("candidates", profile.skill_ids), lambda: candidates(profile.skill_ids))
+        encoded = None
+
+        def compute(component):
+            nonlocal encoded
+            if encoded is None:
+                encoded = _take_internships(self.encoded, rows)
+            return component([profile], encoded, self.skill_index, self.weights)[0]
+
+        components = {
+            name: self._get((name, profile.skill_ids, key_of(profile, self.weights)),
+                            lambda component=component: compute(component))
+            for name, (component, key_of) in COMPONENTS.items()
+        }
+        return rows, {"score": _total(components), **components}
+
+
+class SkillPostingIndex:
+    """Inverted index from skill id to the postings that require that skill.
+
+    Built once per catalog version. ``top_k_matches`` scores only the postings
+    that share at least one skill with the profile, and falls back to the rest
+    of the catalog only when skill-less postings could still reach the top K
+    (their total is capped at ``non_skill_score_bound(weights)``). Candidate
+    columns come from a ``ComponentCache``, so changing one profile input
+    recomputes one column.
+    """
+
+    def __init__(self, internships: Union[InternshipTable, Sequence], skill_index: SkillIndex,
+                 weights: Union[str, Dict] = ALL_INDIA_WEIGHTS):
+        if isinstance(internships, InternshipTable) and internships.skill_index is skill_index:
+            self.table = internships
+        else:
+            self.table = InternshipTable(internships, skill_index)
+        self.internships = self.table.records
+        self.skill_index = skill_index
+        self.weights = resolve_weights(weights)
+        self.non_skill_bound = non_skill_score_bound(self.weights)
+        self.encoded = self.table.encoded(self.weights)
+
+        # CSR layout: postings for skill s are postings[offsets[s]:offsets[s + 1]]
+        id_lists = [record.skill_ids for record in self.internships]
+        skill_ids = np.fromiter((skill_id for ids in id_lists for skill_id in ids), dtype=np.int64)
+        posting_ids = np.repeat(np.arange(len(id_lists), dtype=np.int64), [len(ids) for ids in id_lists])
+        order = np.argsort(skill_ids, kind="stable")
+        self.postings = posting_ids[order]
+        self.offsets = np.searchsorted(skill_ids[order], np.arange(len(skill_index) + 1))
+        self.component_cache = ComponentCache(self.encoded, skill_index, self.weights)
+
+    def __len__(self) -> int:
+        return len(self.internships)
+
+    def candidates(self, skills: Iterable[str]) -> np.ndarray:
+        """Sorted ids of postings sharing at least one skill with ``skills``"""
+        return self._candidates(self.skill_index.ids(skills))
+
+    def _candidates(self, skill_ids: Iterable[int]) -> np.ndarray:
+        known = len(self.offsets) - 1
+        slices = [
+            self.postings[self.offsets[skill_id]:self.offsets[skill_id + 1]]
+            for skill_id in skill_ids if skill_id < known
+        ]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(slices))
+
+    def components(self, user_profile: Dict, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Score breakdown of one profile against the given posting ids"""
+        encoded = _take_internships(self.encoded, rows)
+        return {name: values[0] for name, values in
+                _score_block([user_profile], encoded, self.skill_index, self.weights).items()}
+
+    def score(self, user_profile: Dict, rows: np.ndarray) -> np.ndarray:
+        """Exact match scores of one profile against the given posting ids"""
+        return self.components(user_profile, rows)["score"]
+
+    def filter_mask(self, rows: np.ndarray, filters: Dict = None) -> np.ndarray:
+        """Boolean mask over ``rows`` for the optional match filters (any ``InternshipTable.mask`` keyword)"""
+        if not filters:
+            return np.ones(len(rows), dtype=bool)
+        return self.table.mask(rows, **filters)
+
+    def top_k_matches(self, user_profile: Dict, k: int = 10, filters: Dict = None, explain=None) -> List[Dict]:
+        """The K best matches for a profile, best first.
+
+        Only the K winners get a breakdown: the numeric components by default,
+        or ``explain(profile, internship)`` (e.g. the page's scorer with match
+        reasons) when given. Ties keep catalog order.
+        """
+        # Normalize the profile once; unchanged inputs reuse their cached candidate columns
+        profile = _as_records([user_profile], ProfileRecord, self.skill_index)[0]
+        candidates, columns = self.component_cache.components(profile, self._candidates)
+        keep = self.filter_mask(candidates, filters)
+        rows = candidates[keep]
+        found = {name: values[keep] for name, values in columns.items()}
+
+        # Skill-less postings can only matter if fewer than K candidates beat their bound
+        if np.count_nonzero(found["score"] > self.non_skill_bound) < k and len(candidates) < len(self.internships):
+            rest = np.setdiff1d(np.arange(len(self.internships)), candidates, assume_unique=True)
+            rest = rest[self.filter_mask(rest, filters)]
+            rows = np.concatenate([rows, rest])
+            extra = self.components(profile, rest)
+            found = {name: np.concatenate([values, extra[name]]) for name, values in found.items()}
+
+        best = select_top_k(found["score"], k, rows)
+        matches = []
+        for position in best:
+            internship = self.internships[rows[position]]
+            if explain is None:
+                details = {name: values[position] for name, values in found.items() if name != "score"}
+            else:
+                details = explain(user_profile, internship)
+            matches.append({"internship": internship, "score": float(found["score"][position]), "details": details})
+        return matches
+
+
+def greedy_order(scores: np.ndarray) -> np.ndarray:
+    """Flat pair indices sorted by descending score.
+
+    Uses a stable sort so ties keep (profile, internship) row-major order,
+    exactly like sorting the list of pair dicts with ``list.sort``.
+    """
+    return np.argsort(-scores, axis=None, kind="stable")
@@ -0,0 +1,278 @@
+"""Compact, immutable record types for internships and student profiles.
+
+Records are built once at load time with every field the scorers need
+already normalized: skills interned to ids (plus a bitmask), locations and
+industries lowercased and interned, stipends parsed to numbers. Scoring code
+reads attributes instead of walking nested dicts and calling ``.lower()`` on
+every pass.
+
+Records are also read-only mappings over their original keys, so page code
+such as ``internship["title"]`` or ``internship["requirements"]["skills"]``
+keeps working unchanged.
+"""
+import re
+import sys
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Iterable, List
+
+DEFAULT_SALARY_RANGE = [0, 100000]
+
+_STIPEND_AMOUNT = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_stipend(value) -> float:
+    """Monthly stipend as a number: 25000, "25000" and "₹25,000/month" all give 25000.0"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _STIPEND_AMOUNT.search(str(value or ""))
+    return float(match.group().replace(",", "")) if match else 0.0
+
+
+class Vocabulary:
+    """Interned vocabulary mapping each normalized (lowercased) value to an integer id"""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+        for value in values:
+            self.intern(value)
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        """Normalization shared with the original set-based scorers"""
+        return value.lower()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, value: str) -> bool:
+        return self.normalize(value) in self._ids
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def intern(self, value: str) -> int:
+        """Return the id of a value, assigning the next id if it is new"""
+        key = self.normalize(value)
+        value_id = self._ids.get(key)
+        if value_id is None:
+            with self._lock:
+                value_id = self._ids.get(key)
+                if value_id is None:
+                    value_id = len(self._names)
+                    self._names.append(key)
+                    self._ids[key] = value_id
+        return value_id
+
+    def ids(self, values: Iterable[str]) -> List[int]:
+        """Distinct ids for a list of values"""
+        return sorted({self.intern(value) for value in values})
+
+    def name(self, value_id: int) -> str:
+        """Normalized value for an id"""
+        return self._names[value_id]
+
+    def all_names(self) -> List[str]:
+        """Every normalized value, indexed by id"""
+        return list(self._names)
+
+
+class RecordVocabulary:
+    """The vocabularies one set of records is interned against"""
+
+    def __init__(self, skills, locations: Vocabulary = None, industries: Vocabulary = None):
+        self.skills = skills
+        self.locations = Vocabulary() if locations is None else locations
+        self.industries = Vocabulary() if industries is None else industries
+
+
+class _Record(Mapping):
+    """Frozen ``__slots__`` record that also reads like the dict it was built from"""
+
+    __slots__ = ()
+    # Source key -> attribute; keys not listed here are kept in ``extras``
+    _KEYS: Dict[str, str] = {}
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # Mapping proxies cannot be pickled; they travel as dicts and are re-wrapped on load
+        values = tuple(
+            dict(value) if isinstance(value, MappingProxyType) else value
+            for value in (getattr(self, name) for name in self.__slots__)
+        )
+        return _restore_record, (type(self), values)
+
+    def _set(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __getitem__(self, key):
+        attribute = self._KEYS.get(key)
+        if attribute is not None:
+            return getattr(self, attribute)
+        return self.extras[key]
+
+    def __iter__(self):
+        yield from self._KEYS
+        yield from self.extras
+
+    def __len__(self) -> int:
+        return len(self._KEYS) + len(self.extras)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.get('id', self.get('name', ''))!r})"
+
+
+def _restore_record(record_type, values):
+    record = object.__new__(record_type)
+    record._set(**{
+        name: MappingProxyType(value) if isinstance(value, dict) else value
+        for name, value in zip(record_type.__slots__, values)
+    })
+    return record
+
+
+_NO_EXTRAS = MappingProxyType({})
+_SHARED_EXTRAS: Dict[tuple, Mapping] = {}
+_SHARED_EXTRAS_LIMIT = 10000
+
+
+def _extras(data: Mapping, keys: Dict[str, str]) -> Mapping:
+    """Read-only view of the keys without a slot; identical hashable extras share one view"""
+    extras = {key: value for key, value in data.items() if key not in keys}
+    if not extras:
+        return _NO_EXTRAS
+    try:
+        shared_key = tuple(extras.items())
+        shared = _SHARED_EXTRAS.get(shared_key)
+    except TypeError:
+        return MappingProxyType(extras)
+    if shared is None:
+        if len(_SHARED_EXTRAS) >= _SHARED_EXTRAS_LIMIT:
+            _SHARED_EXTRAS.clear()
+        shared = _SHARED_EXTRAS.setdefault(shared_key, MappingProxyType(extras))
+    return shared
+
+
+class InternshipRecord(_Record):
+    """One internship posting with pre-normalized matching fields"""
+
+    __slots__ = (
+        "id", "title", "company", "location", "industry", "domain", "salary", "is_remote",
+        "requirements", "difficulty",
+        "skills", "skill_ids", "skill_mask", "min_cgpa", "stipend",
+        "location_key", "location_id", "industry_key", "industry_id", "domain_key",
+        "vocabulary", "extras",
+    )
+    _KEYS = {
+        "id": "id", "title": "title", "company": "company", "location": "location",
+        "industry": "industry", "domain": "domain", "salary": "salary", "isRemote": "is_remote",
+        "requirements": "requirements", "difficulty": "difficulty",
+    }
+
+    @classmethod
+    def from_dict(cls, data: Mapping, vocabulary: RecordVocabulary) -> "InternshipRecord":
+        """Build a record from an internship dict (or another record)"""
+        requirements = data.get("requirements", {})
+        skills = tuple(requirements.get("skills", ()))
+        skill_ids = tuple(vocabulary.skills.ids(skills))
+        location = data.get("location", "")
+        industry = data.get("industry", "")
+        domain = data.get("domain", "")
+        min_cgpa = float(requirements.get("minCgpa", 0.0))
+        location_id = vocabulary.locations.intern(location)
+        industry_id = vocabulary.industries.intern(industry)
+
+        # Normalized keys are the vocabulary's own strings, shared by every record
+        record = object.__new__(cls)
+        record._set(
+            id=data.get("id", ""),
+            title=data.get("title", ""),
+            company=data.get("company", ""),
+            location=location,
+            industry=industry,
+            domain=domain,
+            salary=data.get("salary", 0),
+            is_remote=bool(data.get("isRemote", False)),
+            # Built once: scalar scorers read internship["requirements"] for every pair
+            requirements=MappingProxyType({**requirements, "skills": skills, "minCgpa": min_cgpa}),
+            difficulty=data.get("difficulty", ""),
+            skills=skills,
+            skill_ids=skill_ids,
+            skill_mask=sum(1 << skill_id for skill_id in skill_ids),
+            min_cgpa=min_cgpa,
+            stipend=parse_stipend(data.get("salary", data.get("stipend", 0))),
+            location_key=vocabulary.locations.name(location_id),
+            location_id=location_id,
+            industry_key=vocabulary.industries.name(industry_id),
+            industry_id=industry_id,
+            domain_key=sys.intern(domain.lower()),
+            vocabulary=vocabulary,
+            extras=_extras(data, cls._KEYS),
+        )
+        return record
+
+
+class ProfileRecord(_Record):
+    """One student profile with pre-normalized matching fields"""
+
+    __slots__ = (
+        "name", "email", "skills", "cgpa", "industry", "experience", "experience_level", "preferences",
+        "skill_ids", "skill_mask", "industry_key", "industry_id",
+        "preferred_locations", "location_ids", "wants_remote", "preferred_domains", "salary_range",
+        "vocabulary", "extras",
+    )
+    _KEYS = {
+        "name": "name", "email": "email", "skills": "skills", "cgpa": "cgpa", "industry": "industry",
+        "experience": "experience", "experience_level": "experience_level", "preferences": "preferences",
+    }
+
+    @classmethod
+    def from_dict(cls, data: Mapping, vocabulary: RecordVocabulary) -> "ProfileRecord":
+        """Build a record from a profile dict (or another record)"""
+        preferences = data.get("preferences", {})
+        skills = tuple(data.get("skills", ()))
+        skill_ids = tuple(vocabulary.skills.ids(skills))
+        industry = data.get("industry", "")
+        industry_id = vocabulary.industries.intern(industry)
+        location_ids = tuple(vocabulary.locations.intern(location) for location in preferences.get("location", ()))
+        preferred_locations = tuple(vocabulary.locations.name(location_id) for location_id in location_ids)
+
+        record = object.__new__(cls)
+        record._set(
+            name=data.get("name", ""),
+            email=data.get("email", ""),
+            skills=skills,
+            cgpa=float(data.get("cgpa", 7.0)),
+            industry=industry,
+            experience=data.get("experience", ""),
+            experience_level=data.get("experience_level", ""),
+            preferences=MappingProxyType({key: tuple(value) if isinstance(value, list) else value
+                                          for key, value in preferences.items()}),
+            skill_ids=skill_ids,
+            skill_mask=sum(1 << skill_id for skill_id in skill_ids),
+            industry_key=vocabulary.industries.name(industry_id),
+            industry_id=industry_id,
+            preferred_locations=preferred_locations,
+            location_ids=location_ids,
+            wants_remote="remote" in preferred_locations,
+            preferred_domains=tuple(domain.lower() for domain in preferences.get("domains", ())),
+            salary_range=tuple(float(bound) for bound in preferences.get("salary_range", DEFAULT_SALARY_RANGE)),
+            vocabulary=vocabulary,
+            extras=_extras(data, cls._KEYS),
+        )
+        return record
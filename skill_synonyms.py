@@ -0,0 +1,78 @@
+"""Skill synonym and alias table, compiled once into the skill-id space.
+
+Each group lists spellings of one skill, canonical name first. ``SkillIndex``
+normalizes every alias to its canonical name before interning, so aliases
+share a single skill id and overlap stays one ``popcount`` with no fuzzy
+string comparison at scoring time.
+
+Pure module: no Streamlit imports.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence
+
+# Only true spelling variants and standard abbreviations: merging related but distinct
+# skills (SEO vs SEO/SEM, CI vs CI/CD) would inflate overlap scores. Bare tokens such
+# as "Node" or "TS" are left out because they are ambiguous outside a stack listing.
+SKILL_SYNONYMS: List[Sequence[str]] = [
+    ("Machine Learning", "ML", "AI/ML", "AI & ML"),
+    ("Artificial Intelligence", "AI"),
+    ("Deep Learning", "DL"),
+    ("Natural Language Processing", "NLP"),
+    # Analysis / analytics name the same skill in posting and profile wording
+    ("Data Analysis", "Data Analytics"),
+    ("JavaScript", "JS", "ECMAScript"),
+    ("Node.js", "NodeJS", "Node JS"),
+    ("React", "React.js", "ReactJS", "React JS"),
+    ("Express", "Express.js", "ExpressJS"),
+    ("REST APIs", "REST API", "RESTful APIs", "RESTful API"),
+    ("Material-UI", "Material UI", "MUI"),
+    ("Scikit-learn", "sklearn", "scikit learn"),
+    ("PostgreSQL", "Postgres"),
+    ("Go", "Golang"),
+    ("C++", "CPP"),
+    ("AWS", "Amazon Web Services"),
+    ("Google Cloud", "GCP", "Google Cloud Platform"),
+    ("Kubernetes", "K8s"),
+    ("CI/CD", "CI CD"),
+    ("Excel", "MS Excel", "Microsoft Excel"),
+    ("PowerPoint", "MS PowerPoint", "Microsoft PowerPoint"),
+    ("Power BI", "PowerBI"),
+    ("Photoshop", "Adobe Photoshop"),
+    ("Bloomberg Terminal", "Bloomberg"),
+    ("UI/UX Design", "UI/UX", "UX/UI Design"),
+    # "Mobile Development" in these skill lists always means building mobile apps
+    ("Mobile Development", "Mobile App Development"),
+]
+
+
+def compile_aliases(groups: Iterable[Sequence[str]]) -> Dict[str, str]:
+    """Normalized alias -> normalized canonical name, closed over groups that share a spelling.
+
+    Groups are merged transitively (union-find), so if "A" ~ "B" and "B" ~ "C"
+    all three map to "A", the canonical name of the first group seen.
+    """
+    parent: Dict[str, str] = {}
+
+    def find(name: str) -> str:
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for group in groups:
+        names = [name.lower() for name in group]
+        for name in names:
+            parent.setdefault(name, name)
+        root = find(names[0])
+        for name in names[1:]:
+            other = find(name)
+            if other != root:
+                parent[other] = root
+
+    return {name: find(name) for name in parent if find(name) != name}
+
+
+@lru_cache(maxsize=None)
+def default_skill_aliases() -> Dict[str, str]:
+    """The bundled ``SKILL_SYNONYMS`` compiled once per process"""
+    return compile_aliases(SKILL_SYNONYMS)
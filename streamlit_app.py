@@ -7,6 +7,9 @@ import json
 import numpy as np
 from typing import Dict, List, Tuple, Any
 
+from gazetteer import nearest_distance
+from matching_engine import SkillIndex, bit_count, greedy_order, score_matrix
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Smart Internship Matching Platform",
@@ -373,17 +376,25 @@ def get_sample_profiles():
         }
     }
 
-def calculate_match_score(user_profile: Dict, internship: Dict) -> Tuple[float, Dict]:
+@st.cache_resource
+def get_skill_index() -> SkillIndex:
+    """Interned skill vocabulary for the internship catalog"""
+    return SkillIndex.from_skill_lists(*(internship["requirements"]["skills"] for internship in load_internships_data()))
+
+def calculate_match_score(user_profile: Dict, internship: Dict, skill_index: SkillIndex = None) -> Tuple[float, Dict]:
     """Calculate match score between user profile and internship"""
     score = 0
     reasons = []
     
     # Skills matching (50% weight)
-    user_skills = set([skill.lower() for skill in user_profile["skills"]])
-    required_skills = set([skill.lower() for skill in internship["requirements"]["skills"]])
-    
-    skill_overlap = user_skills.intersection(required_skills)
-    skill_match_ratio = len(skill_overlap) / len(required_skills) if required_skills else 0
+    if skill_index is None:
+        skill_index = get_skill_index()
+    user_skills = skill_index.mask(user_profile["skills"])
+    required_skills = skill_index.mask(internship["requirements"]["skills"])
+    
+    skill_overlap = skill_index.names(user_skills & required_skills)
+    required_count = bit_count(required_skills)
+    skill_match_ratio = len(skill_overlap) / required_count if required_count else 0
     skill_score = skill_match_ratio * 50
     score += skill_score
     
@@ -427,7 +438,15 @@ def calculate_match_score(user_profile: Dict, internship: Dict) -> Tuple[float,
         location_score = 10
         reasons.append("Remote option available")
     else:
-        location_score = 5
+        # Graded by distance to the nearest preferred city
+        distance = nearest_distance(preferred_locations, internship["location"])
+        if distance <= 150:
+            location_score = 12
+            reasons.append(f"Near your preferred location (~{distance:.0f} km)")
+        elif distance <= 400:
+            location_score = 8
+        else:
+            location_score = 5
     
     score += location_score
     
@@ -450,7 +469,7 @@ def calculate_match_score(user_profile: Dict, internship: Dict) -> Tuple[float,
         "cgpa_match": cgpa_score,
         "location_match": location_score,
         "domain_match": domain_score,
-        "skill_overlap": list(skill_overlap)
+        "skill_overlap": skill_overlap
     }
 
 def main():
@@ -564,18 +583,13 @@ def main():
     if name and email and selected_skills:
         st.header("🔍 Your Personalized Internship Matches")
         
-        # Calculate matches
-        matches = []
-        for internship in internships:
-            score, details = calculate_match_score(user_profile, internship)
-            matches.append({
-                "internship": internship,
-                "score": score,
-                "details": details
-            })
-        
-        # Sort by match score
-        matches.sort(key=lambda x: x["score"], reverse=True)
+        # Calculate matches, best first
+        skill_index = get_skill_index()
+        scores = score_matrix([user_profile], internships, skill_index, weights="domain_match")[0]
+        matches = [
+            {"internship": internships[row], "score": float(scores[row])}
+            for row in greedy_order(scores)
+        ]
         
         # Filter by salary preference
         filtered_matches = [
@@ -614,7 +628,8 @@ def main():
         for i, match in enumerate(filtered_matches[:10], 1):
             internship = match["internship"]
             score = match["score"]
-            details = match["details"]
+            # Match reasons are only built for the matches shown
+            _, details = calculate_match_score(user_profile, internship, skill_index)
             
             # Determine match level and color
             if score >= 80:
@@ -9,6 +9,8 @@ import numpy as np
 from typing import Dict, List, Tuple, Any
 import time
 
+from matching_engine import SkillIndex, SkillPostingIndex
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Smart Internship Platform",
@@ -723,6 +725,13 @@ def load_enhanced_internships():
         # Add more internships as needed
     ]
 
+@st.cache_resource
+def get_posting_index() -> SkillPostingIndex:
+    """Inverted skill → internship index scored with the quick-match weights"""
+    internships = load_enhanced_internships()
+    skill_index = SkillIndex.from_skill_lists(*(internship["requirements"]["skills"] for internship in internships))
+    return SkillPostingIndex(internships, skill_index, weights="quick_match")
+
 # Page Components
 def dashboard_page():
     """Create stunning dashboard page"""
@@ -875,28 +884,22 @@ def matching_page():
             with st.spinner("🔍 Analyzing your profile and finding perfect matches..."):
                 time.sleep(2)  # Simulate processing
                 
-                internships = load_enhanced_internships()
-                matches = []
-                
-                for internship in internships:
-                    # Calculate match score (simplified)
-                    user_skills_set = set([skill.lower() for skill in selected_skills])
-                    req_skills_set = set([skill.lower() for skill in internship["requirements"]["skills"]])
-                    
-                    skill_match = len(user_skills_set.intersection(req_skills_set)) / len(req_skills_set) * 50
-                    cgpa_match = 25 if cgpa >= internship["requirements"]["minCgpa"] else 10
-                    salary_match = 25 if salary_range[0] <= internship["salary"] <= salary_range[1] else 15
-                    
-                    total_score = skill_match + cgpa_match + salary_match
-                    
-                    matches.append({
-                        "internship": internship,
-                        "score": min(total_score, 100),
-                        "skill_overlap": list(user_skills_set.intersection(req_skills_set))
-                    })
+                # Skills (50%), CGPA (25%) and salary (25%) via the shared top-K engine
+                user_profile = {
+                    "skills": selected_skills, "cgpa": cgpa,
+                    "preferences": {"location": preferred_locations, "salary_range": list(salary_range)}
+                }
+                posting_index = get_posting_index()
+                st.session_state.matches = posting_index.top_k_matches(user_profile, k=5)
                 
-                matches.sort(key=lambda x: x["score"], reverse=True)
-                st.session_state.matches = matches
+                # Summary figures cover the whole catalog, from one vectorized pass over every posting
+                scores = posting_index.score(user_profile, np.arange(len(posting_index)))
+                st.session_state.match_stats = {
+                    "total": len(scores),
+                    "excellent": int(np.count_nonzero(scores >= 80)),
+                    "average_score": float(scores.mean()) if len(scores) else 0.0,
+                    "average_salary": float(posting_index.encoded["salary"].mean()) if len(scores) else 0.0,
+                }
         
         if run_allocation:
             with st.spinner("🚀 Running advanced allocation algorithms..."):
@@ -923,19 +926,16 @@ def matching_page():
             # Match summary
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Total Matches", len(st.session_state.matches))
+                st.metric("Total Matches", st.session_state.match_stats["total"])
             with col2:
-                excellent = len([m for m in st.session_state.matches if m["score"] >= 80])
-                st.metric("Excellent Matches", excellent)
+                st.metric("Excellent Matches", st.session_state.match_stats["excellent"])
             with col3:
-                avg_score = np.mean([m["score"] for m in st.session_state.matches])
-                st.metric("Avg Match Score", f"{avg_score:.1f}%")
+                st.metric("Avg Match Score", f"{st.session_state.match_stats['average_score']:.1f}%")
             with col4:
-                avg_salary = np.mean([m["internship"]["salary"] for m in st.session_state.matches])
-                st.metric("Avg Salary", f"₹{avg_salary:,.0f}")
+                st.metric("Avg Salary", f"₹{st.session_state.match_stats['average_salary']:,.0f}")
             
             # Display top matches
-            for i, match in enumerate(st.session_state.matches[:5], 1):
+            for i, match in enumerate(st.session_state.matches, 1):
                 internship = match["internship"]
                 score = match["score"]
                 
@@ -965,8 +965,10 @@ def matching_page():
                         # Skills visualization
                         st.markdown("**Required Skills:**")
                         skill_html = ""
+                        skill_index = get_posting_index().skill_index
+                        user_skills = skill_index.mask(selected_skills)
                         for skill in internship["requirements"]["skills"]:
-                            if skill.lower() in [s.lower() for s in selected_skills]:
+                            if skill_index.mask([skill]) & user_skills:
                                 skill_html += f'<span class="skill-tag skill-matched">{skill} ✓</span>'
                             else:
                                 skill_html += f'<span class="skill-tag skill-missing">{skill}</span>'